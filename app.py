@@ -1,8 +1,24 @@
 import streamlit as st
 import time
 import os
+import threading
+import uuid
 from dotenv import load_dotenv
 
+from groq_client import get_groq_client, pool_stats
+from groq_scheduler import BACKGROUND, TEXT, AdmissionTimeout, get_groq_scheduler, is_rate_limited
+from response_cache import get_response_cache, prewarm
+from semantic_cache import get_semantic_cache
+from knowledge_base import format_for_prompt, get_knowledge_base
+from eligibility import GENDERS, OCCUPATIONS, get_engine
+from intent_router import ROUTE_FAST_PATH, ROUTE_LLM, get_intent_router
+from conversation_memory import ConversationMemory, estimate_tokens
+from conversation_store import get_conversation_store
+from hot_questions import load_hot_questions, prewarm_semantic_cache
+from model_router import get_model_router, hedged_iter
+from llm_executor import GENERATING, QUEUED, LLMQueueFull, flight_key, get_llm_executor
+from language_packs import LANGUAGE_NAMES, LANGUAGES, get_language_pack
+
 load_dotenv()
 
 # ---------- Page Config ----------
@@ -13,369 +29,44 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# ---------- UI Translations ----------
-UI_TEXT = {
-    "hi-IN": {
-        "badge": "🇮🇳 डिजिटल इंडिया पहल",
-        "title": "सरकार सहायक — Sarkar Sahayak",
-        "subtitle": "सरकारी योजनाओं की जानकारी अब आपकी भाषा में • वॉइस + टेक्स्ट सपोर्ट • 9 भारतीय भाषाएं",
-        "chat_title": "💬 एजेंट से बात करें",
-        "schemes_title": "📋 लोकप्रिय सरकारी योजनाएं",
-        "voice_title": "वॉइस सपोर्ट उपलब्ध",
-        "voice_desc": "वॉइस के लिए एजेंट टर्मिनल में चलाएं:",
-        "voice_then": "फिर जाएं:",
-        "placeholder": "योजना के बारे में पूछें... हिंदी या English में",
-        "send_btn": "भेजें →",
-        "clear_btn": "🗑️ चैट साफ करें",
-        "lang_label": "🌐 भाषा",
-        "quick_q_label": "⚡ त्वरित प्रश्न",
-        "status_groq_ok": "Groq LLM ✓",
-        "status_groq_miss": "GROQ_API_KEY नहीं है",
-        "status_lk_ok": "LiveKit कॉन्फ़िगर ✓",
-        "status_lk_miss": "LiveKit कॉन्फ़िगर नहीं",
-        "ask_btn": "पूछें",
-        "footer": "Powered by <strong>Groq LLaMA 3.3</strong> + <strong>Sarvam AI</strong> (STT/TTS) + <strong>LiveKit</strong> &nbsp;|&nbsp; सटीक जानकारी के लिए हमेशा आधिकारिक सरकारी पोर्टल देखें: <strong>india.gov.in</strong>",
-        "welcome": "🙏 नमस्ते! मैं आपका सरकार सहायक हूं। आज मैं आपको सरकारी योजनाओं के बारे में जानकारी देने के लिए यहां हूं। आप कौन सी योजना के बारे में जानना चाहते हैं?",
-        "quick_questions": [
-            "किसान हूं, मुझे क्या मिलेगा?",
-            "फ्री हॉस्पिटल ट्रीटमेंट कैसे?",
-            "बेटी के लिए कोई योजना?",
-            "घर बनाने की योजना?",
-            "रोजगार गारंटी क्या है?",
-            "Small business loan कैसे मिलेगा?",
-        ],
-    },
-    "en-IN": {
-        "badge": "🇮🇳 Digital India Initiative",
-        "title": "Sarkar Sahayak — Government Assistant",
-        "subtitle": "Government scheme information in your language • Voice + Text Support • 9 Indian Languages",
-        "chat_title": "💬 Chat with Agent",
-        "schemes_title": "📋 Popular Government Schemes",
-        "voice_title": "Voice Support Available",
-        "voice_desc": "For voice, run the agent in terminal:",
-        "voice_then": "Then visit:",
-        "placeholder": "Ask about any scheme... in Hindi or English",
-        "send_btn": "Send →",
-        "clear_btn": "🗑️ Clear Chat",
-        "lang_label": "🌐 Language",
-        "quick_q_label": "⚡ Quick Questions",
-        "status_groq_ok": "Groq LLM ✓",
-        "status_groq_miss": "GROQ_API_KEY missing",
-        "status_lk_ok": "LiveKit Configured ✓",
-        "status_lk_miss": "LiveKit not configured",
-        "ask_btn": "Ask",
-        "footer": "Powered by <strong>Groq LLaMA 3.3</strong> + <strong>Sarvam AI</strong> (STT/TTS) + <strong>LiveKit</strong> &nbsp;|&nbsp; For accurate info always visit official govt portals: <strong>india.gov.in</strong>",
-        "welcome": "🙏 Hello! I am your Sarkar Sahayak. I am here to help you with information about government welfare schemes. Which scheme would you like to know about?",
-        "quick_questions": [
-            "I'm a farmer, what can I get?",
-            "How to get free hospital treatment?",
-            "Any scheme for daughter?",
-            "Scheme for building a house?",
-            "What is employment guarantee?",
-            "How to get small business loan?",
-        ],
-    },
-    "ta-IN": {
-        "badge": "🇮🇳 டிஜிட்டல் இந்தியா முன்முயற்சி",
-        "title": "சர்கார் சஹாயக் — அரசு உதவியாளர்",
-        "subtitle": "அரசு திட்டங்கள் பற்றிய தகவல்கள் இப்போது உங்கள் மொழியில் • குரல் + உரை ஆதரவு",
-        "chat_title": "💬 முகவருடன் அரட்டை",
-        "schemes_title": "📋 பிரபலமான அரசு திட்டங்கள்",
-        "voice_title": "குரல் ஆதரவு கிடைக்கிறது",
-        "voice_desc": "குரலுக்கு, முனையத்தில் முகவரை இயக்கவும்:",
-        "voice_then": "பிறகு செல்லவும்:",
-        "placeholder": "திட்டத்தைப் பற்றி கேளுங்கள்...",
-        "send_btn": "அனுப்பு →",
-        "clear_btn": "🗑️ அரட்டை அழி",
-        "lang_label": "🌐 மொழி",
-        "quick_q_label": "⚡ விரைவு கேள்விகள்",
-        "status_groq_ok": "Groq LLM ✓",
-        "status_groq_miss": "GROQ_API_KEY இல்லை",
-        "status_lk_ok": "LiveKit கட்டமைக்கப்பட்டது ✓",
-        "status_lk_miss": "LiveKit கட்டமைக்கப்படவில்லை",
-        "ask_btn": "கேள்",
-        "footer": "Powered by <strong>Groq LLaMA 3.3</strong> + <strong>Sarvam AI</strong> + <strong>LiveKit</strong> &nbsp;|&nbsp; துல்லியமான தகவலுக்கு: <strong>india.gov.in</strong>",
-        "welcome": "🙏 வணக்கம்! நான் உங்கள் சர்கார் சஹாயக். அரசு திட்டங்கள் பற்றி தகவல் தர இங்கே இருக்கிறேன். நீங்கள் எந்த திட்டத்தைப் பற்றி அறிய விரும்புகிறீர்கள்?",
-        "quick_questions": [
-            "விவசாயி, எனக்கு என்ன கிடைக்கும்?",
-            "இலவச மருத்துவமனை சிகிச்சை?",
-            "மகளுக்கு திட்டம்?",
-            "வீடு கட்ட திட்டம்?",
-            "வேலை உத்தரவாதம் என்ன?",
-            "சிறு வணிக கடன்?",
-        ],
-    },
-    "te-IN": {
-        "badge": "🇮🇳 డిజిటల్ ఇండియా చొరవ",
-        "title": "సర్కార్ సహాయక్ — ప్రభుత్వ సహాయకుడు",
-        "subtitle": "ప్రభుత్వ పథకాల సమాచారం ఇప్పుడు మీ భాషలో • వాయిస్ + టెక్స్ట్ సపోర్ట్",
-        "chat_title": "💬 ఏజెంట్‌తో చాట్",
-        "schemes_title": "📋 ప్రముఖ ప్రభుత్వ పథకాలు",
-        "voice_title": "వాయిస్ సపోర్ట్ అందుబాటులో ఉంది",
-        "voice_desc": "వాయిస్ కోసం, టెర్మినల్‌లో ఏజెంట్ రన్ చేయండి:",
-        "voice_then": "తర్వాత వెళ్ళండి:",
-        "placeholder": "పథకం గురించి అడగండి...",
-        "send_btn": "పంపు →",
-        "clear_btn": "🗑️ చాట్ క్లియర్",
-        "lang_label": "🌐 భాష",
-        "quick_q_label": "⚡ త్వరిత ప్రశ్నలు",
-        "status_groq_ok": "Groq LLM ✓",
-        "status_groq_miss": "GROQ_API_KEY లేదు",
-        "status_lk_ok": "LiveKit కాన్ఫిగర్ ✓",
-        "status_lk_miss": "LiveKit కాన్ఫిగర్ కాలేదు",
-        "ask_btn": "అడగు",
-        "footer": "Powered by <strong>Groq LLaMA 3.3</strong> + <strong>Sarvam AI</strong> + <strong>LiveKit</strong> &nbsp;|&nbsp; ఖచ్చితమైన సమాచారానికి: <strong>india.gov.in</strong>",
-        "welcome": "🙏 నమస్కారం! నేను మీ సర్కార్ సహాయక్. ప్రభుత్వ పథకాల గురించి సమాచారం ఇవ్వడానికి ఇక్కడ ఉన్నాను. మీరు ఏ పథకం గురించి తెలుసుకోవాలనుకుంటున్నారు?",
-        "quick_questions": [
-            "రైతుకు ఏమి దొరుకుతుంది?",
-            "ఉచిత ఆసుపత్రి చికిత్స?",
-            "అమ్మాయికి పథకం?",
-            "ఇల్లు కట్టే పథకం?",
-            "ఉపాధి హామీ ఏమిటి?",
-            "చిన్న వ్యాపార రుణం?",
-        ],
-    },
-    "bn-IN": {
-        "badge": "🇮🇳 ডিজিটাল ইন্ডিয়া উদ্যোগ",
-        "title": "সরকার সহায়ক — সরকারি সহকারী",
-        "subtitle": "সরকারি প্রকল্পের তথ্য এখন আপনার ভাষায় • ভয়েস + টেক্সট সাপোর্ট",
-        "chat_title": "💬 এজেন্টের সাথে চ্যাট",
-        "schemes_title": "📋 জনপ্রিয় সরকারি প্রকল্প",
-        "voice_title": "ভয়েস সাপোর্ট উপলব্ধ",
-        "voice_desc": "ভয়েসের জন্য, টার্মিনালে এজেন্ট চালান:",
-        "voice_then": "তারপর যান:",
-        "placeholder": "প্রকল্প সম্পর্কে জিজ্ঞেস করুন...",
-        "send_btn": "পাঠান →",
-        "clear_btn": "🗑️ চ্যাট মুছুন",
-        "lang_label": "🌐 ভাষা",
-        "quick_q_label": "⚡ দ্রুত প্রশ্ন",
-        "status_groq_ok": "Groq LLM ✓",
-        "status_groq_miss": "GROQ_API_KEY নেই",
-        "status_lk_ok": "LiveKit কনফিগার ✓",
-        "status_lk_miss": "LiveKit কনফিগার নয়",
-        "ask_btn": "জিজ্ঞেস করুন",
-        "footer": "Powered by <strong>Groq LLaMA 3.3</strong> + <strong>Sarvam AI</strong> + <strong>LiveKit</strong> &nbsp;|&nbsp; সঠিক তথ্যের জন্য: <strong>india.gov.in</strong>",
-        "welcome": "🙏 নমস্কার! আমি আপনার সরকার সহায়ক। সরকারি প্রকল্প সম্পর্কে তথ্য দিতে এখানে আছি। আপনি কোন প্রকল্প সম্পর্কে জানতে চান?",
-        "quick_questions": [
-            "কৃষক, আমি কী পাব?",
-            "বিনামূল্যে হাসপাতাল চিকিৎসা?",
-            "মেয়ের জন্য প্রকল্প?",
-            "বাড়ি তৈরির প্রকল্প?",
-            "কর্মসংস্থান গ্যারান্টি কী?",
-            "ছোট ব্যবসায় ঋণ?",
-        ],
-    },
-    "gu-IN": {
-        "badge": "🇮🇳 ડિજિટલ ઈન્ડિયા પહેલ",
-        "title": "સરકાર સહાયક — સરકારી સહાયક",
-        "subtitle": "સરકારી યોજનાઓની માહિતી હવે તમારી ભાષામાં • વૉઇસ + ટેક્સ્ટ સપોર્ટ",
-        "chat_title": "💬 એજન્ટ સાથે ચેટ",
-        "schemes_title": "📋 લોકપ્રિય સરકારી યોજનાઓ",
-        "voice_title": "વૉઇસ સપોર્ટ ઉપલબ્ધ",
-        "voice_desc": "વૉઇસ માટે, ટર્મિનલમાં એજન્ટ ચલાવો:",
-        "voice_then": "પછી જાઓ:",
-        "placeholder": "યોજના વિશે પૂછો...",
-        "send_btn": "મોકલો →",
-        "clear_btn": "🗑️ ચેટ સાફ કરો",
-        "lang_label": "🌐 ભાષા",
-        "quick_q_label": "⚡ ઝડપી પ્રશ્નો",
-        "status_groq_ok": "Groq LLM ✓",
-        "status_groq_miss": "GROQ_API_KEY નથી",
-        "status_lk_ok": "LiveKit ગોઠવ્યું ✓",
-        "status_lk_miss": "LiveKit ગોઠવ્યું નથી",
-        "ask_btn": "પૂછો",
-        "footer": "Powered by <strong>Groq LLaMA 3.3</strong> + <strong>Sarvam AI</strong> + <strong>LiveKit</strong> &nbsp;|&nbsp; સચોટ માહિતી માટે: <strong>india.gov.in</strong>",
-        "welcome": "🙏 નમસ્કાર! હું તમારો સરકાર સહાયક છું. સરકારી યોજનાઓ વિશે માહિતી આપવા માટે અહીં છું. તમે કઈ યોજના વિશે જાણવા માગો છો?",
-        "quick_questions": [
-            "ખેડૂત છું, મને શું મળશે?",
-            "ફ્રી હોસ્પિટલ સારવાર?",
-            "દીકરી માટે કોઈ યોજના?",
-            "ઘર બનાવવાની યોજના?",
-            "રોજગાર ગેરંટી શું છે?",
-            "નાના ધંધા માટે લોન?",
-        ],
-    },
-    "kn-IN": {
-        "badge": "🇮🇳 ಡಿಜಿಟಲ್ ಇಂಡಿಯಾ ಉಪಕ್ರಮ",
-        "title": "ಸರ್ಕಾರ್ ಸಹಾಯಕ — ಸರ್ಕಾರಿ ಸಹಾಯಕ",
-        "subtitle": "ಸರ್ಕಾರಿ ಯೋಜನೆಗಳ ಮಾಹಿತಿ ಈಗ ನಿಮ್ಮ ಭಾಷೆಯಲ್ಲಿ • ಧ್ವನಿ + ಪಠ್ಯ ಬೆಂಬಲ",
-        "chat_title": "💬 ಏಜೆಂಟ್ ಜೊತೆ ಚಾಟ್",
-        "schemes_title": "📋 ಜನಪ್ರಿಯ ಸರ್ಕಾರಿ ಯೋಜನೆಗಳು",
-        "voice_title": "ಧ್ವನಿ ಬೆಂಬಲ ಲಭ್ಯವಿದೆ",
-        "voice_desc": "ಧ್ವನಿಗಾಗಿ, ಟರ್ಮಿನಲ್‌ನಲ್ಲಿ ಏಜೆಂಟ್ ಚಲಾಯಿಸಿ:",
-        "voice_then": "ನಂತರ ಹೋಗಿ:",
-        "placeholder": "ಯೋಜನೆಯ ಬಗ್ಗೆ ಕೇಳಿ...",
-        "send_btn": "ಕಳುಹಿಸು →",
-        "clear_btn": "🗑️ ಚಾಟ್ ತೆರವು",
-        "lang_label": "🌐 ಭಾಷೆ",
-        "quick_q_label": "⚡ ತ್ವರಿತ ಪ್ರಶ್ನೆಗಳು",
-        "status_groq_ok": "Groq LLM ✓",
-        "status_groq_miss": "GROQ_API_KEY ಇಲ್ಲ",
-        "status_lk_ok": "LiveKit ಕಾನ್ಫಿಗರ್ ✓",
-        "status_lk_miss": "LiveKit ಕಾನ್ಫಿಗರ್ ಆಗಿಲ್ಲ",
-        "ask_btn": "ಕೇಳಿ",
-        "footer": "Powered by <strong>Groq LLaMA 3.3</strong> + <strong>Sarvam AI</strong> + <strong>LiveKit</strong> &nbsp;|&nbsp; ನಿಖರ ಮಾಹಿತಿಗೆ: <strong>india.gov.in</strong>",
-        "welcome": "🙏 ನಮಸ್ಕಾರ! ನಾನು ನಿಮ್ಮ ಸರ್ಕಾರ್ ಸಹಾಯಕ. ಸರ್ಕಾರಿ ಯೋಜನೆಗಳ ಬಗ್ಗೆ ಮಾಹಿತಿ ನೀಡಲು ಇಲ್ಲಿದ್ದೇನೆ. ನೀವು ಯಾವ ಯೋಜನೆಯ ಬಗ್ಗೆ ತಿಳಿಯಲು ಬಯಸುತ್ತೀರಿ?",
-        "quick_questions": [
-            "ರೈತ, ನನಗೇನು ಸಿಗುತ್ತದೆ?",
-            "ಉಚಿತ ಆಸ್ಪತ್ರೆ ಚಿಕಿತ್ಸೆ?",
-            "ಮಗಳಿಗೆ ಯೋಜನೆ?",
-            "ಮನೆ ಕಟ್ಟಲು ಯೋಜನೆ?",
-            "ಉದ್ಯೋಗ ಗ್ಯಾರಂಟಿ ಏನು?",
-            "ಸಣ್ಣ ವ್ಯವಹಾರ ಸಾಲ?",
-        ],
-    },
-    "mr-IN": {
-        "badge": "🇮🇳 डिजिटल इंडिया उपक्रम",
-        "title": "सरकार सहायक — शासकीय सहाय्यक",
-        "subtitle": "सरकारी योजनांची माहिती आता तुमच्या भाषेत • व्हॉइस + टेक्स्ट सपोर्ट",
-        "chat_title": "💬 एजंटशी चॅट करा",
-        "schemes_title": "📋 लोकप्रिय सरकारी योजना",
-        "voice_title": "व्हॉइस सपोर्ट उपलब्ध",
-        "voice_desc": "व्हॉइससाठी, टर्मिनलमध्ये एजंट चालवा:",
-        "voice_then": "नंतर जा:",
-        "placeholder": "योजनेबद्दल विचारा...",
-        "send_btn": "पाठवा →",
-        "clear_btn": "🗑️ चॅट साफ करा",
-        "lang_label": "🌐 भाषा",
-        "quick_q_label": "⚡ त्वरित प्रश्न",
-        "status_groq_ok": "Groq LLM ✓",
-        "status_groq_miss": "GROQ_API_KEY नाही",
-        "status_lk_ok": "LiveKit कॉन्फिगर ✓",
-        "status_lk_miss": "LiveKit कॉन्फिगर नाही",
-        "ask_btn": "विचारा",
-        "footer": "Powered by <strong>Groq LLaMA 3.3</strong> + <strong>Sarvam AI</strong> + <strong>LiveKit</strong> &nbsp;|&nbsp; अचूक माहितीसाठी: <strong>india.gov.in</strong>",
-        "welcome": "🙏 नमस्कार! मी तुमचा सरकार सहायक आहे. सरकारी योजनांबद्दल माहिती देण्यासाठी येथे आहे. तुम्हाला कोणत्या योजनेबद्दल जाणून घ्यायचे आहे?",
-        "quick_questions": [
-            "शेतकरी आहे, मला काय मिळेल?",
-            "मोफत रुग्णालय उपचार?",
-            "मुलीसाठी योजना?",
-            "घर बांधण्याची योजना?",
-            "रोजगार हमी काय आहे?",
-            "लघु व्यवसाय कर्ज?",
-        ],
-    },
-    "pa-IN": {
-        "badge": "🇮🇳 ਡਿਜੀਟਲ ਇੰਡੀਆ ਪਹਿਲ",
-        "title": "ਸਰਕਾਰ ਸਹਾਇਕ — ਸਰਕਾਰੀ ਸਹਾਇਕ",
-        "subtitle": "ਸਰਕਾਰੀ ਯੋਜਨਾਵਾਂ ਦੀ ਜਾਣਕਾਰੀ ਹੁਣ ਤੁਹਾਡੀ ਭਾਸ਼ਾ ਵਿੱਚ • ਵੌਇਸ + ਟੈਕਸਟ ਸਪੋਰਟ",
-        "chat_title": "💬 ਏਜੰਟ ਨਾਲ ਚੈਟ",
-        "schemes_title": "📋 ਪ੍ਰਸਿੱਧ ਸਰਕਾਰੀ ਯੋਜਨਾਵਾਂ",
-        "voice_title": "ਵੌਇਸ ਸਪੋਰਟ ਉਪਲਬਧ",
-        "voice_desc": "ਵੌਇਸ ਲਈ, ਟਰਮੀਨਲ ਵਿੱਚ ਏਜੰਟ ਚਲਾਓ:",
-        "voice_then": "ਫਿਰ ਜਾਓ:",
-        "placeholder": "ਯੋਜਨਾ ਬਾਰੇ ਪੁੱਛੋ...",
-        "send_btn": "ਭੇਜੋ →",
-        "clear_btn": "🗑️ ਚੈਟ ਸਾਫ਼ ਕਰੋ",
-        "lang_label": "🌐 ਭਾਸ਼ਾ",
-        "quick_q_label": "⚡ ਤੇਜ਼ ਸਵਾਲ",
-        "status_groq_ok": "Groq LLM ✓",
-        "status_groq_miss": "GROQ_API_KEY ਨਹੀਂ",
-        "status_lk_ok": "LiveKit ਕਨਫਿਗਰ ✓",
-        "status_lk_miss": "LiveKit ਕਨਫਿਗਰ ਨਹੀਂ",
-        "ask_btn": "ਪੁੱਛੋ",
-        "footer": "Powered by <strong>Groq LLaMA 3.3</strong> + <strong>Sarvam AI</strong> + <strong>LiveKit</strong> &nbsp;|&nbsp; ਸਹੀ ਜਾਣਕਾਰੀ ਲਈ: <strong>india.gov.in</strong>",
-        "welcome": "🙏 ਸਤ ਸ੍ਰੀ ਅਕਾਲ! ਮੈਂ ਤੁਹਾਡਾ ਸਰਕਾਰ ਸਹਾਇਕ ਹਾਂ। ਸਰਕਾਰੀ ਯੋਜਨਾਵਾਂ ਬਾਰੇ ਜਾਣਕਾਰੀ ਦੇਣ ਲਈ ਇੱਥੇ ਹਾਂ। ਤੁਸੀਂ ਕਿਸ ਯੋਜਨਾ ਬਾਰੇ ਜਾਣਨਾ ਚਾਹੁੰਦੇ ਹੋ?",
-        "quick_questions": [
-            "ਕਿਸਾਨ ਹਾਂ, ਮੈਨੂੰ ਕੀ ਮਿਲੇਗਾ?",
-            "ਮੁਫ਼ਤ ਹਸਪਤਾਲ ਇਲਾਜ?",
-            "ਧੀ ਲਈ ਕੋਈ ਯੋਜਨਾ?",
-            "ਘਰ ਬਣਾਉਣ ਦੀ ਯੋਜਨਾ?",
-            "ਰੁਜ਼ਗਾਰ ਗਾਰੰਟੀ ਕੀ ਹੈ?",
-            "ਛੋਟੇ ਕਾਰੋਬਾਰ ਲਈ ਕਰਜ਼ਾ?",
-        ],
-    },
-    "unknown": {
-        "badge": "🇮🇳 Digital India Initiative",
-        "title": "Sarkar Sahayak — सरकार सहायक",
-        "subtitle": "Sarkari yojanaon ki jaankari ab aapki bhasha mein • Voice + Text Support",
-        "chat_title": "💬 Chat with Agent",
-        "schemes_title": "📋 Popular Government Schemes",
-        "voice_title": "Voice Support Available",
-        "voice_desc": "Voice ke liye agent terminal mein run karein:",
-        "voice_then": "Phir jao:",
-        "placeholder": "Yojana ke baare mein puchein...",
-        "send_btn": "Send →",
-        "clear_btn": "🗑️ Clear Chat",
-        "lang_label": "🌐 Language / भाषा",
-        "quick_q_label": "⚡ Quick Questions",
-        "status_groq_ok": "Groq LLM ✓",
-        "status_groq_miss": "GROQ_API_KEY missing",
-        "status_lk_ok": "LiveKit Configured ✓",
-        "status_lk_miss": "LiveKit not configured",
-        "ask_btn": "Ask",
-        "footer": "Powered by <strong>Groq LLaMA 3.3</strong> + <strong>Sarvam AI</strong> + <strong>LiveKit</strong> &nbsp;|&nbsp; Accurate info ke liye: <strong>india.gov.in</strong>",
-        "welcome": "🙏 Namaste! Main aapka Sarkar Sahayak hoon. Sarkari yojanaon ke baare mein jaankari dene ke liye yahan hoon.",
-        "quick_questions": [
-            "Kisan hoon, mujhe kya milega?",
-            "Free hospital treatment kaise?",
-            "Beti ke liye koi scheme?",
-            "Ghar banane ki scheme?",
-            "Rozgar guarantee kya hai?",
-            "Small business loan kaise milega?",
-        ],
-    },
-}
-
-# ---------- Scheme descriptions by language ----------
-def get_schemes(lang):
-    names = ["PM Kisan Samman Nidhi", "Ayushman Bharat", "PM Awas Yojana",
-             "Sukanya Samriddhi", "PM Ujjwala Yojana", "MGNREGA",
-             "PM Jan Dhan Yojana", "PM Mudra Yojana"]
-    icons = ["🌾", "🏥", "🏠", "👧", "🔥", "💼", "🏦", "📈"]
-    all_tags = {
-        "hi-IN":  ["किसान", "स्वास्थ्य", "आवास", "बेटी", "ऊर्जा", "रोजगार", "वित्त", "व्यवसाय"],
-        "en-IN":  ["Farmers", "Health", "Housing", "Girl Child", "Energy", "Employment", "Finance", "Business"],
-        "ta-IN":  ["விவசாயி", "சுகாதாரம்", "வீட்டுவசதி", "பெண் குழந்தை", "ஆற்றல்", "வேலைவாய்ப்பு", "நிதி", "வணிகம்"],
-        "te-IN":  ["రైతు", "ఆరోగ్యం", "గృహం", "ఆడపిల్ల", "శక్తి", "ఉపాధి", "ఆర్థికం", "వ్యాపారం"],
-        "bn-IN":  ["কৃষক", "স্বাস্থ্য", "আবাসন", "কন্যাশিশু", "শক্তি", "কর্মসংস্থান", "অর্থ", "ব্যবসা"],
-        "gu-IN":  ["ખેડૂત", "આरोগ્ય", "આवास", "દીકરી", "ઉर्जा", "રोजगार", "वित्त", "व्यवसाय"],
-        "kn-IN":  ["ರೈತ", "ಆರೋಗ್ಯ", "ಮನೆ", "ಹೆಣ್ಣು ಮಗು", "ಶಕ್ತಿ", "ಉದ್ಯೋಗ", "ಹಣಕಾಸು", "ವ್ಯಾಪಾರ"],
-        "mr-IN":  ["शेतकरी", "आरोग्य", "घरकुल", "मुलगी", "ऊर्जा", "रोजगार", "वित्त", "व्यवसाय"],
-        "pa-IN":  ["ਕਿਸਾਨ", "ਸਿਹਤ", "ਘਰ", "ਧੀ", "ਊਰਜਾ", "ਰੁਜ਼ਗਾਰ", "ਵਿੱਤ", "ਕਾਰੋਬਾਰ"],
-        "unknown":["Kisan", "Health", "Awas", "Beti", "Urja", "Rozgar", "Finance", "Vyapar"],
-    }
-    tags = all_tags.get(lang, all_tags["hi-IN"])
-    queries = [
-        "PM Kisan Samman Nidhi yojana ke baare mein batao aur kaise milega?",
-        "Ayushman Bharat card kaise banwayein aur kya documents chahiye?",
-        "PM Awas Yojana ke liye apply kaise karein?",
-        "Sukanya Samriddhi Yojana ke baare mein batao aur account kaise kholein?",
-        "Ujjwala Yojana ka free gas connection kaise milega?",
-        "MGNREGA job card kaise banwayein aur kya eligibility hai?",
-        "Jan Dhan account kaise kholein aur kya fayde hain?",
-        "Mudra loan ke liye apply kaise karein aur kya eligibility hai?",
-    ]
-    descs = {
-        "hi-IN": ["किसान परिवारों को ₹6000/वर्ष", "₹5 लाख तक मुफ़्त स्वास्थ्य बीमा", "गरीब परिवारों को पक्का घर", "बेटी के लिए बचत योजना", "BPL परिवारों को मुफ्त LPG", "100 दिन रोजगार गारंटी", "जीरो बैलेंस बैंक खाता + बीमा", "छोटे व्यवसाय के लिए ₹10 लाख लोन"],
-        "en-IN": ["₹6000/year for farmer families", "Free health insurance up to ₹5 lakh", "Pucca house for BPL families", "Savings scheme for girl child", "Free LPG for BPL families", "100 days employment guarantee", "Zero balance account + insurance", "Business loans up to ₹10 lakh"],
-        "ta-IN": ["விவசாயிகளுக்கு ₹6000/ஆண்டு", "₹5 லட்சம் வரை இலவச காப்பீடு", "ஏழைகளுக்கு வீடு", "பெண் குழந்தைக்கு சேமிப்பு", "BPL க்கு இலவச LPG", "100 நாள் வேலை உத்தரவாதம்", "ஜீரோ பேலன்ஸ் கணக்கு", "₹10 லட்சம் வணிக கடன்"],
-        "te-IN": ["రైతులకు ₹6000/సంవత్సరం", "₹5 లక్షల ఉచిత భీమా", "BPL కుటుంబాలకు ఇల్లు", "ఆడపిల్లకు పొదుపు", "BPL కు ఉచిత LPG", "100 రోజుల ఉపాధి హామీ", "జీరో బ్యాలెన్స్ ఖాతా", "₹10 లక్షల వ్యాపార రుణం"],
-        "bn-IN": ["কৃষকদের ₹6000/বছর", "₹5 লাখ বিনামূল্যে বীমা", "BPL পরিবারের বাড়ি", "মেয়ের জন্য সঞ্চয়", "BPL কে LPG", "১০০ দিনের কর্মসংস্থান", "জিরো ব্যালেন্স অ্যাকাউন্ট", "₹10 লাখ ব্যবসায়িক ঋণ"],
-        "gu-IN": ["ખેડૂત ₹6000/વર્ષ", "₹5 લાખ મફત વીમો", "BPL ને ઘર", "દીકરી માટે બચત", "BPL ને LPG", "100 દિવસ રોજગારી", "ઝીરો બેલેન્સ ખાતું", "₹10 લાખ ધંધા લોન"],
-        "kn-IN": ["ರೈತರಿಗೆ ₹6000/ವರ್ಷ", "₹5 ಲಕ್ಷ ಉಚಿತ ವಿಮೆ", "BPL ಕುಟುಂಬಗಳಿಗೆ ಮನೆ", "ಹೆಣ್ಣು ಮಗುವಿಗೆ ಉಳಿತಾಯ", "BPL ಗೆ ಉಚಿತ LPG", "100 ದಿನ ಉದ್ಯೋಗ", "ಶೂನ್ಯ ಬ್ಯಾಲೆನ್ಸ್ ಖಾತೆ", "₹10 ಲಕ್ಷ ವ್ಯಾಪಾರ ಸಾಲ"],
-        "mr-IN": ["शेतकऱ्यांना ₹6000/वर्ष", "₹5 लाख मोफत विमा", "BPL ला घर", "मुलीसाठी बचत", "BPL ला LPG", "100 दिवस रोजगार", "शून्य शिल्लक खाते", "₹10 लाखांपर्यंत कर्ज"],
-        "pa-IN": ["ਕਿਸਾਨਾਂ ਨੂੰ ₹6000/ਸਾਲ", "₹5 ਲੱਖ ਮੁਫ਼ਤ ਬੀਮਾ", "BPL ਨੂੰ ਘਰ", "ਧੀ ਲਈ ਬੱਚਤ", "BPL ਨੂੰ LPG", "100 ਦਿਨ ਰੁਜ਼ਗਾਰ", "ਜ਼ੀਰੋ ਬੈਲੇਂਸ ਖਾਤਾ", "₹10 ਲੱਖ ਕਾਰੋਬਾਰ ਕਰਜ਼ਾ"],
-        "unknown": ["Kisan parivaaron ko ₹6000/year", "₹5 lakh tak free health insurance", "Garib parivaaron ko pucca ghar", "Beti ke liye savings scheme", "BPL parivaaron ko free LPG", "100 din ka rozgar guarantee", "Zero balance bank account", "Small business ke liye ₹10 lakh loan"],
-    }
-    d = descs.get(lang, descs["hi-IN"])
-    return [{"icon": icons[i], "name": names[i], "desc": d[i], "tag": tags[i], "query": queries[i]} for i in range(len(names))]
-
-
-LANGUAGES = {
-    "Hindi (हिंदी)": "hi-IN",
-    "English": "en-IN",
-    "Tamil (தமிழ்)": "ta-IN",
-    "Telugu (తెలుగు)": "te-IN",
-    "Bengali (বাংলা)": "bn-IN",
-    "Gujarati (ગુજરાતી)": "gu-IN",
-    "Kannada (ಕನ್ನಡ)": "kn-IN",
-    "Marathi (मराठी)": "mr-IN",
-    "Punjabi (ਪੰਜਾਬੀ)": "pa-IN",
-    "Auto Detect": "unknown",
-}
-
 # ---------- Session State ----------
+def start_conversation(language):
+    """New stored session; its id goes in the URL so a reload or reconnect resumes the chat"""
+    store = get_conversation_store()
+    if "conversation_id" in st.session_state:
+        store.end_session(st.session_state.conversation_id)
+    st.session_state.conversation_id = uuid.uuid4().hex
+    st.query_params["c"] = st.session_state.conversation_id
+    store.start_session(st.session_state.conversation_id, "text", language)
+
+
+def restore_conversation(conversation_id):
+    """Messages of a stored text session (welcome first), or None if there is nothing to resume"""
+    store = get_conversation_store()
+    stored = store.get_session(conversation_id)
+    if stored is None or stored["surface"] != "text":
+        return None
+    st.session_state.conversation_id = conversation_id
+    st.session_state.selected_language = st.session_state.prev_language = stored["language"] or "hi-IN"
+    messages = [{"role": "agent", "content": get_language_pack(st.session_state.selected_language)["welcome"], "time": "Now"}]
+    for turn in store.session_turns(conversation_id):
+        msg = {"role": "user" if turn["role"] == "user" else "agent", "content": turn["content"],
+               "time": time.strftime("%I:%M %p", time.localtime(turn["created_at"]))}
+        if turn["route"] and turn["role"] != "user":
+            msg["route"] = ROUTE_LLM if turn["route"].startswith(ROUTE_LLM) else turn["route"]
+        messages.append(msg)
+    return messages
+
+
+if "messages" not in st.session_state and st.query_params.get("c"):
+    restored = restore_conversation(st.query_params["c"])
+    if restored is not None:
+        st.session_state.messages = restored
+        st.session_state.memory = ConversationMemory()
+        for restored_msg in restored[1:]:
+            st.session_state.memory.observe(restored_msg)
+        st.session_state.memory.compact(restored)
+
 if "selected_language" not in st.session_state:
     st.session_state.selected_language = "hi-IN"
 if "prev_language" not in st.session_state:
@@ -385,15 +76,21 @@ lang = st.session_state.selected_language
 
 # Detect language change → reset chat with new welcome message
 if lang != st.session_state.prev_language:
-    t = UI_TEXT.get(lang, UI_TEXT["hi-IN"])
-    st.session_state.messages = [{"role": "agent", "content": t["welcome"], "time": "Now"}]
+    st.session_state.messages = [{"role": "agent", "content": get_language_pack(lang)["welcome"], "time": "Now"}]
+    st.session_state.memory = ConversationMemory()
+    st.session_state.pop("pending_reply", None)
+    st.session_state.pop("chat_window", None)
     st.session_state.prev_language = lang
+    start_conversation(lang)
 
 if "messages" not in st.session_state:
-    t = UI_TEXT.get(lang, UI_TEXT["hi-IN"])
-    st.session_state.messages = [{"role": "agent", "content": t["welcome"], "time": "Now"}]
+    st.session_state.messages = [{"role": "agent", "content": get_language_pack(lang)["welcome"], "time": "Now"}]
+if "memory" not in st.session_state:
+    st.session_state.memory = ConversationMemory()
+if "conversation_id" not in st.session_state:
+    start_conversation(lang)
 
-T = UI_TEXT.get(lang, UI_TEXT["hi-IN"])
+T = get_language_pack(lang)
 
 # ---------- CSS ----------
 st.markdown("""
@@ -482,35 +179,293 @@ div[data-testid="stForm"] {
 
 
 # ---------- AI Response ----------
-def get_ai_response(user_msg, language):
-    try:
-        from groq import Groq
-        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        lang_names = {v: k for k, v in LANGUAGES.items()}
-        lang_name = lang_names.get(language, "Hindi")
-        system_prompt = f"""You are Sarkar Sahayak, a helpful government scheme awareness assistant for Indian citizens.
+CHAT_MODEL = get_model_router().models["text"]["large"]  # default model
+PROMPT_VERSION = "2"  # bump whenever the system prompt changes, so cached answers are not reused
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "1") != "0"
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "3"))
+MAX_TOKENS = 350
+TEXT_ADMIT_TIMEOUT = float(os.getenv("TEXT_ADMIT_TIMEOUT", "20"))  # longest wait for Groq rate-limit headroom
+ERROR_REPLY = "Maafi chahta hoon, abhi response nahi de pa raha. Error: {}"
+BUSY_REPLY = "Maafi chahta hoon, abhi bahut log sawal pooch rahe hain. Kripya thodi der baad dobara poochiye."
+POLL_SECONDS = 0.25  # chat view refresh while an answer is queued or generating
+CHAT_WINDOW = int(os.getenv("CHAT_WINDOW", "30"))  # messages rendered; older ones load on demand
+HOT_QUICK_QUESTIONS = os.getenv("HOT_QUICK_QUESTIONS") == "1"  # sidebar shows mined questions (hot_questions.py)
+st.session_state.setdefault("chat_window", CHAT_WINDOW)
+
+
+def session_context():
+    """
+    (recent turns, rolling summary) of this session so far: the personal part of a prompt.
+    Call before the new message is added. ((), "") until the user has asked something and
+    nothing is known about them — the welcome alone makes no answer personal.
+    """
+    memory = st.session_state.memory
+    past = st.session_state.messages
+    first_user = next((i for i, msg in enumerate(past) if msg["role"] == "user"), len(past))
+    if first_user == len(past) and not memory.profile:
+        return (), ""
+    return memory.recent_turns(past[first_user:]), memory.summary()
+
+
+def build_llm_messages(user_msg, language, history=(), summary=""):
+    lang_name = LANGUAGE_NAMES.get(language, "Hindi")
+    kb = get_knowledge_base()
+    relevant = kb.retrieve(user_msg, k=RETRIEVAL_TOP_K)
+    facts = format_for_prompt(relevant) if relevant else "None matched; ask what the user needs."
+    system_prompt = f"""You are Sarkar Sahayak, a helpful government scheme awareness assistant for Indian citizens.
 Respond in {lang_name} language. If auto-detect, use Hindi.
 Keep responses concise (3-5 sentences), friendly and easy to understand.
-Key schemes: PM Kisan (₹6000/year), Ayushman Bharat (₹5 lakh health), PM Awas (housing), Sukanya Samriddhi (girl child), Ujjwala (LPG), MGNREGA (100 day job), Jan Dhan (bank account), Mudra (business loan), Atal Pension, Skill India.
+Schemes you cover: {", ".join(kb.names())}.
+Relevant scheme facts:
+{facts}
 Always end with a friendly closing in the response language."""
-        messages = [{"role": "system", "content": system_prompt}]
-        for msg in st.session_state.messages[-6:]:
-            role = "user" if msg["role"] == "user" else "assistant"
-            messages.append({"role": role, "content": msg["content"]})
-        messages.append({"role": "user", "content": user_msg})
-        response = client.chat.completions.create(model="llama-3.3-70b-versatile", messages=messages, max_tokens=350, temperature=0.7)
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"Maafi chahta hoon, abhi response nahi de pa raha. Error: {str(e)[:100]}"
-
-
-def send_message(text):
+    if summary:
+        system_prompt += f"\nConversation summary: {summary}"
+    messages = [{"role": "system", "content": system_prompt}]
+    for msg in history:
+        role = "user" if msg["role"] == "user" else "assistant"
+        messages.append({"role": role, "content": msg["content"]})
+    messages.append({"role": "user", "content": user_msg})
+    return messages
+
+
+def create_completion(messages, priority, timeout, stream=False, model=CHAT_MODEL):
+    """Groq chat completion, started once the rate-limit scheduler admits it; returns (response, grant)"""
+    tokens = sum(estimate_tokens(m["content"]) for m in messages) + MAX_TOKENS
+    grant = get_groq_scheduler().admit(tokens, priority, timeout)
+    response = get_groq_client().chat.completions.create(
+        model=model, messages=messages, max_tokens=MAX_TOKENS, temperature=0.7, stream=stream)
+    if not stream and response.usage:
+        grant.settle(response.usage.total_tokens)
+    return response, grant
+
+
+def fetch_ai_answer(user_msg, language):
+    """Blocking history-free (answer, model) for cache prewarming — lowest priority, so it never delays a user"""
+    messages = build_llm_messages(user_msg, language)
+    _, model, _ = get_model_router().choose(user_msg)
+    response, _ = create_completion(messages, BACKGROUND, timeout=120, model=model)
+    return response.choices[0].message.content, model
+
+
+def fetch_ai_response(user_msg, language):
+    return fetch_ai_answer(user_msg, language)[0]
+
+
+def routed_model(user_msg):
+    """Model the router would send this message to — the response cache is keyed by it"""
+    return get_model_router().choose(user_msg, count=False)[1]
+
+
+def answer_locally(user_msg, language, canned=False):
+    """Intent fast path, then response / semantic cache — returns (answer, route), answer None if the LLM is needed"""
+    decision = get_intent_router().route(user_msg, language)
+    if decision["route"] == ROUTE_FAST_PATH:
+        return decision["answer"], ROUTE_FAST_PATH
+    if canned:
+        cached = get_response_cache().get(user_msg, language, routed_model(user_msg), PROMPT_VERSION)
+        if cached is not None:
+            return cached, "response_cache"
+    else:
+        near = get_semantic_cache().lookup(user_msg, language)
+        if near is not None:
+            return near[0], "semantic_cache"
+    return None, ROUTE_LLM
+
+
+def remember_answer(user_msg, language, canned, answer, model):
+    """
+    Caches are shared by every session: only call with answers from history-free prompts. model is the
+    one the router picks for user_msg — the key lookups use — even when a hedged backup wrote the answer.
+    """
+    if canned:
+        get_response_cache().set(user_msg, language, model, PROMPT_VERSION, answer)
+    else:
+        get_semantic_cache().add(user_msg, language, answer)
+
+
+def completion_pieces(messages, model, timeout):
+    """Text of one completion as it arrives (one piece when not streaming)"""
+    response, grant = create_completion(messages, TEXT, timeout, stream=STREAM_RESPONSES, model=model)
+    if not STREAM_RESPONSES:
+        yield response.choices[0].message.content
+        return
+    try:
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            usage = getattr(getattr(chunk, "x_groq", None), "usage", None)  # Groq sends usage on the last chunk
+            if usage is not None:
+                grant.settle(usage.total_tokens)
+    finally:
+        response.close()
+
+
+def model_pieces(messages, model, timeout):
+    """completion_pieces() tagged with the model, so a hedged answer still says which model wrote it"""
+    pieces = completion_pieces(messages, model, timeout)
+    try:
+        for piece in pieces:
+            yield model, piece
+    finally:
+        pieces.close()
+
+
+def run_completion(job, messages, model, backup_model):
+    """Runs on an LLM executor worker: put the answer into job.text (and its model into job.model), hedging a slow first token if enabled"""
+    timeout = max(0.0, TEXT_ADMIT_TIMEOUT - (time.monotonic() - job.submitted_at))
+    router = get_model_router()
+    if not router.hedge_after:
+        pieces = model_pieces(messages, model, timeout)
+    else:
+        # The backup only goes out if the rate limit has room right now (timeout 0)
+        pieces = hedged_iter(lambda attempt: model_pieces(messages, backup_model if attempt else model,
+                                                          0.0 if attempt else timeout),
+                             router.hedge_after, router)
+    for job.model, piece in pieces:
+        job.append(piece)
+
+
+def failure_reply(error):
+    """Rate limits and admission timeouts are load, not faults — ask the user to retry shortly"""
+    if isinstance(error, AdmissionTimeout) or is_rate_limited(error):
+        return BUSY_REPLY
+    return ERROR_REPLY.format(str(error)[:100])
+
+
+def add_message(msg, route=None, timings=None):
+    """Append a finished message, fold it into the rolling summary and cap stored history"""
+    st.session_state.messages.append(msg)
+    remember_message(msg, route, timings)
+
+
+def remember_message(msg, route=None, timings=None):
+    st.session_state.memory.observe(msg)
+    st.session_state.memory.compact(st.session_state.messages)
+    # Write-behind: queued here, committed by the store's writer thread
+    get_conversation_store().add_turn(
+        st.session_state.conversation_id, "user" if msg["role"] == "user" else "assistant", msg["content"],
+        st.session_state.selected_language, route or msg.get("route"), timings)
+
+
+def send_message(text, canned=False):
     if text.strip():
         now = time.strftime("%I:%M %p")
-        st.session_state.messages.append({"role": "user", "content": text, "time": now})
-        with st.spinner("🤔 Soch raha hoon..."):
-            response = get_ai_response(text, st.session_state.selected_language)
-        st.session_state.messages.append({"role": "agent", "content": response, "time": time.strftime("%I:%M %p")})
+        language = st.session_state.selected_language
+        # Canned prompts go without chat history so the answer can be cached and shared
+        history, summary = ((), "") if canned else session_context()
+        add_message({"role": "user", "content": text, "time": now})
+        started = time.perf_counter()
+        stored_route = None     # busy / error replies are kept apart in the store, so they are never mined as answers
+        try:
+            response, route = answer_locally(text, language, canned)
+            if response is None:
+                messages = build_llm_messages(text, language, history, summary)
+                router = get_model_router()
+                tier, model, _ = router.choose(text)
+                backup_model = router.models["text"][router.backup_tier(tier)]
+                # Identical in-flight requests (same prompt, language and context) share one Groq call
+                key = flight_key(text, language, [model, STREAM_RESPONSES, messages[:-1]])
+                job = get_llm_executor().submit(lambda job: run_completion(job, messages, model, backup_model), key=key)
+        except LLMQueueFull:
+            response, route, stored_route = BUSY_REPLY, ROUTE_LLM, "busy"
+        except Exception as e:
+            response, route, stored_route = failure_reply(e), ROUTE_LLM, "error"
+        if response is not None:
+            add_message({"role": "agent", "content": response, "time": time.strftime("%I:%M %p"), "route": route},
+                        route=stored_route, timings={"answer_ms": round((time.perf_counter() - started) * 1000)})
+            return
+        # The script run returns now; the chat view polls the job (see chat_view)
+        reply = {"role": "agent", "content": "", "time": time.strftime("%I:%M %p"), "route": ROUTE_LLM, "status": job.status}
+        st.session_state.messages.append(reply)
+        st.session_state.pending_reply = {"text": text, "canned": canned, "language": language, "job": job, "reply": reply,
+                                          "route": f"{ROUTE_LLM}:{tier}", "model": model,
+                                          # an answer shaped by this user's history or profile must not reach others
+                                          "shareable": not history and not summary}
+
+
+def sync_pending_reply():
+    """Copy the job's progress into the reply bubble; returns True once the job has finished"""
+    pending = st.session_state.pending_reply
+    job, reply = pending["job"], pending["reply"]
+    reply["content"] = job.text
+    reply["status"] = job.status
+    if not job.finished:
+        return False
+    st.session_state.pop("pending_reply")
+    reply.pop("status")
+    if job.error is None:
+        if pending["shareable"] and job.claim():   # a coalesced job is shared by several sessions; cache its answer once
+            remember_answer(pending["text"], pending["language"], pending["canned"], reply["content"], pending["model"])
+    elif reply["content"]:
+        reply["incomplete"] = True   # keep the partial text
+    else:
+        reply["content"] = failure_reply(job.error)
+    timings = {}
+    if job.started_at is not None and job.finished_at is not None:
+        timings["queue_ms"] = round((job.started_at - job.submitted_at) * 1000)
+        timings["generate_ms"] = round((job.finished_at - job.started_at) * 1000)
+    if job.error is None:
+        route = pending["route"]
+    else:
+        route = "busy" if failure_reply(job.error) == BUSY_REPLY else "error"
+    remember_message(reply, route, timings)
+    return True
+
+
+def render_message_html(msg):
+    """HTML for one bubble, cached on the message until its text or labels change"""
+    time_label = msg.get("time", "") + (" · ⚠️ incomplete" if msg.get("incomplete") else "")
+    if msg.get("status") == QUEUED:
+        time_label += f" · ⏳ queued ({get_llm_executor().queued()} waiting)"
+    elif msg.get("status") == GENERATING:
+        time_label += " · ✍️ generating"
+    if msg.get("route") not in (None, ROUTE_LLM):
+        time_label += f" · ⚡ {msg['route']}"
+    key = (msg["content"], time_label)
+    cached = msg.get("_html")
+    if cached and cached[0] == key:
+        return cached[1]
+    if msg["role"] == "user":
+        html = f'<div class="msg-user"><div><div class="bubble-user">{msg["content"]}</div><div class="msg-time">{time_label}</div></div></div>'
+    else:
+        html = f'<div class="msg-agent"><div class="agent-avatar">🤖</div><div><div class="bubble-agent">{msg["content"]}</div><div class="msg-time">{time_label}</div></div></div>'
+    msg["_html"] = (key, html)
+    return html
+
+
+def render_chat_html(messages, window=None):
+    """Only the last `window` messages are rendered, so a rerun costs the same at any history length"""
+    visible = messages[-window:] if window else messages
+    return '<div class="chat-container">' + "".join(render_message_html(msg) for msg in visible) + '</div>'
+
+
+def quick_questions(language):
+    """Mined quick questions for the language when enabled and available, else the hand-picked ones"""
+    mined = load_hot_questions().get(language, {}).get("quick_questions") if HOT_QUICK_QUESTIONS else None
+    return mined or get_language_pack(language).quick_questions
+
+
+def prewarm_all(prompts):
+    prewarm(get_response_cache(), prompts, fetch_ai_answer, routed_model, PROMPT_VERSION)
+    # The most costly questions callers ask (hot_questions.py), answered afresh without anyone's history
+    prewarm_semantic_cache(get_semantic_cache(), fetch_ai_response)
+
+
+@st.cache_resource
+def start_cache_prewarm():
+    """Fill the response cache for every canned prompt and the semantic cache for mined questions, once per process"""
+    prompts = {
+        code: list(quick_questions(code)) + [card.query for card in get_language_pack(code).cards]
+        for code in LANGUAGES.values()
+    }
+    worker = threading.Thread(target=prewarm_all, args=(prompts,), daemon=True)
+    worker.start()
+    return worker
+
+
+if os.getenv("RESPONSE_CACHE_PREWARM") == "1" and os.getenv("GROQ_API_KEY"):
+    start_cache_prewarm()
 
 
 # =================== SIDEBAR ===================
@@ -524,7 +479,8 @@ with st.sidebar:
     """, unsafe_allow_html=True)
 
     st.markdown(f'<div style="font-size:0.7rem;color:rgba(255,255,255,0.4);text-transform:uppercase;letter-spacing:1.5px;margin-bottom:6px;">{T["lang_label"]}</div>', unsafe_allow_html=True)
-    selected_lang_name = st.selectbox("Language", list(LANGUAGES.keys()), index=0, label_visibility="collapsed")
+    selected_lang_name = st.selectbox("Language", list(LANGUAGES.keys()), label_visibility="collapsed",
+                                      index=list(LANGUAGES.values()).index(st.session_state.selected_language))
     new_lang = LANGUAGES[selected_lang_name]
     if new_lang != st.session_state.selected_language:
         st.session_state.selected_language = new_lang
@@ -533,9 +489,9 @@ with st.sidebar:
     st.markdown('<hr style="border-color:rgba(255,255,255,0.1);margin:0.8rem 0;"/>', unsafe_allow_html=True)
     st.markdown(f'<div style="font-size:0.7rem;color:rgba(255,255,255,0.4);text-transform:uppercase;letter-spacing:1.5px;margin-bottom:8px;">{T["quick_q_label"]}</div>', unsafe_allow_html=True)
 
-    for q in T["quick_questions"]:
+    for q in quick_questions(lang):
         if st.button(f"→ {q}", key=f"qs_{q}", use_container_width=True):
-            send_message(q)
+            send_message(q, canned=True)
             st.rerun()
 
     st.markdown('<hr style="border-color:rgba(255,255,255,0.1);margin:0.8rem 0;"/>', unsafe_allow_html=True)
@@ -547,9 +503,23 @@ with st.sidebar:
     st.markdown(f'<div style="display:flex;align-items:center;gap:8px;font-size:0.78rem;"><span style="{dot_ok if groq_key else dot_err}"></span>{T["status_groq_ok"] if groq_key else T["status_groq_miss"]}</div>', unsafe_allow_html=True)
     st.markdown(f'<div style="display:flex;align-items:center;gap:8px;font-size:0.78rem;margin-top:4px;"><span style="{dot_ok if lk_url else dot_warn}"></span>{T["status_lk_ok"] if lk_url else T["status_lk_miss"]}</div>', unsafe_allow_html=True)
 
+    with st.expander("📊 Groq pool", expanded=False):
+        st.json(pool_stats.snapshot())
+        st.json(get_response_cache().stats())
+        st.json(get_semantic_cache().stats())
+        st.json(st.session_state.memory.stats())
+        st.json(get_llm_executor().stats())
+        st.json(get_groq_scheduler().stats())
+        st.json(get_model_router().stats())
+        st.json(get_conversation_store().stats())
+
     st.markdown('<hr style="border-color:rgba(255,255,255,0.1);margin:0.8rem 0;"/>', unsafe_allow_html=True)
     if st.button(T["clear_btn"], use_container_width=True):
         st.session_state.messages = [{"role": "agent", "content": T["welcome"], "time": "Now"}]
+        st.session_state.memory = ConversationMemory()
+        st.session_state.pop("pending_reply", None)
+        st.session_state.chat_window = CHAT_WINDOW
+        start_conversation(lang)
         st.rerun()
 
 # =================== MAIN CONTENT ===================
@@ -577,14 +547,19 @@ with col_chat:
     </div>
     """, unsafe_allow_html=True)
 
-    chat_html = '<div class="chat-container">'
-    for msg in st.session_state.messages:
-        if msg["role"] == "user":
-            chat_html += f'<div class="msg-user"><div><div class="bubble-user">{msg["content"]}</div><div class="msg-time">{msg.get("time","")}</div></div></div>'
-        else:
-            chat_html += f'<div class="msg-agent"><div class="agent-avatar">🤖</div><div><div class="bubble-agent">{msg["content"]}</div><div class="msg-time">{msg.get("time","")}</div></div></div>'
-    chat_html += '</div>'
-    st.markdown(chat_html, unsafe_allow_html=True)
+    # Only this fragment reruns while an answer is on its way, every POLL_SECONDS
+    @st.fragment(run_every=POLL_SECONDS if st.session_state.get("pending_reply") else None)
+    def chat_view():
+        finished = st.session_state.get("pending_reply") is not None and sync_pending_reply()
+        hidden = len(st.session_state.messages) - st.session_state.chat_window
+        if hidden > 0 and st.button(f'{T["older_btn"]} ({hidden})', key="older_msgs"):
+            st.session_state.chat_window += CHAT_WINDOW
+            st.rerun(scope="fragment")
+        st.markdown(render_chat_html(st.session_state.messages, st.session_state.chat_window), unsafe_allow_html=True)
+        if finished:
+            st.rerun()  # full run stops the polling
+
+    chat_view()
 
     with st.form("chat_form", clear_on_submit=True):
         c1, c2 = st.columns([5, 1])
@@ -598,23 +573,40 @@ with col_chat:
 
 with col_schemes:
     st.markdown(f'<div class="section-title">{T["schemes_title"]}</div>', unsafe_allow_html=True)
-    schemes = get_schemes(lang)
-    for scheme in schemes:
+    for card in T.cards:
         c1, c2 = st.columns([4, 1])
         with c1:
-            st.markdown(f"""
-            <div class="scheme-card">
-                <div class="scheme-icon">{scheme["icon"]}</div>
-                <div class="scheme-name">{scheme["name"]}</div>
-                <div class="scheme-desc">{scheme["desc"]}</div>
-                <span class="scheme-tag">{scheme["tag"]}</span>
-            </div>""", unsafe_allow_html=True)
+            st.markdown(card.html, unsafe_allow_html=True)
         with c2:
             st.write("")
-            if st.button(T["ask_btn"], key=f"sc_{scheme['name']}", use_container_width=True):
-                send_message(scheme["query"])
+            if st.button(T["ask_btn"], key=f"sc_{card.name}", use_container_width=True):
+                send_message(card.query, canned=True)
                 st.rerun()
 
+    with st.expander(T["elig_title"], expanded=False):
+        with st.form("eligibility_form"):
+            e1, e2 = st.columns(2)
+            with e1:
+                occupation = st.selectbox("Occupation", OCCUPATIONS)
+                age = st.number_input("Age", min_value=0, max_value=120, value=35)
+                gender = st.selectbox("Gender", GENDERS)
+            with e2:
+                income = st.number_input("Annual income (₹)", min_value=0, value=100000, step=10000)
+                land = st.number_input("Land (acres)", min_value=0.0, value=0.0, step=0.5)
+                bpl = st.checkbox("BPL card")
+            checked = st.form_submit_button(T["elig_btn"])
+        if checked:
+            profile = {"occupation": occupation, "age": age, "gender": gender, "annual_income": income, "land_acres": land, "bpl": bpl}
+            matches = get_engine().rank(profile)
+            # Score 0: nothing rules the scheme out, but none of its criteria is confirmed either
+            for match in (m for m in matches if m["score"] > 0):
+                st.markdown(f'<div class="scheme-desc">✔️ <strong>{match["name"]}</strong> — {int(match["score"] * 100)}%</div>', unsafe_allow_html=True)
+            unclear = [m["name"] for m in matches if m["score"] == 0]
+            if unclear:
+                st.markdown(f'<div class="scheme-desc">{T["elig_unclear"]}: {", ".join(unclear)}</div>', unsafe_allow_html=True)
+            if not matches:
+                st.markdown(f'<div class="scheme-desc">{T["elig_none"]}</div>', unsafe_allow_html=True)
+
 st.markdown(f"""
 <div style="text-align:center;padding:1.5rem 0 0.5rem;color:#9B9B9B;font-size:0.72rem;border-top:1px solid #E8E2D6;margin-top:1rem;">
     {T["footer"]}
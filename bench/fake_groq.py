@@ -0,0 +1,162 @@
+"""
+Local stand-in for Groq's OpenAI-compatible chat API, with Groq's rate limits.
+
+Answers /openai/v1/chat/completions (streamed or whole) and /openai/v1/models,
+counts requests and tokens per sliding minute like Groq does, sends the same
+x-ratelimit-* headers, and returns 429 with retry-after once a limit is spent.
+A fraction of requests can be made slow to start, to mimic upstream tail latency.
+Point the app or the agent at it with GROQ_BASE_URL=http://127.0.0.1:<port>.
+
+    python -m bench.fake_groq --port 8765 --rpm 30 --tpm 6000
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from conversation_memory import estimate_tokens
+
+WINDOW_SECONDS = 60.0
+
+
+class RateLimits:
+    """Groq-style per-minute request and token counters"""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._lock = threading.Lock()
+        self._requests = deque()   # [time, tokens]
+        self.served = 0
+        self.rejected = 0
+
+    def _expire(self, now):
+        while self._requests and self._requests[0][0] <= now - WINDOW_SECONDS:
+            self._requests.popleft()
+
+    def take(self, tokens: int):
+        """Record a request; returns (allowed, headers)"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            used = sum(t for _, t in self._requests)
+            allowed = len(self._requests) < self.rpm and used + tokens <= self.tpm
+            if allowed:
+                self._requests.append([now, tokens])
+                used += tokens
+                self.served += 1
+            else:
+                self.rejected += 1
+            reset_requests = self._requests[0][0] + WINDOW_SECONDS - now if self._requests else 0.0
+            # Groq frees tokens continuously; approximate with the oldest entry's expiry
+            reset_tokens = reset_requests if used + tokens > self.tpm else 0.0
+            headers = {
+                "x-ratelimit-limit-requests": str(self.rpm),
+                "x-ratelimit-limit-tokens": str(self.tpm),
+                "x-ratelimit-remaining-requests": str(max(0, self.rpm - len(self._requests))),
+                "x-ratelimit-remaining-tokens": str(max(0, self.tpm - used)),
+                "x-ratelimit-reset-requests": f"{reset_requests:.2f}s",
+                "x-ratelimit-reset-tokens": f"{reset_tokens:.2f}s",
+            }
+            if not allowed:
+                headers["retry-after"] = str(max(1, round(reset_requests)))
+            return allowed, headers
+
+
+def make_handler(limits: RateLimits, ttft: float, tokens_per_second: float, reply_words: int,
+                 slow_fraction: float = 0.0, slow_ttft: float = 2.0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status, body, headers=()):
+            out = json.dumps(body).encode()
+            self.send_response(status)
+            for name, value in dict(headers).items():
+                self.send_header(name, value)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+        def _chunk(self, data: bytes):
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def do_GET(self):
+            self._send_json(200, {"object": "list", "data": [{"id": "fake", "object": "model"}]})
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))))
+            model = body.get("model", "fake")
+            max_tokens = body.get("max_tokens") or body.get("max_completion_tokens") or 256
+            prompt_tokens = sum(estimate_tokens(str(m.get("content") or "")) for m in body.get("messages", []))
+            allowed, headers = limits.take(prompt_tokens + max_tokens)
+            if not allowed:
+                self._send_json(429, {"error": {"message": "Rate limit reached", "type": "tokens",
+                                                "code": "rate_limit_exceeded"}}, headers)
+                return
+            words = [f"word{i}" for i in range(min(reply_words, max_tokens))]
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                     "total_tokens": prompt_tokens + len(words)}
+            time.sleep(slow_ttft if random.random() < slow_fraction else ttft)
+            if not body.get("stream"):
+                time.sleep(len(words) / tokens_per_second)
+                self._send_json(200, {
+                    "id": "fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)},
+                                 "finish_reason": "stop"}],
+                    "usage": usage,
+                }, headers)
+                return
+            self.send_response(200)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("content-type", "text/event-stream")
+            self.send_header("transfer-encoding", "chunked")
+            self.end_headers()
+            for i, word in enumerate(words):
+                chunk = {"id": "fake", "object": "chat.completion.chunk", "created": 0, "model": model,
+                         "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                if i == len(words) - 1:
+                    chunk["x_groq"] = {"id": "fake", "usage": usage}
+                self._chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+                time.sleep(1 / tokens_per_second)
+            self._chunk(b"data: [DONE]\n\n")
+            self._chunk(b"")
+
+    return Handler
+
+
+def start_fake_groq(port: int = 0, rpm: int = 30, tpm: int = 6000, ttft: float = 0.2,
+                    tokens_per_second: float = 200.0, reply_words: int = 40,
+                    slow_fraction: float = 0.0, slow_ttft: float = 2.0):
+    """Serve on a background thread; returns (server, limits). server.server_port has the bound port"""
+    limits = RateLimits(rpm, tpm)
+    handler = make_handler(limits, ttft, tokens_per_second, reply_words, slow_fraction, slow_ttft)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="fake_groq").start()
+    return server, limits
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Groq chat API with rate limits")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rpm", type=int, default=30)
+    parser.add_argument("--tpm", type=int, default=6000)
+    parser.add_argument("--ttft", type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--reply-words", type=int, default=40)
+    parser.add_argument("--slow-fraction", type=float, default=0.0, help="share of requests that start slowly")
+    parser.add_argument("--slow-ttft", type=float, default=2.0, help="first-token delay of a slow request")
+    args = parser.parse_args()
+    server, _ = start_fake_groq(args.port, args.rpm, args.tpm, args.ttft, args.tokens_per_second, args.reply_words,
+                                args.slow_fraction, args.slow_ttft)
+    print(f"Fake Groq on http://127.0.0.1:{server.server_port}")
+    threading.Event().wait()
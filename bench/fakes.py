@@ -0,0 +1,238 @@
+"""
+Local stand-ins for Silero VAD, Sarvam STT, Groq LLM and Sarvam TTS.
+
+They speak the LiveKit plugin interfaces, so GovernmentSchemeAgent and
+AgentSession run unchanged, but nothing leaves the process. Speech is detected
+from frame energy: the benchmark caller sends a tone while "speaking" and
+silence otherwise, and tells the STT what it is saying via expect().
+
+Each fake has the latency knobs of the service it replaces:
+    FakeSTT   latency          end of speech → final transcript
+    FakeLLM   ttft, tokens_per_second, reply_words
+    FakeTTS   ttfb, seconds_per_char (audio length), realtime_factor
+"""
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+from livekit import rtc
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, llm, stt, tts, utils, vad
+
+SAMPLE_RATE = 16000
+SPEECH_AMPLITUDE = 3000
+_ENERGY_THRESHOLD = 500
+
+
+def is_speech(frame: rtc.AudioFrame) -> bool:
+    data = np.frombuffer(frame.data, dtype=np.int16)
+    return data.size > 0 and int(np.abs(data).max()) > _ENERGY_THRESHOLD
+
+
+# ---------- VAD ----------
+class FakeVAD(vad.VAD):
+    def __init__(self, min_speech: float = 0.05, min_silence: float = 0.55):
+        super().__init__(capabilities=vad.VADCapabilities(update_interval=0.032))
+        self.min_speech = min_speech
+        self.min_silence = min_silence
+
+    @property
+    def model(self) -> str:
+        return "energy"
+
+    @property
+    def provider(self) -> str:
+        return "bench"
+
+    def stream(self) -> "FakeVADStream":
+        return FakeVADStream(self)
+
+
+class FakeVADStream(vad.VADStream):
+    async def _main_task(self):
+        speaking = False
+        speech_s = silence_s = 0.0
+        samples = 0
+        speech_frames = []
+        async for frame in self._input_ch:
+            if isinstance(frame, self._FlushSentinel):
+                speaking, speech_s, silence_s, speech_frames = False, 0.0, 0.0, []
+                continue
+            samples += frame.samples_per_channel
+            voiced = is_speech(frame)
+            if voiced:
+                speech_s += frame.duration
+                silence_s = 0.0
+            else:
+                silence_s += frame.duration
+                if not speaking:
+                    speech_s = 0.0
+            if speaking or voiced:
+                speech_frames.append(frame)
+
+            def event(kind, **kwargs):
+                return vad.VADEvent(type=kind, samples_index=samples, timestamp=time.time(),
+                                    speech_duration=speech_s, silence_duration=silence_s, **kwargs)
+
+            self._event_ch.send_nowait(event(vad.VADEventType.INFERENCE_DONE, frames=[frame],
+                                             probability=float(voiced), speaking=speaking))
+            if not speaking and speech_s >= self._vad.min_speech:
+                speaking = True
+                self._event_ch.send_nowait(event(vad.VADEventType.START_OF_SPEECH,
+                                                 frames=list(speech_frames), speaking=True))
+            elif speaking and silence_s >= self._vad.min_silence:
+                speaking = False
+                self._event_ch.send_nowait(event(vad.VADEventType.END_OF_SPEECH, frames=speech_frames))
+                speech_s, speech_frames = 0.0, []
+
+
+# ---------- STT ----------
+class FakeSTT(stt.STT):
+    def __init__(self, latency: float = 0.25, endpoint_silence: float = 0.2):
+        super().__init__(capabilities=stt.STTCapabilities(streaming=True, interim_results=True))
+        self.latency = latency
+        self.endpoint_silence = endpoint_silence
+        self._script = deque()
+
+    @property
+    def model(self) -> str:
+        return "fake-saaras"
+
+    @property
+    def provider(self) -> str:
+        return "bench"
+
+    def expect(self, text: str, language: str):
+        """Queue the transcript for the next utterance the caller speaks"""
+        self._script.append((text, language))
+
+    def _next_transcript(self):
+        return self._script.popleft() if self._script else ("", "unknown")
+
+    async def _recognize_impl(self, buffer, *, language=NOT_GIVEN, conn_options):
+        await asyncio.sleep(self.latency)
+        text, lang = self._next_transcript()
+        return stt.SpeechEvent(type=stt.SpeechEventType.FINAL_TRANSCRIPT,
+                               alternatives=[stt.SpeechData(language=lang, text=text)])
+
+    def stream(self, *, language=NOT_GIVEN, conn_options=DEFAULT_API_CONNECT_OPTIONS):
+        return FakeSTTStream(stt=self, conn_options=conn_options)
+
+
+class FakeSTTStream(stt.RecognizeStream):
+    async def _run(self):
+        speaking = False
+        silence_s = speech_s = 0.0
+        pending = set()
+        async for frame in self._input_ch:
+            if isinstance(frame, self._FlushSentinel):
+                continue
+            if is_speech(frame):
+                speech_s += frame.duration
+                silence_s = 0.0
+                if not speaking:
+                    speaking = True
+                    self._event_ch.send_nowait(stt.SpeechEvent(type=stt.SpeechEventType.START_OF_SPEECH))
+            elif speaking:
+                silence_s += frame.duration
+                if silence_s >= self._stt.endpoint_silence:
+                    speaking = False
+                    task = asyncio.create_task(self._finalize(speech_s))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                    speech_s = 0.0
+        await asyncio.gather(*pending)
+
+    async def _finalize(self, speech_s: float):
+        text, lang = self._stt._next_transcript()
+        words = text.split()
+        # One interim with the first half, as Sarvam sends while the caller talks
+        if len(words) > 1:
+            self._event_ch.send_nowait(stt.SpeechEvent(
+                type=stt.SpeechEventType.INTERIM_TRANSCRIPT,
+                alternatives=[stt.SpeechData(language=lang, text=" ".join(words[:len(words) // 2]))]))
+        await asyncio.sleep(self._stt.latency)
+        self._event_ch.send_nowait(stt.SpeechEvent(
+            type=stt.SpeechEventType.FINAL_TRANSCRIPT,
+            alternatives=[stt.SpeechData(language=lang, text=text, confidence=1.0)]))
+        self._event_ch.send_nowait(stt.SpeechEvent(
+            type=stt.SpeechEventType.RECOGNITION_USAGE,
+            recognition_usage=stt.RecognitionUsage(audio_duration=speech_s)))
+        self._event_ch.send_nowait(stt.SpeechEvent(type=stt.SpeechEventType.END_OF_SPEECH))
+
+
+# ---------- LLM ----------
+_REPLY_WORDS = ("Namaste ji PM Kisan mein kisan parivar ko saal mein chhe hazaar rupaye "
+                "teen kishton mein milte hain aur aavedan CSC ya pmkisan portal par hota hai").split()
+
+
+class FakeLLM(llm.LLM):
+    def __init__(self, ttft: float = 0.35, tokens_per_second: float = 250.0, reply_words: int = 30):
+        super().__init__()
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.reply_words = reply_words
+
+    @property
+    def model(self) -> str:
+        return "fake-gpt-oss-20b"
+
+    @property
+    def provider(self) -> str:
+        return "bench"
+
+    def chat(self, *, chat_ctx, tools=None, conn_options=DEFAULT_API_CONNECT_OPTIONS, **kwargs):
+        return FakeLLMStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class FakeLLMStream(llm.LLMStream):
+    async def _run(self):
+        request_id = utils.shortuuid()
+        await asyncio.sleep(self._llm.ttft)
+        words = [_REPLY_WORDS[i % len(_REPLY_WORDS)] for i in range(self._llm.reply_words)]
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(1 / self._llm.tokens_per_second)
+            end = "." if (i + 1) % 12 == 0 or i == len(words) - 1 else ""
+            self._event_ch.send_nowait(llm.ChatChunk(
+                id=request_id, delta=llm.ChoiceDelta(role="assistant", content=f"{word}{end} ")))
+        prompt_tokens = sum(len(str(item.content)) for item in self._chat_ctx.items
+                            if hasattr(item, "content")) // 4
+        self._event_ch.send_nowait(llm.ChatChunk(id=request_id, usage=llm.CompletionUsage(
+            completion_tokens=len(words), prompt_tokens=prompt_tokens, total_tokens=prompt_tokens + len(words))))
+
+
+# ---------- TTS ----------
+class FakeTTS(tts.TTS):
+    def __init__(self, language: str = "hi-IN", ttfb: float = 0.2, seconds_per_char: float = 0.06,
+                 realtime_factor: float = 10.0, sample_rate: int = 24000):
+        super().__init__(capabilities=tts.TTSCapabilities(streaming=False), sample_rate=sample_rate, num_channels=1)
+        self.language = language
+        self.ttfb = ttfb
+        self.seconds_per_char = seconds_per_char
+        self.realtime_factor = realtime_factor
+
+    @property
+    def model(self) -> str:
+        return "fake-bulbul"
+
+    @property
+    def provider(self) -> str:
+        return "bench"
+
+    def synthesize(self, text: str, *, conn_options=DEFAULT_API_CONNECT_OPTIONS):
+        return FakeChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class FakeChunkedStream(tts.ChunkedStream):
+    async def _run(self, output_emitter):
+        fake = self._tts
+        output_emitter.initialize(request_id=utils.shortuuid(), sample_rate=fake.sample_rate,
+                                  num_channels=1, mime_type="audio/pcm")
+        await asyncio.sleep(fake.ttfb)
+        seconds = max(len(self._input_text) * fake.seconds_per_char, 0.2)
+        chunk = bytes(int(fake.sample_rate * 0.1) * 2)   # 100 ms of silence, 16-bit mono
+        for _ in range(int(seconds / 0.1)):
+            output_emitter.push(chunk)
+            await asyncio.sleep(0.1 / fake.realtime_factor)
+        output_emitter.flush()
@@ -0,0 +1,133 @@
+"""
+Burst of text and voice LLM calls against the fake Groq, with and without the scheduler.
+
+Text calls go through the app's pooled Groq client on threads and voice calls
+through the agent's async client, as in production; the fake enforces its own
+RPM / TPM and answers 429 past them. The clients never retry, so every 429 shows.
+With --slow-fraction some upstream calls start slowly; --hedge-ms then shows
+what hedged requests (model_router) do to the tail.
+
+    python -m bench.groq_load --text 40 --voice 10 --rpm 30
+    python -m bench.groq_load --text 40 --voice 10 --rpm 30 --no-scheduler
+    python -m bench.groq_load --text 60 --voice 0 --rpm 1000 --slow-fraction 0.1 --hedge-ms 400
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from bench.fake_groq import start_fake_groq
+from conversation_memory import estimate_tokens
+
+MAX_TOKENS = 100
+PROMPT = [{"role": "system", "content": "You are Sarkar Sahayak."}, {"role": "user", "content": "PM Kisan kya hai?"}]
+
+
+def _record(results, kind, outcome, started):
+    results[kind].append((outcome, time.perf_counter() - started))
+
+
+def _outcome(exc) -> str:
+    from groq_scheduler import AdmissionTimeout, is_rate_limited
+    if isinstance(exc, AdmissionTimeout):
+        return "deadline"
+    return "429" if is_rate_limited(exc) else "error"
+
+
+def run(text_calls: int, voice_calls: int, use_scheduler: bool, text_timeout: float, voice_timeout: float,
+        hedge_after: float = 0.0) -> dict:
+    from groq_client import build_async_openai_client, get_groq_client
+    from groq_scheduler import TEXT, VOICE, get_groq_scheduler
+    from model_router import get_model_router, hedged_iter
+
+    scheduler = get_groq_scheduler()
+    tokens = sum(estimate_tokens(m["content"]) for m in PROMPT) + MAX_TOKENS
+    results = {"text": [], "voice": []}
+
+    def text_attempt(attempt):
+        if use_scheduler:
+            scheduler.admit(tokens, TEXT, 0.0 if attempt else text_timeout)
+        yield get_groq_client().chat.completions.create(model="fake", messages=PROMPT, max_tokens=MAX_TOKENS)
+
+    def text_call():
+        started = time.perf_counter()
+        try:
+            for _ in hedged_iter(text_attempt, hedge_after, get_model_router()) if hedge_after else text_attempt(0):
+                pass
+            _record(results, "text", "ok", started)
+        except Exception as e:
+            _record(results, "text", _outcome(e), started)
+
+    async def voice_call(client):
+        started = time.perf_counter()
+        try:
+            if use_scheduler:
+                await scheduler.admit_async(tokens, VOICE, voice_timeout)
+            stream = await client.chat.completions.create(model="fake", messages=PROMPT, max_tokens=MAX_TOKENS, stream=True)
+            async for _ in stream:
+                pass
+            _record(results, "voice", "ok", started)
+        except Exception as e:
+            _record(results, "voice", _outcome(e), started)
+
+    async def voice_burst():
+        client = build_async_openai_client()
+        await asyncio.sleep(0.1)   # voice turns arrive just after the text burst
+        await asyncio.gather(*(voice_call(client) for _ in range(voice_calls)))
+        await client.close()
+
+    # One untimed call first, so client creation and imports are not in the numbers
+    get_groq_client().chat.completions.create(model="fake", messages=PROMPT, max_tokens=1)
+    started = time.perf_counter()
+    threads = [threading.Thread(target=text_call) for _ in range(text_calls)]
+    for t in threads:
+        t.start()
+    asyncio.run(voice_burst())
+    for t in threads:
+        t.join()
+    report = {"wall_s": round(time.perf_counter() - started, 2), "scheduler": use_scheduler}
+    for kind, rows in results.items():
+        outcomes = {}
+        for outcome, _ in rows:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        ok = sorted(latency for outcome, latency in rows if outcome == "ok")
+        failed = [latency for outcome, latency in rows if outcome != "ok"]
+        report[kind] = {
+            "outcomes": outcomes,
+            "ok_latency_p50_ms": round(statistics.median(ok) * 1000) if ok else None,
+            "ok_latency_p99_ms": round(ok[int(len(ok) * 0.99)] * 1000) if ok else None,
+            "ok_latency_max_ms": round(ok[-1] * 1000) if ok else None,
+            "fail_latency_max_ms": round(max(failed) * 1000) if failed else None,
+        }
+    report["scheduler_stats"] = scheduler.stats()
+    report["hedges"] = get_model_router().stats()["hedges"]
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rate-limit burst against a local fake Groq")
+    parser.add_argument("--text", type=int, default=40, help="concurrent text calls")
+    parser.add_argument("--voice", type=int, default=10, help="concurrent voice calls")
+    parser.add_argument("--rpm", type=int, default=30, help="fake Groq requests per minute")
+    parser.add_argument("--tpm", type=int, default=20000, help="fake Groq tokens per minute")
+    parser.add_argument("--text-timeout", type=float, default=5.0)
+    parser.add_argument("--voice-timeout", type=float, default=3.0)
+    parser.add_argument("--no-scheduler", action="store_true", help="call Groq directly, as before the scheduler")
+    parser.add_argument("--slow-fraction", type=float, default=0.0, help="share of fake calls that start slowly")
+    parser.add_argument("--slow-ttft", type=float, default=2.0)
+    parser.add_argument("--hedge-ms", type=float, default=0.0, help="hedge text calls after this first-token wait")
+    args = parser.parse_args()
+
+    server, limits = start_fake_groq(rpm=args.rpm, tpm=args.tpm, slow_fraction=args.slow_fraction, slow_ttft=args.slow_ttft)
+    os.environ.update({"GROQ_BASE_URL": f"http://127.0.0.1:{server.server_port}", "GROQ_API_KEY": "fake",
+                       "GROQ_RPM": str(args.rpm),
+                       # A fresh budget file, so calls from an earlier run or a running app do not count
+                       "GROQ_BUDGET_PATH": os.path.join(tempfile.mkdtemp(), "groq_budget.sqlite3")})
+    result = run(args.text, args.voice, not args.no_scheduler, args.text_timeout, args.voice_timeout,
+                 args.hedge_ms / 1000)
+    result["fake_groq"] = {"served": limits.served, "rejected_429": limits.rejected}
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,44 @@
+"""
+Streamlit UI timing: cold start and steady-state rerun of app.py.
+
+Uses Streamlit's AppTest, so no browser or server is needed; Groq is not
+called unless a message is sent.
+
+    python -m bench.ui_bench --reruns 50 --language "Tamil (தமிழ்)"
+"""
+import argparse
+import os
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def measure(reruns: int, language: str = None) -> dict:
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    started = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - started
+    if language:
+        [box for box in at.selectbox if language in box.options][0].select(language).run()
+    timings = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {
+        "cold_start_ms": round(cold * 1000, 1),
+        "rerun_p50_ms": round(statistics.median(timings) * 1000, 1),
+        "rerun_p90_ms": round(timings[int(len(timings) * 0.9)] * 1000, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time app.py cold start and reruns")
+    parser.add_argument("--reruns", type=int, default=30)
+    parser.add_argument("--language", help="selector label to switch to before timing reruns")
+    args = parser.parse_args()
+    print(measure(args.reruns, args.language))
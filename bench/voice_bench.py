@@ -0,0 +1,366 @@
+"""
+Offline load test for the voice agent — no LiveKit room, Sarvam or Groq account.
+
+Runs N concurrent AgentSessions of GovernmentSchemeAgent in this process with
+the stand-ins from bench/fakes.py. Each simulated caller waits for the agent to
+finish speaking, pauses, then "says" the next utterance (a tone of the right
+length, or a recorded 16 kHz mono WAV) while the fake STT returns its text.
+Audio is paced in real time, so endpointing and turn-taking behave as on a call.
+
+    python -m bench.voice_bench --sessions 20 --turns 4
+    python -m bench.voice_bench --sessions 50 --llm-ttft 0.6 --json after.json --baseline before.json
+    python -m bench.voice_bench --sessions 20 --tts-cache      # fake TTS behind tts_cache.CachedTTS
+    python -m bench.voice_bench --sessions 20 --record         # turns written to a temporary conversation store
+
+Reports per-stage turn-latency percentiles (the same stages as voice_metrics),
+pipeline overhead (e2e minus the latency the fakes were told to add), sessions
+per busy core and RSS per session. With --baseline, exits 1 if p95 e2e or
+overhead (or RSS per session, at equal --sessions) regressed by more than
+--tolerance.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import wave
+from collections import defaultdict
+
+import numpy as np
+import psutil
+from livekit import rtc
+from livekit.agents.voice import AgentSession, io
+
+from bench.fakes import SAMPLE_RATE, SPEECH_AMPLITUDE, FakeLLM, FakeSTT, FakeTTS, FakeVAD
+from conversation_store import SessionRecorder, get_conversation_store
+from eligibility import get_engine
+from endpointing import AdaptiveEndpointing, session_options, summarize_turns, vad_min_silence
+from greeting_audio import get_greeting_cache
+from intent_router import get_intent_router
+from knowledge_base import get_knowledge_base
+from language_id import summarize_outcomes
+from scheme_awareness_agent import DEFAULT_LANGUAGE, LANGUAGE_MAP, GovernmentSchemeAgent
+from tts_cache import CachedTTS, get_tts_cache
+from voice_metrics import TurnMetrics, summarize
+
+logger = logging.getLogger("voice-bench")
+
+FRAME_MS = 20
+SECONDS_PER_WORD = 0.3
+
+# Mix of FAQ fast-path turns and open questions that go to the LLM
+DEFAULT_UTTERANCES = [
+    {"language": "hi-IN", "text": "PM Kisan ke liye kaun se documents chahiye"},
+    {"language": "hi-IN", "text": "Main ek chhota kisan hoon mere liye kaunsi yojana hai"},
+    {"language": "en-IN", "text": "How much loan can I get under Mudra"},
+    {"language": "en-IN", "text": "My mother is sixty years old what pension can she get"},
+    {"language": "ta-IN", "text": "Ayushman Bharat card eppadi vaanguvathu"},
+    {"language": "hi-IN", "text": "Ujjwala yojana mein gas connection kaise milega"},
+]
+
+
+class BenchAudioInput(io.AudioInput):
+    """Microphone stand-in: a real-time 20 ms frame clock of speech or silence"""
+
+    def __init__(self):
+        super().__init__(label="bench")
+        self._pending = []      # queued speech samples (int16)
+        self.speech_ended = asyncio.Event()
+        self._next_at = None
+
+    def say(self, samples: np.ndarray):
+        self.speech_ended.clear()
+        self._pending.append(samples)
+
+    async def __anext__(self) -> rtc.AudioFrame:
+        now = time.perf_counter()
+        self._next_at = max(self._next_at or now, now - 0.2) + FRAME_MS / 1000
+        await asyncio.sleep(max(self._next_at - now, 0))
+        n = SAMPLE_RATE * FRAME_MS // 1000
+        chunk = np.zeros(n, dtype=np.int16)
+        if self._pending:
+            head = self._pending[0]
+            chunk[:min(n, len(head))] = head[:n]
+            if len(head) <= n:
+                self._pending.pop(0)
+                if not self._pending:
+                    self.speech_ended.set()
+            else:
+                self._pending[0] = head[n:]
+        return rtc.AudioFrame(chunk.tobytes(), SAMPLE_RATE, 1, n)
+
+
+class BenchAudioOutput(io.AudioOutput):
+    """Speaker stand-in: 'plays' each segment for its duration / playback_speed"""
+
+    def __init__(self, playback_speed: float):
+        super().__init__(label="bench", capabilities=io.AudioOutputCapabilities(pause=False))
+        self.playback_speed = playback_speed
+        self._pushed = 0.0
+        self._started = False
+        self._interrupted = asyncio.Event()
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        await super().capture_frame(frame)
+        if not self._started:
+            self._started = True
+            self.on_playback_started(created_at=time.time())
+        self._pushed += frame.duration
+
+    def flush(self) -> None:
+        super().flush()
+        pushed, self._pushed, self._started = self._pushed, 0.0, False
+        if pushed:
+            self._interrupted.clear()
+            asyncio.create_task(self._play(pushed))
+
+    async def _play(self, duration: float):
+        try:
+            await asyncio.wait_for(self._interrupted.wait(), duration / self.playback_speed)
+            interrupted = True
+        except asyncio.TimeoutError:
+            interrupted = False
+        self.on_playback_finished(playback_position=duration, interrupted=interrupted)
+
+    def clear_buffer(self) -> None:
+        self._interrupted.set()
+
+
+def speech_samples(utterance: dict) -> np.ndarray:
+    if utterance.get("wav"):
+        with wave.open(utterance["wav"]) as w:
+            if w.getframerate() != SAMPLE_RATE or w.getnchannels() != 1 or w.getsampwidth() != 2:
+                raise ValueError(f"{utterance['wav']}: need 16 kHz mono 16-bit PCM")
+            return np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+    seconds = max(len(utterance["text"].split()) * SECONDS_PER_WORD, 0.5)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (SPEECH_AMPLITUDE * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+async def wait_for_state(session: AgentSession, state: str, timeout: float):
+    if session.agent_state == state:
+        return
+    reached = asyncio.Event()
+
+    def _on_state(ev):
+        if ev.new_state == state:
+            reached.set()
+
+    session.on("agent_state_changed", _on_state)
+    try:
+        await asyncio.wait_for(reached.wait(), timeout)
+    finally:
+        session.off("agent_state_changed", _on_state)
+
+
+async def run_session(idx: int, args, utterances: list, samples: dict, errors: list, language_outcomes: list,
+                      endpointing_turns: list):
+    stt = FakeSTT(latency=args.stt_latency)
+    llm = FakeLLM(ttft=args.llm_ttft, tokens_per_second=args.tokens_per_second, reply_words=args.reply_words)
+
+    def tts_factory(lang_code):
+        language = LANGUAGE_MAP.get(lang_code, DEFAULT_LANGUAGE)
+        tts = FakeTTS(language=language, ttfb=args.tts_ttfb, seconds_per_char=args.audio_seconds_per_char)
+        return CachedTTS(tts, language) if args.tts_cache else tts
+
+    agent = GovernmentSchemeAgent(vad=FakeVAD(min_silence=vad_min_silence() or 0.55), stt=stt, llm=llm,
+                                  tts_factory=tts_factory)
+    session = AgentSession(**session_options())
+    endpointing = AdaptiveEndpointing(lambda: agent._current_tts_lang)
+    endpointing.attach(session)
+    turn_metrics = TurnMetrics(lambda: agent._current_tts_lang)
+    turn_metrics.attach(session, llm)
+    if args.record:
+        recorder = SessionRecorder(get_conversation_store(), f"bench-{idx}",
+                                   lambda: agent._current_tts_lang, lambda: agent.last_route)
+        recorder.attach(session, {"bench": True})
+        agent.recorder = recorder
+    mic = BenchAudioInput()
+    session.input.audio = mic
+    session.output.audio = BenchAudioOutput(args.playback_speed)
+
+    hesitations = random.Random(idx)
+    await asyncio.sleep(idx * args.ramp)     # stagger arrivals like real calls
+    turn_metrics.mark_joined()
+    try:
+        await session.start(agent=agent, record=False)
+        await wait_for_state(session, "speaking", args.turn_timeout)    # greeting
+        await wait_for_state(session, "listening", args.turn_timeout)
+        for turn in range(args.turns):
+            utterance = utterances[(idx + turn) % len(utterances)]
+            await asyncio.sleep(args.think_time)
+            words = utterance["text"].split()
+            if args.pause and hesitations.random() < args.hesitant_fraction and len(words) > 1:
+                # The caller stops to think halfway through; STT finalizes each part separately
+                half = len(words) // 2
+                for part in (words[:half], words[half:]):
+                    stt.expect(" ".join(part), utterance["language"])
+                mic.say(speech_samples({"text": " ".join(words[:half])}))
+                mic.say(np.zeros(int(args.pause * SAMPLE_RATE), dtype=np.int16))
+                mic.say(speech_samples({"text": " ".join(words[half:])}))
+            else:
+                stt.expect(utterance["text"], utterance["language"])
+                mic.say(speech_samples(utterance))
+            await mic.speech_ended.wait()
+            stopped = time.perf_counter()
+            await wait_for_state(session, "speaking", args.turn_timeout)
+            samples["caller_heard_reply"].append(time.perf_counter() - stopped)
+            await wait_for_state(session, "listening", args.turn_timeout)
+    except asyncio.TimeoutError:
+        errors.append(f"session {idx}: agent did not answer within {args.turn_timeout}s")
+    finally:
+        await session.aclose()
+        if args.record:
+            await recorder.close()
+    for stage, values in turn_metrics.samples.items():
+        samples[stage].extend(values)
+    language_outcomes.extend(agent.language_tracker.outcomes)
+    endpointing_turns.extend(endpointing.turns)
+
+
+def overhead_ms(report: dict, args) -> float:
+    """p50 e2e minus endpointing and the LLM TTFT / TTS TTFB the fakes add on purpose"""
+    stages = report["stages"]
+    if "e2e" not in stages or "end_of_turn" not in stages:
+        return None
+    return round(stages["e2e"]["p50_ms"] - stages["end_of_turn"]["p50_ms"] - 1000 * (args.llm_ttft + args.tts_ttfb))
+
+
+async def run(args) -> dict:
+    utterances = DEFAULT_UTTERANCES
+    if args.utterances:
+        with open(args.utterances, encoding="utf-8") as f:
+            utterances = json.load(f)
+    # Load what the worker's prewarm() loads, so RSS per session counts only session state
+    get_knowledge_base()
+    get_intent_router()
+    get_engine()
+    # Greetings are rendered ahead of time in production (greeting_audio.py); do the same for the fake voice
+    os.environ.setdefault("GREETING_CACHE_DIR", tempfile.mkdtemp(prefix="bench_greetings_"))
+    os.environ.setdefault("TTS_CACHE_DIR", tempfile.mkdtemp(prefix="bench_tts_cache_"))
+    os.environ.setdefault("CONVERSATION_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench_conversations_"),
+                                                               "conversations.sqlite3"))
+    await get_greeting_cache().render(DEFAULT_LANGUAGE, FakeTTS(language=DEFAULT_LANGUAGE, ttfb=args.tts_ttfb,
+                                                                seconds_per_char=args.audio_seconds_per_char))
+
+    proc = psutil.Process()
+    rss_before = proc.memory_info().rss
+    cpu_before = proc.cpu_times()
+    started = time.perf_counter()
+    samples, errors, language_outcomes, endpointing_turns = defaultdict(list), [], [], []
+    peak_rss = rss_before
+
+    async def sample_rss():
+        nonlocal peak_rss
+        while True:
+            peak_rss = max(peak_rss, proc.memory_info().rss)
+            await asyncio.sleep(0.5)
+
+    sampler = asyncio.create_task(sample_rss())
+    await asyncio.gather(*(run_session(i, args, utterances, samples, errors, language_outcomes, endpointing_turns) for i in range(args.sessions)))
+    sampler.cancel()
+
+    wall = time.perf_counter() - started
+    cpu_after = proc.cpu_times()
+    cpu_seconds = (cpu_after.user - cpu_before.user) + (cpu_after.system - cpu_before.system)
+    busy_cores = cpu_seconds / wall
+    report = {
+        "sessions": args.sessions,
+        "turns": len(samples.get("caller_heard_reply", [])),
+        "errors": errors,
+        "wall_seconds": round(wall, 1),
+        "cpu_seconds": round(cpu_seconds, 2),
+        "sessions_per_core": round(args.sessions / busy_cores, 1) if busy_cores else None,
+        "rss_per_session_mb": round((peak_rss - rss_before) / args.sessions / 2**20, 2),
+        "stages": summarize(samples),
+    }
+    report["overhead_p50_ms"] = overhead_ms(report, args)
+    report["language_id"] = summarize_outcomes(language_outcomes)
+    report["endpointing"] = {"mode": args.endpointing, "by_language": summarize_turns(endpointing_turns)}
+    if args.tts_cache:
+        report["tts_cache"] = get_tts_cache().stats()
+    if args.record:
+        report["conversation_store"] = get_conversation_store().stats()
+    return report
+
+
+def regressions(report: dict, baseline: dict, tolerance: float) -> list:
+    found = []
+    checks = [("e2e p95", report["stages"].get("e2e", {}).get("p95_ms"), baseline["stages"].get("e2e", {}).get("p95_ms")),
+              ("overhead p50", report.get("overhead_p50_ms"), baseline.get("overhead_p50_ms"))]
+    if report["sessions"] == baseline.get("sessions"):   # fixed process memory skews small runs
+        checks.append(("rss per session", report.get("rss_per_session_mb"), baseline.get("rss_per_session_mb")))
+    for name, now, before in checks:
+        if now is not None and before and now > before * (1 + tolerance):
+            found.append(f"{name}: {before} → {now}")
+    return found
+
+
+def print_report(report: dict):
+    print(f"\n{report['sessions']} sessions, {report['turns']} turns in {report['wall_seconds']} s")
+    print(f"{'stage':<20}{'n':>6}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    for stage, s in sorted(report["stages"].items()):
+        print(f"{stage:<20}{s['n']:>6}{s['p50_ms']:>9}{s['p95_ms']:>9}{s['max_ms']:>9}")
+    print(f"pipeline overhead p50: {report['overhead_p50_ms']} ms")
+    print(f"sessions per busy core: {report['sessions_per_core']}  "
+          f"(cpu {report['cpu_seconds']} s)   RSS per session: {report['rss_per_session_mb']} MB")
+    for language, row in report["endpointing"]["by_language"].items():
+        print(f"endpointing ({report['endpointing']['mode']}) {language}: {row}")
+    for language, row in report["language_id"].items():
+        print(f"language ID {language}: {row}")
+    if "tts_cache" in report:
+        print(f"TTS cache: {report['tts_cache']}")
+    if "conversation_store" in report:
+        print(f"conversation store: {report['conversation_store']}")
+    for error in report["errors"]:
+        print(f"ERROR {error}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline voice pipeline benchmark")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=3, help="caller turns per session")
+    parser.add_argument("--ramp", type=float, default=0.05, help="seconds between session starts")
+    parser.add_argument("--think-time", type=float, default=0.3, help="caller pause before speaking")
+    parser.add_argument("--utterances", help="JSON list of {text, language, wav?} (wav: 16 kHz mono)")
+    parser.add_argument("--stt-latency", type=float, default=0.25)
+    parser.add_argument("--llm-ttft", type=float, default=0.35)
+    parser.add_argument("--tokens-per-second", type=float, default=250.0)
+    parser.add_argument("--reply-words", type=int, default=30)
+    parser.add_argument("--tts-ttfb", type=float, default=0.2)
+    parser.add_argument("--audio-seconds-per-char", type=float, default=0.06)
+    parser.add_argument("--tts-cache", action="store_true", help="put the fake TTS behind the sentence audio cache")
+    parser.add_argument("--record", action="store_true", help="write every turn to the conversation store")
+    parser.add_argument("--endpointing", choices=("adaptive", "fixed"), default="adaptive")
+    parser.add_argument("--pause", type=float, default=0.0, help="mid-utterance pause of a hesitant caller (s)")
+    parser.add_argument("--hesitant-fraction", type=float, default=0.5, help="share of turns with that pause")
+    parser.add_argument("--playback-speed", type=float, default=4.0, help="agent audio plays this much faster than real time")
+    parser.add_argument("--turn-timeout", type=float, default=30.0)
+    parser.add_argument("--json", help="write the report here")
+    parser.add_argument("--baseline", help="earlier --json report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args(argv)
+    os.environ["ENDPOINTING_MODE"] = args.endpointing
+
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            found = regressions(report, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            return 1
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Rolling conversation memory — long-range context in a bounded prompt.
+
+Facts the user states ("main Bihar ka kisan hoon", "2 acre zameen hai") are
+folded into a small profile as each message arrives, along with the schemes
+discussed. The prompt then carries that summary plus only as many recent turns
+as fit a token budget, and the stored raw history is capped, so prompt size and
+per-session memory stay flat however long the chat runs.
+
+Extraction is keyword / regex based (no LLM call) and covers English, Romanized
+Hindi and Devanagari; profile keys match eligibility.PROFILE_FIELDS plus state.
+It only keeps what the user clearly says about themselves: scheme names are
+masked first ("PM Kisan" is not "kisan"), a negated word ("naukri nahi hai")
+counts for nothing, and an age needs a first-person cue ("meri umar 45",
+"main 45 saal ka hoon") — "meri beti 8 saal ki hai" or "5 saal ka loan" are
+not the user's age.
+
+Config (env):
+    PROMPT_HISTORY_TOKENS   token budget for recent turns in a prompt  (default 600)
+    CHAT_HISTORY_MAX        raw messages kept per session               (default 100)
+"""
+import os
+import re
+
+from knowledge_base import get_knowledge_base
+
+PROMPT_HISTORY_TOKENS = int(os.getenv("PROMPT_HISTORY_TOKENS", "600"))
+CHAT_HISTORY_MAX = int(os.getenv("CHAT_HISTORY_MAX", "100"))
+MAX_SCHEMES = 6
+
+_OCCUPATION_WORDS = {
+    "farmer": ("farmer", "kisan", "kisaan", "kheti", "किसान", "खेती"),
+    "labourer": ("labourer", "laborer", "labour", "mazdoor", "majdoor", "मजदूर", "मज़दूर"),
+    "business": ("business", "shop", "dukaan", "dukan", "vyapar", "व्यापार", "दुकान"),
+    "salaried_govt": ("government job", "govt job", "sarkari naukri", "सरकारी नौकरी"),
+    "salaried_private": ("private job", "private company", "private naukri", "naukri karta", "naukri karti",
+                         "नौकरी करता", "नौकरी करती"),
+    "student": ("student", "chhatra", "padhai", "छात्र", "पढ़ाई"),
+    "unemployed": ("unemployed", "berozgar", "no job", "बेरोजगार"),
+    "homemaker": ("homemaker", "housewife", "grihini", "गृहिणी"),
+}
+_GENDER_WORDS = {
+    "female": ("woman", "mahila", "aurat", "widow", "vidhwa", "महिला", "औरत", "विधवा"),
+    "male": ("purush", "पुरुष"),
+}
+_BPL_WORDS = ("bpl", "garibi rekha", "antyodaya", "गरीबी रेखा", "अंत्योदय")
+_STATES = {
+    "Andhra Pradesh": ("andhra pradesh", "andhra"), "Assam": ("assam", "असम"),
+    "Bihar": ("bihar", "बिहार"), "Chhattisgarh": ("chhattisgarh", "छत्तीसगढ़"),
+    "Delhi": ("delhi", "dilli", "दिल्ली"), "Gujarat": ("gujarat", "गुजरात"),
+    "Haryana": ("haryana", "हरियाणा"), "Himachal Pradesh": ("himachal", "हिमाचल"),
+    "Jharkhand": ("jharkhand", "झारखंड"), "Karnataka": ("karnataka",),
+    "Kerala": ("kerala",), "Madhya Pradesh": ("madhya pradesh", "मध्य प्रदेश"),
+    "Maharashtra": ("maharashtra", "महाराष्ट्र"), "Odisha": ("odisha", "orissa", "ओडिशा"),
+    "Punjab": ("punjab", "पंजाब"), "Rajasthan": ("rajasthan", "राजस्थान"),
+    "Tamil Nadu": ("tamil nadu", "tamilnadu"), "Telangana": ("telangana",),
+    "Uttar Pradesh": ("uttar pradesh", "उत्तर प्रदेश"), "Uttarakhand": ("uttarakhand", "उत्तराखंड"),
+    "West Bengal": ("west bengal", "bengal", "बंगाल"),
+}
+
+_NEGATION_AFTER = ("nahi", "nahin", "nahee", "nai", "नहीं", "नही", "नहि")       # "naukri nahi hai"
+_NEGATION_BEFORE = ("not", "no", "never", "don", "doesn", "didn", "isn", "bina", "बिना")   # "not a farmer", "no job"
+# First-person age statements only; the number is group 1
+_AGE_RES = (
+    re.compile(r" (?:meri|mera|my|मेरी|मेरा) (?:umar|umra|umr|age|उम्र|आयु) (?:(?:is|hai|है|abhi|lagbhag|about|around) )*(\d{1,3}) "),
+    re.compile(r" (?:main|mai|मैं|i am|i m|im) (?:(?:abhi|lagbhag|about|around|अभी) )?(\d{1,3}) "
+               r"(?:saal|sal|years?|yrs?|varsh|वर्ष|साल)(?: old| ka| ki| का| की)"),
+)
+# Words that tie a number to someone or something else ("beti 8 saal ki", "loan 5 saal ke liye")
+_NOT_OWN_AGE = (
+    "beti", "beta", "bete", "bachcha", "bachche", "baccha", "pati", "patni", "pita", "papa", "maa", "mata",
+    "bhai", "behen", "dada", "dadi", "daughter", "son", "child", "husband", "wife", "father", "mother",
+    "बेटी", "बेटा", "बच्चा", "बच्चे", "पति", "पत्नी", "पिता", "माँ", "माता", "भाई", "बहन",
+    "loan", "emi", "kist", "pension", "tenure", "baad", "tak", "liye", "after", "for", "लोन", "किस्त", "बाद", "तक", "लिए",
+    "yojana", "scheme",
+)
+_CLAUSE_BREAKS = ("aur", "and", "but", "par", "lekin", "और", "पर", "लेकिन")
+_SCHEME = "scheme"      # placeholder for masked scheme names
+_LAND_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(acres?|ekad|ekar|एकड़|एकड|hectares?|हेक्टेयर)")
+_INCOME_RE = re.compile(
+    r"(?:income|aamdani|amdani|kamai|salary|आमदनी|आय|कमाई)\D{0,20}?(\d[\d,]*(?:\.\d+)?)\s*"
+    r"(lakh|लाख|hazaar|hazar|हज़ार|हजार|thousand|k\b)?(\D{0,15})")
+_MONTHLY = ("month", "mahina", "mahine", "महीने", "महीना", "monthly")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count: ~4 chars per token for Latin script, ~2 for Indic scripts"""
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii) // 4 + non_ascii // 2 + 1
+
+
+def _negated(padded: str, start: int, end: int) -> bool:
+    """Whether the words at padded[start:end] are negated within two words either side"""
+    return (any(word in _NEGATION_AFTER for word in padded[end:].split()[:2])
+            or any(word in _NEGATION_BEFORE for word in padded[:start].split()[-2:]))
+
+
+def _has_any(padded: str, words) -> bool:
+    """Any of the words stated, and not negated"""
+    for w in words:
+        start = padded.find(f" {w} ")
+        while start != -1:
+            if not _negated(padded, start, start + len(w) + 2):
+                return True
+            start = padded.find(f" {w} ", start + 1)
+    return False
+
+
+def _own_age(padded: str):
+    for pattern in _AGE_RES:
+        for m in pattern.finditer(padded):
+            # The match and the rest of its clause: "main 5 saal ka loan chahta hoon" is a tenure
+            clause = m.group(0).split()
+            for word in padded[m.end():].split()[:3]:
+                if word in _CLAUSE_BREAKS:
+                    break
+                clause.append(word)
+            if not any(word in _NOT_OWN_AGE for word in clause):
+                age = int(m.group(1))
+                if 0 < age < 120:
+                    return age
+    return None
+
+
+def extract_profile(text: str) -> dict:
+    """Profile facts the user states about themselves in one message; only keys that were found"""
+    folded = text.casefold()
+    # Scheme names carry profile words ("PM Kisan", "Kisan Samman Nidhi") that say nothing about the user
+    padded = f" {get_knowledge_base().mask_aliases(text, _SCHEME)} "
+    facts = {}
+    for occupation, words in _OCCUPATION_WORDS.items():
+        if _has_any(padded, words):
+            facts["occupation"] = occupation
+            break
+    for gender, words in _GENDER_WORDS.items():
+        if _has_any(padded, words):
+            facts["gender"] = gender
+    for state, words in _STATES.items():
+        if _has_any(padded, words):
+            facts["state"] = state
+            break
+    if _has_any(padded, _BPL_WORDS):
+        facts["bpl"] = True
+    if (age := _own_age(padded)) is not None:
+        facts["age"] = age
+    if m := _LAND_RE.search(folded):
+        acres = float(m.group(1))
+        facts["land_acres"] = round(acres * 2.47 if m.group(2).startswith(("hect", "हे")) else acres, 2)
+    if m := _INCOME_RE.search(folded):
+        amount = float(m.group(1).replace(",", ""))
+        unit = m.group(2) or ""
+        amount *= 100000 if unit in ("lakh", "लाख") else 1000 if unit else 1
+        if any(w in m.group(3) for w in _MONTHLY):
+            amount *= 12
+        facts["annual_income"] = int(amount)
+    return facts
+
+
+class ConversationMemory:
+    """Per-session profile + schemes discussed; holds no raw messages itself"""
+
+    def __init__(self, max_messages: int = CHAT_HISTORY_MAX, history_tokens: int = PROMPT_HISTORY_TOKENS):
+        self.max_messages = max_messages
+        self.history_tokens = history_tokens
+        self.profile = {}
+        self.schemes = []       # scheme ids, most recently discussed last
+        self.dropped = 0        # raw messages removed by the history cap
+
+    def observe(self, msg: dict):
+        """Fold one finished message into the summary"""
+        if msg["role"] == "user":
+            self.profile.update(extract_profile(msg["content"]))
+        for scheme_id in get_knowledge_base().named_schemes(msg["content"]):
+            if scheme_id in self.schemes:
+                self.schemes.remove(scheme_id)
+            self.schemes.append(scheme_id)
+        del self.schemes[:-MAX_SCHEMES]
+
+    def compact(self, messages: list):
+        """Drop the oldest raw messages past the cap, in place (their facts are already folded in)"""
+        excess = len(messages) - self.max_messages
+        if excess > 0:
+            del messages[:excess]
+            self.dropped += excess
+
+    def summary(self) -> str:
+        parts = []
+        if self.profile:
+            facts = "; ".join(f"{key.replace('_', ' ')}: {value}" for key, value in self.profile.items())
+            parts.append(f"Known about the user: {facts}.")
+        if self.schemes:
+            kb = get_knowledge_base()
+            parts.append("Schemes discussed so far: " + ", ".join(kb.by_id[s]["name"] for s in self.schemes) + ".")
+        return " ".join(parts)
+
+    def recent_turns(self, messages: list, budget: int = None) -> list:
+        """Newest messages that fit the token budget, oldest first"""
+        budget = self.history_tokens if budget is None else budget
+        picked = []
+        for msg in reversed(messages):
+            cost = estimate_tokens(msg["content"])
+            if cost > budget:
+                break
+            budget -= cost
+            picked.append(msg)
+        return picked[::-1]
+
+    def stats(self) -> dict:
+        return {"profile": dict(self.profile), "schemes": list(self.schemes), "dropped_messages": self.dropped}
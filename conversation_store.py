@@ -0,0 +1,295 @@
+"""
+Durable record of every text and voice conversation, in one SQLite file.
+
+Chat history used to live only in st.session_state and voice sessions kept
+nothing, so a restart or reconnect lost the conversation and there was nothing
+to analyse. Both surfaces now record each session and turn here:
+
+    sessions   id, surface (text | voice), language, started / ended, meta
+    turns      session, role, content, language, route taken, timings (ms), time
+
+Writes never wait on the disk: record calls put the row on a queue and return;
+one writer thread per process drains the queue and commits everything pending
+in a single transaction every CONVERSATION_FLUSH_MS. The file is in WAL mode,
+so the Streamlit app, every voice job process and offline jobs read and write
+it concurrently. If the queue is full (the disk has stalled) rows are dropped
+and counted rather than slowing a turn.
+
+Reads are indexed by session, by language and time, and by time. The writer
+also compacts once an hour: sessions older than CONVERSATION_RETENTION_DAYS
+are deleted with their turns and the freed pages are returned to the file
+system.
+
+Config (env):
+    CONVERSATION_DB_PATH          SQLite file                          (default .cache/conversations.sqlite3)
+    CONVERSATION_RETENTION_DAYS   days a session is kept; 0 = forever  (default 90)
+    CONVERSATION_FLUSH_MS         write-behind batch interval          (default 200)
+    CONVERSATION_QUEUE_MAX        pending rows before new ones drop    (default 10000)
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger("conversation-store")
+
+COMPACT_INTERVAL = 3600.0
+_BATCH_MAX = 500
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS sessions ("
+    " id TEXT PRIMARY KEY, surface TEXT NOT NULL, language TEXT,"
+    " started_at REAL NOT NULL, ended_at REAL, meta TEXT)",
+    "CREATE TABLE IF NOT EXISTS turns ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, role TEXT NOT NULL,"
+    " content TEXT NOT NULL, language TEXT, route TEXT, timings TEXT, created_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS turns_session ON turns(session_id, id)",
+    "CREATE INDEX IF NOT EXISTS turns_language_time ON turns(language, created_at)",
+    "CREATE INDEX IF NOT EXISTS turns_time ON turns(created_at)",
+    "CREATE INDEX IF NOT EXISTS sessions_time ON sessions(started_at)",
+)
+
+_START_SESSION = ("INSERT INTO sessions (id, surface, language, started_at, meta) VALUES (?, ?, ?, ?, ?)"
+                  " ON CONFLICT(id) DO UPDATE SET ended_at = NULL")
+_END_SESSION = "UPDATE sessions SET ended_at = ? WHERE id = ?"
+_ADD_TURN = ("INSERT INTO turns (session_id, role, content, language, route, timings, created_at)"
+             " VALUES (?, ?, ?, ?, ?, ?, ?)")
+_COMPACT = "compact"     # queue marker: run the retention policy on the writer thread
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _turn_dict(row) -> dict:
+    turn = dict(row)
+    turn["timings"] = json.loads(turn["timings"]) if turn["timings"] else {}
+    return turn
+
+
+class ConversationStore:
+    def __init__(self, path: str, retention_days: float = 90, flush_interval: float = 0.2, max_queue: int = 10000):
+        self.path = path
+        self.retention_days = retention_days
+        self.flush_interval = flush_interval
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = _connect(path)
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")   # only takes effect on a new file
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        conn.close()
+        self._read_conn = _connect(path)
+        self._read_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.last_batch_ms = 0.0
+        self.compacted_sessions = 0
+        threading.Thread(target=self._writer, daemon=True, name="conversation_store").start()
+
+    # ---------- Write-behind ----------
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def start_session(self, session_id: str, surface: str, language: str = None, meta: dict = None):
+        self._put((_START_SESSION, (session_id, surface, language, time.time(),
+                                    json.dumps(meta, ensure_ascii=False) if meta else None)))
+
+    def end_session(self, session_id: str):
+        self._put((_END_SESSION, (time.time(), session_id)))
+
+    def add_turn(self, session_id: str, role: str, content: str, language: str = None, route: str = None,
+                 timings: dict = None, created_at: float = None):
+        """timings: {name: milliseconds}"""
+        self._put((_ADD_TURN, (session_id, role, content, language, route,
+                               json.dumps(timings) if timings else None, created_at or time.time())))
+
+    def compact(self):
+        self._put((_COMPACT, None))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far is committed (shutdown, scripts); False on timeout"""
+        done = threading.Event()
+        self._put((None, done))
+        return done.wait(timeout)
+
+    def _writer(self):
+        conn = _connect(self.path)
+        next_compact = time.monotonic()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < _BATCH_MAX:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if time.monotonic() >= next_compact:
+                batch.append((_COMPACT, None))
+                next_compact = time.monotonic() + COMPACT_INTERVAL
+            try:
+                self._write_batch(conn, batch)
+            except Exception as e:
+                logger.warning(f"Conversation store lost {len(batch)} queued writes: {e}")
+            for sql, args in batch:
+                if sql is None:
+                    args.set()
+
+    def _write_batch(self, conn, batch):
+        rows = [(sql, args) for sql, args in batch if sql not in (None, _COMPACT)]
+        started = time.perf_counter()
+        if rows:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, args in rows:
+                    conn.execute(sql, args)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self.written += len(rows)
+            self.batches += 1
+            self.last_batch_ms = round((time.perf_counter() - started) * 1000, 2)
+        if any(sql == _COMPACT for sql, _ in batch):
+            self._compact(conn)
+
+    def _compact(self, conn):
+        if not self.retention_days:
+            return
+        cutoff = time.time() - self.retention_days * 86400
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM turns WHERE session_id IN (SELECT id FROM sessions WHERE started_at < ?)", (cutoff,))
+        deleted = conn.execute("DELETE FROM sessions WHERE started_at < ?", (cutoff,)).rowcount
+        conn.execute("DELETE FROM turns WHERE created_at < ?", (cutoff,))   # orphans of lost session rows
+        conn.execute("COMMIT")
+        if deleted:
+            self.compacted_sessions += deleted
+            conn.execute("PRAGMA incremental_vacuum")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            logger.info(f"Conversation store removed {deleted} sessions older than {self.retention_days} days")
+
+    # ---------- Reads ----------
+    def _query(self, sql: str, args=()) -> list:
+        with self._read_lock:
+            return self._read_conn.execute(sql, args).fetchall()
+
+    def session_turns(self, session_id: str) -> list:
+        """Turns of one session, oldest first"""
+        rows = self._query("SELECT * FROM turns WHERE session_id = ? ORDER BY id", (session_id,))
+        return [_turn_dict(row) for row in rows]
+
+    def get_session(self, session_id: str):
+        rows = self._query("SELECT * FROM sessions WHERE id = ?", (session_id,))
+        return dict(rows[0]) if rows else None
+
+    def sessions(self, surface: str = None, language: str = None, since: float = None, until: float = None,
+                 limit: int = 100) -> list:
+        """Most recent sessions first"""
+        where, args = [], []
+        for column, op, value in (("surface", "=", surface), ("language", "=", language),
+                                  ("started_at", ">=", since), ("started_at", "<", until)):
+            if value is not None:
+                where.append(f"{column} {op} ?")
+                args.append(value)
+        sql = "SELECT * FROM sessions" + (" WHERE " + " AND ".join(where) if where else "")
+        return [dict(row) for row in self._query(sql + " ORDER BY started_at DESC LIMIT ?", (*args, limit))]
+
+    def iter_turns(self, role: str = None, language: str = None, since: float = None, until: float = None,
+                   batch_size: int = 1000):
+        """Every matching turn in time order, fetched in batches so memory stays flat on a large file"""
+        conn = _connect(self.path)
+        try:
+            where, args = [], []
+            for column, op, value in (("role", "=", role), ("language", "=", language),
+                                      ("created_at", ">=", since), ("created_at", "<", until)):
+                if value is not None:
+                    where.append(f"{column} {op} ?")
+                    args.append(value)
+            sql = "SELECT * FROM turns" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY created_at"
+            cursor = conn.execute(sql, args)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield _turn_dict(row)
+        finally:
+            conn.close()
+
+    def stats(self) -> dict:
+        try:
+            size_mb = round(os.path.getsize(self.path) / 2 ** 20, 2)
+        except OSError:
+            size_mb = 0.0
+        return {"queued": self._queue.qsize(), "written": self.written, "batches": self.batches,
+                "dropped": self.dropped, "last_batch_ms": self.last_batch_ms,
+                "compacted_sessions": self.compacted_sessions, "size_mb": size_mb}
+
+
+class SessionRecorder:
+    """Records one voice session's user and agent turns as the LiveKit session adds them"""
+
+    # ChatMessage.metrics → timings (ms) column
+    TIMINGS = {
+        "user": ("transcription_delay", "end_of_turn_delay", "on_user_turn_completed_delay"),
+        "assistant": ("llm_node_ttft", "tts_node_ttfb", "e2e_latency"),
+    }
+
+    def __init__(self, store: ConversationStore, session_id: str, language_of, route_of):
+        """language_of() / route_of() return the language spoken and the route the last reply took"""
+        self.store = store
+        self.session_id = session_id
+        self.language_of = language_of
+        self.route_of = route_of
+
+    def attach(self, session, meta: dict = None):
+        self.store.start_session(self.session_id, "voice", self.language_of(), meta)
+        session.on("conversation_item_added", self._on_item_added)
+
+    def _on_item_added(self, ev):
+        self.record(ev.item)
+
+    def record(self, message):
+        """One ChatMessage; called directly for user turns the session never adds (fast path StopResponse)"""
+        role = getattr(message, "role", None)
+        content = getattr(message, "text_content", None)
+        if role not in self.TIMINGS or not content:
+            return
+        report = getattr(message, "metrics", None) or {}
+        timings = {name: round(report[name] * 1000) for name in self.TIMINGS[role] if report.get(name) is not None}
+        self.store.add_turn(self.session_id, role, content, self.language_of(),
+                            self.route_of() if role == "assistant" else None, timings, message.created_at)
+
+    async def close(self):
+        """Shutdown callback: end the session and wait (briefly) for its rows to reach the file"""
+        self.store.end_session(self.session_id)
+        await asyncio.to_thread(self.store.flush, 2.0)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_conversation_store() -> ConversationStore:
+    """Per-process store (one writer thread) over the shared file"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ConversationStore(
+                os.path.abspath(os.getenv("CONVERSATION_DB_PATH", os.path.join(".cache", "conversations.sqlite3"))),
+                retention_days=float(os.getenv("CONVERSATION_RETENTION_DAYS", "90")),
+                flush_interval=float(os.getenv("CONVERSATION_FLUSH_MS", "200")) / 1000,
+                max_queue=int(os.getenv("CONVERSATION_QUEUE_MAX", "10000")),
+            )
+        return _store
@@ -0,0 +1,195 @@
+"""
+Deterministic eligibility scoring — no LLM round trip.
+
+Each scheme in data/schemes.json has a "criteria" list of alternative rule sets
+(a scheme is open to the citizen if ANY rule set passes). Every rule set is one
+column of a set of NumPy arrays, so a batch of N profiles is scored against all
+schemes in one vectorized pass.
+
+Profile fields (all optional — unknown values never disqualify):
+    occupation    one of OCCUPATIONS
+    annual_income rupees per year
+    age           years
+    gender        one of GENDERS
+    bpl           True if the family holds a BPL / antyodaya ration card
+    land_acres    land holding in acres
+
+Bulk mode for field teams:
+    python eligibility.py profiles.csv -o ranked.csv
+"""
+import argparse
+import csv
+import logging
+import sys
+
+import numpy as np
+
+from knowledge_base import get_knowledge_base
+
+logger = logging.getLogger("eligibility")
+
+OCCUPATIONS = ("farmer", "labourer", "business", "salaried_govt", "salaried_private",
+               "student", "unemployed", "homemaker", "other")
+GENDERS = ("female", "male", "other")
+PROFILE_FIELDS = ("occupation", "annual_income", "age", "gender", "bpl", "land_acres")
+
+_RANGES = (("age", "age_min", "age_max"),
+           ("annual_income", None, "income_max"),
+           ("land_acres", "land_min", "land_max"))
+_TRUE = {"1", "true", "yes", "y", "haan", "ha"}
+_FALSE = {"0", "false", "no", "n", "nahi", "na"}
+
+
+class EligibilityEngine:
+    def __init__(self, schemes: list):
+        self.schemes = schemes
+        rules, owners = [], []
+        for i, scheme in enumerate(schemes):
+            for rule in scheme.get("criteria") or [{}]:
+                rules.append(rule)
+                owners.append(i)
+        self._starts = np.searchsorted(owners, np.arange(len(schemes)))
+        r = len(rules)
+
+        self._occ_allowed = np.ones((len(OCCUPATIONS), r), dtype=bool)
+        self._occ_applies = np.zeros(r, dtype=bool)
+        self._gender_allowed = np.ones((len(GENDERS), r), dtype=bool)
+        self._gender_applies = np.zeros(r, dtype=bool)
+        self._bpl_required = np.zeros(r, dtype=bool)
+        self._bounds = {}
+        for field, lo_key, hi_key in _RANGES:
+            lo = np.full(r, -np.inf)
+            hi = np.full(r, np.inf)
+            applies = np.zeros(r, dtype=bool)
+            for j, rule in enumerate(rules):
+                if lo_key and lo_key in rule:
+                    lo[j], applies[j] = rule[lo_key], True
+                if hi_key in rule:
+                    hi[j], applies[j] = rule[hi_key], True
+            self._bounds[field] = (lo, hi, applies)
+        for j, rule in enumerate(rules):
+            if "occupations" in rule:
+                self._occ_allowed[:, j] = [o in rule["occupations"] for o in OCCUPATIONS]
+                self._occ_applies[j] = True
+            if "genders" in rule:
+                self._gender_allowed[:, j] = [g in rule["genders"] for g in GENDERS]
+                self._gender_applies[j] = True
+            self._bpl_required[j] = bool(rule.get("bpl"))
+        self._criteria_count = (self._occ_applies.astype(int) + self._gender_applies + self._bpl_required
+                                + sum(applies for _, _, applies in self._bounds.values()))
+
+    # ---------- Encoding ----------
+    @staticmethod
+    def encode(profiles: list) -> dict:
+        """Column arrays from a list of profile dicts; unknown → -1 / NaN"""
+        def category(value, options):
+            value = str(value or "").strip().lower()
+            return options.index(value) if value in options else -1
+
+        def number(value):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return np.nan
+
+        def flag(value):
+            if isinstance(value, bool):
+                return float(value)
+            value = str(value or "").strip().lower()
+            return 1.0 if value in _TRUE else 0.0 if value in _FALSE else np.nan
+
+        return {
+            "occupation": np.array([category(p.get("occupation"), OCCUPATIONS) for p in profiles], dtype=np.int16),
+            "gender": np.array([category(p.get("gender"), GENDERS) for p in profiles], dtype=np.int16),
+            "bpl": np.array([flag(p.get("bpl")) for p in profiles]),
+            "age": np.array([number(p.get("age")) for p in profiles]),
+            "annual_income": np.array([number(p.get("annual_income")) for p in profiles]),
+            "land_acres": np.array([number(p.get("land_acres")) for p in profiles]),
+        }
+
+    # ---------- Scoring ----------
+    def _categorical(self, codes, allowed, applies):
+        known = codes >= 0
+        ok = allowed[np.where(known, codes, 0)]          # N × R
+        confirmed = known[:, None] & ok & applies
+        failed = known[:, None] & ~ok & applies
+        return failed, confirmed
+
+    def score(self, columns: dict):
+        """Return (eligible, score), both N × S; score is the share of a scheme's criteria confirmed"""
+        failed, confirmed = self._categorical(columns["occupation"], self._occ_allowed, self._occ_applies)
+        g_failed, g_confirmed = self._categorical(columns["gender"], self._gender_allowed, self._gender_applies)
+        failed |= g_failed
+        confirmed_count = confirmed.astype(np.int16) + g_confirmed
+
+        bpl = columns["bpl"][:, None]
+        failed |= (bpl == 0) & self._bpl_required
+        confirmed_count += (bpl == 1) & self._bpl_required
+
+        for field, (lo, hi, applies) in self._bounds.items():
+            x = columns[field][:, None]
+            within = (x >= lo) & (x <= hi)                # NaN compares False either way
+            known = ~np.isnan(x)
+            failed |= known & ~within & applies
+            confirmed_count += within & applies
+
+        rule_ok = ~failed
+        rule_score = np.where(rule_ok, confirmed_count / np.maximum(self._criteria_count, 1), -1.0)
+        eligible = np.logical_or.reduceat(rule_ok, self._starts, axis=1)
+        score = np.maximum.reduceat(rule_score, self._starts, axis=1)
+        return eligible, np.where(eligible, score, 0.0)
+
+    def rank(self, profile: dict, top: int = None) -> list:
+        """Schemes the citizen may be eligible for, most certain first"""
+        eligible, score = self.score(self.encode([profile]))
+        eligible, score = eligible[0], score[0]
+        order = sorted(np.flatnonzero(eligible), key=lambda i: (-score[i], i))
+        ranked = [{"id": self.schemes[i]["id"], "name": self.schemes[i]["name"], "score": round(float(score[i]), 2)}
+                  for i in order]
+        return ranked[:top] if top else ranked
+
+
+_engine = None
+
+
+def get_engine() -> EligibilityEngine:
+    global _engine
+    if _engine is None:
+        _engine = EligibilityEngine(get_knowledge_base().schemes)
+    return _engine
+
+
+def score_csv(in_path: str, out_path: str, chunk_size: int = 50000, top: int = 5) -> int:
+    """Stream a CSV of profiles, append a ranked_schemes column; returns rows scored"""
+    engine = get_engine()
+    ids = np.array([s["id"] for s in engine.schemes])
+    rows_done = 0
+    with open(in_path, newline="", encoding="utf-8") as fin, open(out_path, "w", newline="", encoding="utf-8") as fout:
+        reader = csv.DictReader(fin)
+        writer = csv.DictWriter(fout, fieldnames=list(reader.fieldnames or []) + ["ranked_schemes"])
+        writer.writeheader()
+        while True:
+            chunk = [row for _, row in zip(range(chunk_size), reader)]
+            if not chunk:
+                break
+            eligible, score = engine.score(engine.encode(chunk))
+            # Sort key puts eligible schemes first, highest score first
+            order = np.argsort(-(score + eligible), axis=1, kind="stable")[:, :top]
+            for row, row_order, row_eligible in zip(chunk, order, eligible):
+                row["ranked_schemes"] = ";".join(ids[row_order[row_eligible[row_order]]])
+                writer.writerow(row)
+            rows_done += len(chunk)
+            logger.info(f"Scored {rows_done} profiles")
+    return rows_done
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Score citizen profiles against all schemes")
+    parser.add_argument("profiles", help=f"CSV with columns: {', '.join(PROFILE_FIELDS)}")
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args()
+    count = score_csv(args.profiles, args.output, args.chunk_size, args.top)
+    print(f"Scored {count} profiles → {args.output}", file=sys.stderr)
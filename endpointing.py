@@ -0,0 +1,244 @@
+"""
+Adaptive end-of-turn detection: how long to wait after the caller goes quiet.
+
+With the defaults a turn ends once Silero has heard 0.55 s of silence and the
+session's 0.5 s endpointing delay (counted from the last speech) has passed —
+the same wait for everyone: dead air for fluent callers, and a cut-off for
+callers who stop to think mid-sentence. In adaptive mode Silero reports
+silence after vad_silence (0.25 s) and the session's min_delay is set per
+caller from the pauses they actually make:
+
+    pause      silence inside a turn — the caller went quiet, then carried on
+               before the turn was committed, or within false_cutoff_window
+               after it — a false cut-off
+    estimate   the caller's pause quantile, blended with their language's
+               (seeded from data/endpointing.json, then learned across the
+               process's calls) until the caller has prior_weight pauses
+    delay      estimate + margin, within min_delay_bounds; never below the
+               longest pause that caused a false cut-off on this call (that
+               floor fades by cutoff_floor_decay with each clean turn)
+
+Early LLM start is LiveKit's preemptive generation: the LLM runs on the final
+transcript while the endpointing delay is still counting down, and the result
+is thrown away if the caller resumes speaking.
+
+Each committed turn records the wait actually measured — from the end of speech
+(VAD silence onset, i.e. when Silero reported silence minus its vad_silence)
+to the turn being committed — and the wait saved against the fixed baseline.
+The baseline is not measured: it is what the default settings would have
+waited, max(baseline vad_silence, baseline min_delay), so "saved" is measured
+wait vs. configured baseline (negative when it waited longer). Saved time and
+false cut-offs are per language in the session summary log; Prometheus gets
+the measured and baseline waits as counters. Fixed mode keeps the framework
+defaults but still measures, for A/B comparison.
+
+Config (env):
+    ENDPOINTING_MODE        adaptive | fixed                              (default adaptive)
+    ENDPOINTING_PATH        tuning file                                   (default data/endpointing.json)
+    ENDPOINTING_EARLY_LLM   start the LLM before the turn is committed    (default 1)
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from functools import lru_cache
+
+from prometheus_client import Counter
+
+logger = logging.getLogger("endpointing")
+
+ENDPOINTING_PATH = os.getenv(
+    "ENDPOINTING_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "endpointing.json")
+)
+
+ENDPOINTING_TURNS = Counter("sahayak_endpointing_turns_total", "Committed user turns by outcome",
+                            ["language", "outcome"])
+ENDPOINTING_WAIT_SECONDS = Counter("sahayak_endpointing_wait_seconds_total",
+                                   "Silence waited before committing user turns", ["language"])
+ENDPOINTING_BASELINE_SECONDS = Counter("sahayak_endpointing_baseline_wait_seconds_total",
+                                       "Silence the fixed defaults would have waited for the same turns", ["language"])
+
+
+@lru_cache(maxsize=1)
+def get_endpointing_config() -> dict:
+    with open(ENDPOINTING_PATH, encoding="utf-8") as f:
+        config = json.load(f)
+    config["adaptive"] = os.getenv("ENDPOINTING_MODE", "adaptive").lower() == "adaptive"
+    config["early_llm"] = os.getenv("ENDPOINTING_EARLY_LLM", "1") == "1"
+    return config
+
+
+def vad_min_silence(config: dict = None):
+    """Silero min_silence_duration for this mode, or None to keep Silero's default"""
+    config = config or get_endpointing_config()
+    return config["vad_silence"] if config["adaptive"] else None
+
+
+def session_options(config: dict = None) -> dict:
+    """AgentSession kwargs for the configured mode"""
+    config = config or get_endpointing_config()
+    turn_handling = {"preemptive_generation": {"enabled": config["early_llm"]}}
+    if config["adaptive"]:
+        turn_handling["endpointing"] = {"min_delay": config["baseline"]["min_delay"], "max_delay": config["max_delay"]}
+    return {"turn_handling": turn_handling}
+
+
+def _quantile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class PauseStats:
+    """Recent mid-turn pauses per language, shared by all sessions in the process"""
+
+    def __init__(self, history: int):
+        self._lock = threading.Lock()
+        self._pauses = defaultdict(lambda: deque(maxlen=history))
+
+    def add(self, language: str, seconds: float):
+        with self._lock:
+            self._pauses[language].append(seconds)
+
+    def quantile(self, language: str, q: float):
+        """(quantile, samples) for the language; (None, 0) before any pause is seen"""
+        with self._lock:
+            pauses = list(self._pauses.get(language, ()))
+        return (_quantile(pauses, q), len(pauses)) if pauses else (None, 0)
+
+
+_pause_stats = None
+
+
+def get_pause_stats() -> PauseStats:
+    global _pause_stats
+    if _pause_stats is None:
+        _pause_stats = PauseStats(get_endpointing_config()["history"])
+    return _pause_stats
+
+
+class AdaptiveEndpointing:
+    def __init__(self, language_of, config: dict = None, pause_stats: PauseStats = None):
+        """language_of() returns the language the caller is speaking now"""
+        self.config = config or get_endpointing_config()
+        self.pause_stats = pause_stats or get_pause_stats()
+        self.language_of = language_of
+        self.adaptive = self.config["adaptive"]
+        baseline = self.config["baseline"]
+        self.vad_silence = self.config["vad_silence"] if self.adaptive else baseline["vad_silence"]
+        self.delay = baseline["min_delay"]
+        self.turns = []                 # dicts: language, delay_s, wait_s, saved_s, false_cutoff
+        self._pauses = deque(maxlen=self.config["history"])
+        self._cutoff_floor = 0.0
+        self._session = None
+        self._silence_at = None         # Silero reported silence (vad_silence after the end of speech)
+        self._committed_at = None       # the turn was committed during that silence
+
+    def attach(self, session):
+        self._session = session
+        session.on("user_state_changed", self._on_user_state)
+        session.on("agent_state_changed", self._on_agent_state)
+        self._update()
+
+    def _language_prior(self, language: str) -> float:
+        seeds = self.config["pause_p90"]
+        seed = seeds.get(language, seeds["default"])
+        learned, n = self.pause_stats.quantile(language, self.config["quantile"])
+        if learned is None:
+            return seed
+        weight = n / (n + self.config["prior_weight"])
+        return weight * learned + (1 - weight) * seed
+
+    def estimate(self, language: str) -> float:
+        """Expected longest mid-turn pause (at the configured quantile) for this caller"""
+        prior = self._language_prior(language)
+        if not self._pauses:
+            return prior
+        n = len(self._pauses)
+        weight = n / (n + self.config["prior_weight"])
+        return weight * _quantile(self._pauses, self.config["quantile"]) + (1 - weight) * prior
+
+    def _update(self):
+        if not self.adaptive or self._session is None:
+            return
+        low, high = self.config["min_delay_bounds"]
+        wanted = max(self.estimate(self.language_of()), self._cutoff_floor) + self.config["margin"]
+        delay = round(min(high, max(low, wanted)), 2)
+        if abs(delay - self.delay) >= 0.02:
+            self.delay = delay
+            self._session.update_options(endpointing_opts={"min_delay": delay})
+
+    def _wait(self, vad_silence: float, delay: float) -> float:
+        """Configured silence before a turn is committed: both the VAD and the delay (from the last speech) must pass"""
+        return max(vad_silence, delay)
+
+    def _observe_pause(self, seconds: float):
+        if seconds > self.config["max_delay"]:
+            return      # the caller was not pausing mid-turn
+        self._pauses.append(seconds)
+        self.pause_stats.add(self.language_of(), seconds)
+
+    def _on_user_state(self, ev):
+        now = time.perf_counter()
+        if ev.old_state == "speaking" and ev.new_state == "listening":
+            self._silence_at, self._committed_at = now, None
+            return
+        if ev.new_state != "speaking":
+            return
+        if self._silence_at is not None:
+            pause = now - self._silence_at + self.vad_silence
+            if self._committed_at is None:
+                self._observe_pause(pause)
+            elif now - self._committed_at <= self.config["false_cutoff_window"] and self.turns:
+                turn = self.turns[-1]
+                turn["false_cutoff"] = True
+                ENDPOINTING_TURNS.labels(language=turn["language"], outcome="false_cutoff").inc()
+                self._observe_pause(pause)
+                self._cutoff_floor = max(self._cutoff_floor, pause)
+                logger.info(f"False cut-off after {pause * 1000:.0f} ms pause; delay was {turn['delay_s'] * 1000:.0f} ms")
+            else:
+                self._cutoff_floor *= self.config["cutoff_floor_decay"]   # the last turn ended cleanly
+        self._silence_at = self._committed_at = None
+        self._update()
+
+    def _on_agent_state(self, ev):
+        # "speaking" without "thinking" is a fast-path answer, which also commits the turn
+        if ev.new_state not in ("thinking", "speaking") or self._silence_at is None or self._committed_at is not None:
+            return
+        self._committed_at = time.perf_counter()
+        language = self.language_of()
+        baseline = self.config["baseline"]
+        waited = self._committed_at - self._silence_at + self.vad_silence     # measured: end of speech → commit
+        baseline_wait = self._wait(baseline["vad_silence"], baseline["min_delay"])
+        self.turns.append({"language": language, "delay_s": self.delay, "wait_s": waited,
+                           "saved_s": baseline_wait - waited, "false_cutoff": False})
+        ENDPOINTING_TURNS.labels(language=language, outcome="committed").inc()
+        ENDPOINTING_WAIT_SECONDS.labels(language=language).inc(waited)
+        ENDPOINTING_BASELINE_SECONDS.labels(language=language).inc(baseline_wait)
+
+    def summary(self) -> dict:
+        return summarize_turns(self.turns)
+
+    async def log_summary(self):
+        logger.info(f"Session endpointing summary (delay now {self.delay * 1000:.0f} ms): {self.summary()}")
+
+
+def summarize_turns(turns) -> dict:
+    """Per language: turns, false cut-offs, measured wait, and wait saved against the configured fixed baseline"""
+    by_language = defaultdict(list)
+    for turn in turns:
+        by_language[turn["language"]].append(turn)
+    out = {}
+    for language, rows in sorted(by_language.items()):
+        cutoffs = sum(row["false_cutoff"] for row in rows)
+        saved = [row["saved_s"] for row in rows]
+        out[language] = {
+            "turns": len(rows),
+            "false_cutoffs": cutoffs,
+            "false_cutoff_rate": round(cutoffs / len(rows), 3),
+            "wait_p50_ms": round(_quantile([row["wait_s"] for row in rows], 0.5) * 1000),
+            "saved_ms_per_turn": round(sum(saved) / len(rows) * 1000),
+            "delay_p50_ms": round(_quantile([row["delay_s"] for row in rows], 0.5) * 1000),
+        }
+    return out
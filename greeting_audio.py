@@ -0,0 +1,215 @@
+"""
+Pre-rendered opening line, played the moment a caller joins.
+
+The greeting is fixed text, yet every call used to generate it with the LLM and
+then synthesize it, so time-to-first-audio on join was a full LLM + TTS round
+trip. Now the text per language lives in data/greetings.json and its audio is
+rendered once per (text, language, TTS model, speaker): kept as a WAV under
+GREETING_CACHE_DIR and in process memory, and handed to session.say() as
+ready frames — no LLM, no TTS request. A miss (first call after a text or
+voice change) synthesizes once, saves, and plays; later calls and other worker
+processes read the file.
+
+Render ahead of a deploy so even the first call is a hit (needs SARVAM_API_KEY):
+
+    python greeting_audio.py --languages hi-IN,en-IN
+
+Config (env):
+    GREETING_CACHE_DIR   rendered greetings      (default .cache/greetings)
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import wave
+from functools import lru_cache
+
+from livekit import rtc
+
+logger = logging.getLogger("greeting-audio")
+
+GREETINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "greetings.json")
+FRAME_MS = 20
+
+
+@lru_cache(maxsize=1)
+def get_greetings() -> dict:
+    with open(GREETINGS_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def tts_voice(tts) -> tuple:
+    """(model, speaker) of a TTS instance — the parts of the voice that change the audio"""
+    speaker = getattr(tts, "speaker", None) or getattr(getattr(tts, "_opts", None), "speaker", None) or "default"
+    return tts.model, speaker
+
+
+class RenderedAudio:
+    """16-bit PCM held as one buffer; frames() slices it without copying"""
+
+    def __init__(self, pcm: bytes, sample_rate: int, num_channels: int):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / (2 * self.num_channels * self.sample_rate)
+
+    async def frames(self):
+        view = memoryview(self.pcm)
+        samples = self.sample_rate * FRAME_MS // 1000
+        step = samples * 2 * self.num_channels
+        for start in range(0, len(view), step):
+            chunk = view[start:start + step]
+            yield rtc.AudioFrame(chunk, self.sample_rate, self.num_channels, len(chunk) // (2 * self.num_channels))
+
+
+class GreetingCache:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._memory = {}    # key -> RenderedAudio
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.rendered = 0
+        self.failed = 0
+
+    @staticmethod
+    def key(text: str, language: str, model: str, speaker: str) -> str:
+        raw = "\x1f".join((text, language, model, speaker))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def _read(self, key: str):
+        """Audio from disk, or None; a damaged file is deleted so the next call renders it again"""
+        path = self._path(key)
+        try:
+            with wave.open(path, "rb") as f:
+                frames = f.getnframes()
+                pcm = f.readframes(frames)
+                if f.getsampwidth() != 2 or len(pcm) != frames * 2 * f.getnchannels():
+                    raise wave.Error("not 16-bit PCM or shorter than its header says")
+                return RenderedAudio(pcm, f.getframerate(), f.getnchannels())
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, wave.Error) as e:
+            logger.warning(f"Discarding damaged greeting {path}: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            return None
+
+    def _write(self, key: str, audio: RenderedAudio):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self._path(key)}.{os.getpid()}.tmp"
+        with wave.open(tmp, "wb") as f:
+            f.setnchannels(audio.num_channels)
+            f.setsampwidth(2)
+            f.setframerate(audio.sample_rate)
+            f.writeframes(audio.pcm)
+        os.replace(tmp, self._path(key))   # atomic, so a concurrent reader never sees half a file
+
+    def lookup(self, language: str, model: str, speaker: str):
+        """Rendered greeting from memory or disk, or None"""
+        text = get_greetings().get(language)
+        if text is None:
+            return None
+        key = self.key(text, language, model, speaker)
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self.memory_hits += 1
+                return audio
+        audio = self._read(key)
+        if audio is not None:
+            with self._lock:
+                self._memory[key] = audio
+                self.disk_hits += 1
+        return audio
+
+    def preload(self, languages, model: str, speaker: str) -> int:
+        """Load every rendered greeting for these languages into memory (sync; used in process prewarm)"""
+        return sum(self.lookup(language, model, speaker) is not None for language in languages)
+
+    async def render(self, language: str, tts) -> RenderedAudio:
+        """Synthesize the greeting with this TTS and store it"""
+        text = get_greetings()[language]
+        started = time.perf_counter()
+        frames = []
+        async with tts.synthesize(text) as stream:
+            async for ev in stream:
+                frames.append(ev.frame)
+        combined = rtc.combine_audio_frames(frames)
+        audio = RenderedAudio(bytes(combined.data.cast("B")), combined.sample_rate, combined.num_channels)
+        key = self.key(text, language, *tts_voice(tts))
+        self._write(key, audio)
+        with self._lock:
+            self._memory[key] = audio
+            self.rendered += 1
+        logger.info(f"Rendered {language} greeting ({audio.duration:.1f} s audio) "
+                    f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return audio
+
+    async def get(self, language: str, tts):
+        """(text, audio) for this language and voice; audio is None if it could not be rendered"""
+        text = get_greetings().get(language)
+        if text is None:
+            return None, None
+        audio = self.lookup(language, *tts_voice(tts))
+        if audio is None:
+            try:
+                audio = await self.render(language, tts)
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Greeting render failed for {language}: {e}")
+        return text, audio
+
+    def stats(self) -> dict:
+        return {"in_memory": len(self._memory), "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits, "rendered": self.rendered, "failed": self.failed}
+
+
+_cache = None
+
+
+def get_greeting_cache() -> GreetingCache:
+    global _cache
+    if _cache is None:
+        _cache = GreetingCache(os.path.abspath(os.getenv("GREETING_CACHE_DIR", os.path.join(".cache", "greetings"))))
+    return _cache
+
+
+async def _render_all(languages):
+    from dotenv import load_dotenv
+    from livekit.agents import utils
+    from livekit.plugins import sarvam
+
+    from tts_pool import TTS_MODEL, TTS_SPEAKER
+
+    load_dotenv()
+    cache = get_greeting_cache()
+    async with utils.http_context.open():
+        for language in languages:
+            if cache.lookup(language, TTS_MODEL, TTS_SPEAKER) is not None:
+                print(f"{language}: already rendered")
+                continue
+            tts = sarvam.TTS(target_language_code=language, model=TTS_MODEL, speaker=TTS_SPEAKER)
+            try:
+                audio = await cache.render(language, tts)
+                print(f"{language}: {audio.duration:.1f} s")
+            finally:
+                await tts.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render greeting audio into the greeting cache")
+    parser.add_argument("--languages", default=",".join(get_greetings()), help="comma-separated language codes")
+    args = parser.parse_args()
+    asyncio.run(_render_all([code.strip() for code in args.languages.split(",") if code.strip()]))
@@ -0,0 +1,171 @@
+"""
+Process-wide Groq client with a keep-alive connection pool.
+
+Every Streamlit session (and every rerun) shares one client, so turns reuse
+warm TLS connections instead of paying a handshake per message. Responses are
+fed to the GroqScheduler so its budget follows Groq's rate-limit headers; the
+voice agent's async client (build_async_openai_client) does too. Neither client
+retries inside the SDK: a retry there would skip admission, so callers retry
+through the scheduler instead.
+
+Config (env):
+    GROQ_CONNECT_TIMEOUT   seconds to open a connection      (default 5)
+    GROQ_READ_TIMEOUT      seconds to wait for response data  (default 30)
+    GROQ_MAX_CONNECTIONS   pool size                          (default 20)
+    GROQ_KEEPALIVE         idle keep-alive connections        (default 10)
+    GROQ_KEEPALIVE_EXPIRY  seconds an idle connection lives   (default 60)
+    GROQ_BASE_URL          API root, e.g. a local fake Groq   (default https://api.groq.com)
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import httpx
+
+from groq_scheduler import get_groq_scheduler
+
+logger = logging.getLogger("groq-client")
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class PoolStats:
+    """Counters for connection reuse and per-request latency (connect / TTFB)"""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.connect_ms = deque(maxlen=window)
+        self.ttfb_ms = deque(maxlen=window)
+
+    def record(self, connect_ms, tls: bool, ttfb_ms):
+        with self._lock:
+            self.requests += 1
+            if connect_ms is not None:
+                self.connections_opened += 1
+                self.connect_ms.append(connect_ms)
+            if tls:
+                self.tls_handshakes += 1
+            if ttfb_ms is not None:
+                self.ttfb_ms.append(ttfb_ms)
+
+    @staticmethod
+    def _p50(samples):
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return round(ordered[len(ordered) // 2], 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_reused": self.requests - self.connections_opened,
+                "connections_opened": self.connections_opened,
+                "tls_handshakes": self.tls_handshakes,
+                "connect_ms_p50": self._p50(self.connect_ms),
+                "ttfb_ms_p50": self._p50(self.ttfb_ms),
+            }
+
+
+pool_stats = PoolStats()
+
+
+class _RequestTrace:
+    """httpcore trace callback — times TCP/TLS connect and time to first byte"""
+
+    def __init__(self):
+        self.marks = {}
+
+    def __call__(self, event_name: str, info: dict):
+        self.marks[event_name] = time.perf_counter()
+
+    def _span(self, start_suffix: str, end_suffix: str):
+        start = next((v for k, v in self.marks.items() if k.endswith(start_suffix)), None)
+        end = next((v for k, v in self.marks.items() if k.endswith(end_suffix)), None)
+        if start is None or end is None:
+            return None
+        return (end - start) * 1000
+
+    def finish(self):
+        connect_start = self.marks.get("connection.connect_tcp.started")
+        connect_end = self.marks.get("connection.start_tls.complete") or self.marks.get("connection.connect_tcp.complete")
+        connect_ms = (connect_end - connect_start) * 1000 if connect_start and connect_end else None
+        tls = "connection.start_tls.complete" in self.marks
+        ttfb_ms = self._span("send_request_headers.started", "receive_response_headers.complete")
+        pool_stats.record(connect_ms, tls, ttfb_ms)
+
+
+def _on_request(request: httpx.Request):
+    trace = _RequestTrace()
+    request.extensions["trace"] = trace
+    request.extensions["sahayak_trace"] = trace
+
+
+def _on_response(response: httpx.Response):
+    trace = response.request.extensions.get("sahayak_trace")
+    if trace is not None:
+        trace.finish()
+    get_groq_scheduler().on_response(response)
+
+
+def build_http_client() -> httpx.Client:
+    """Pooled HTTP client with keep-alive and explicit timeouts"""
+    timeout = httpx.Timeout(
+        _env_float("GROQ_READ_TIMEOUT", 30.0),
+        connect=_env_float("GROQ_CONNECT_TIMEOUT", 5.0),
+    )
+    limits = httpx.Limits(
+        max_connections=int(_env_float("GROQ_MAX_CONNECTIONS", 20)),
+        max_keepalive_connections=int(_env_float("GROQ_KEEPALIVE", 10)),
+        keepalive_expiry=_env_float("GROQ_KEEPALIVE_EXPIRY", 60.0),
+    )
+    return httpx.Client(
+        timeout=timeout,
+        limits=limits,
+        event_hooks={"request": [_on_request], "response": [_on_response]},
+    )
+
+
+def build_async_openai_client():
+    """OpenAI-compatible async client for livekit's groq.LLM, reporting rate-limit headers to the scheduler"""
+    import openai
+    return openai.AsyncClient(
+        api_key=os.getenv("GROQ_API_KEY"),
+        base_url=os.getenv("GROQ_BASE_URL", "https://api.groq.com").rstrip("/") + "/openai/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(
+            timeout=httpx.Timeout(connect=15.0, read=5.0, write=5.0, pool=5.0),
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=50, keepalive_expiry=120),
+            event_hooks={"response": [get_groq_scheduler().on_response_async]},
+        ),
+    )
+
+
+def get_groq_client():
+    """Return the shared Groq client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from groq import Groq
+                _client = Groq(
+                    api_key=os.getenv("GROQ_API_KEY"),
+                    http_client=build_http_client(),
+                    max_retries=0,   # retries must be admitted by the scheduler like any call
+                )
+                logger.info("Created shared Groq client")
+    return _client
@@ -0,0 +1,337 @@
+"""
+Rate-limit-aware admission for Groq calls, shared by every process on the host.
+
+Groq enforces requests-per-minute and tokens-per-minute per API key and answers
+with 429 once either is spent; before this, each caller fired independently and
+the UI showed the 429 as an error. Every call now asks the scheduler first:
+
+    budget    — sliding 60 s windows of requests and (estimated) tokens, kept
+                under GROQ_RPM / GROQ_TPM. A TPM left unset is learned from
+                Groq's x-ratelimit-limit-tokens header.
+    headers   — each response's x-ratelimit-remaining-* / reset-* headers
+                tighten the budget to what Groq says is actually left.
+    429       — all admissions pause for retry-after (or the reset header, or
+                an exponential delay when neither is sent) plus random jitter,
+                so waiting callers do not retry in lockstep.
+    priority  — waiters are served VOICE, then TEXT, then BACKGROUND, FIFO
+                within a class, so a live call never waits behind a chat turn
+                or a cache prewarm. Text and background calls may also only
+                use (1 - GROQ_VOICE_RESERVE) of the budget, so a burst of chat
+                cannot spend the headroom a caller arriving a moment later needs.
+    deadline  — a caller passes how long it can wait. If the budget cannot
+                free up in time it gets AdmissionTimeout at once rather than
+                after the wait, and can fall back (a "busy" reply) instead.
+
+The window, the waiting queue and what Groq's headers said live in one SQLite
+file (GROQ_BUDGET_PATH), so the Streamlit app and every LiveKit job process —
+the worker runs each call in its own process — draw on the same budget, and a
+caller waiting in one process is still served before a chat turn in another.
+Each admission attempt is one short write transaction. Give every process the
+key's full limits; only schedulers on other hosts need a split of them.
+
+Config (env):
+    GROQ_RPM            requests per minute for the key         (default 30)
+    GROQ_TPM            tokens per minute for the key           (default: from headers)
+    GROQ_BACKOFF_BASE   first 429 delay without retry-after, s  (default 1)
+    GROQ_BACKOFF_MAX    cap on that exponential delay, s        (default 30)
+    GROQ_VOICE_RESERVE  budget share only voice calls may use   (default 0.2)
+    GROQ_BUDGET_PATH    SQLite file shared by the processes     (default .cache/groq_budget.sqlite3)
+"""
+import asyncio
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger("groq-scheduler")
+
+VOICE = 0
+TEXT = 1
+BACKGROUND = 2
+PRIORITY_NAMES = {VOICE: "voice", TEXT: "text", BACKGROUND: "background"}
+
+WINDOW_SECONDS = 60.0
+JITTER = 0.25           # pauses are stretched by up to this fraction, at random
+WAITER_TTL = 2.0        # a waiter not seen for this long belongs to a dead process and is dropped
+_MAX_SLEEP = 0.05       # a waiter queued behind another re-checks this often
+_POLL = 0.25            # a waiter blocked on the budget re-checks (and stays fresh) this often
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS calls ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, at REAL NOT NULL, tokens INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS waiters ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, priority INTEGER NOT NULL, seen_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value REAL NOT NULL)",
+)
+_SET_STATE = "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)"
+
+
+class AdmissionTimeout(Exception):
+    """Raised by admit() when the call cannot be started before its deadline"""
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True for a Groq / OpenAI SDK 429 error, without importing either SDK"""
+    return getattr(exc, "status_code", None) == 429
+
+
+def parse_duration(value) -> float:
+    """Groq reset headers look like "7.66s", "2m59.56s" or "120ms"; retry-after is plain seconds"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+class Grant:
+    """One admitted call; settle() replaces the token estimate with real usage"""
+
+    def __init__(self, scheduler, call_id: int, waited: float):
+        self._scheduler = scheduler
+        self.call_id = call_id
+        self.waited = waited
+
+    def settle(self, total_tokens: int):
+        if total_tokens:
+            self._scheduler._settle(self.call_id, total_tokens)
+
+
+class GroqScheduler:
+    def __init__(self, rpm: int, tpm: int = None, backoff_base: float = 1.0, backoff_max: float = 30.0,
+                 voice_reserve: float = 0.2, path: str = ".cache/groq_budget.sqlite3"):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._tpm_from_headers = tpm is None
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.voice_reserve = voice_reserve
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")   # a budget lost in a power cut is harmless
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        # Counters below are this process's own; the budget itself is in the file
+        self.admitted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.timed_out = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.rate_limited = 0
+        self.wait_ms = deque(maxlen=200)
+
+    def _write(self, work):
+        """Run work(conn, now) in one write transaction across all processes; caller holds the lock"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(self._conn, time.time())
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        return result
+
+    # ── budget ──────────────────────────────────────────────────────────
+    def _wait_needed(self, conn, tokens: int, priority: int, now: float, state: dict) -> float:
+        """Seconds until a call of this size fits every limit (0 = now)"""
+        conn.execute("DELETE FROM calls WHERE at <= ?", (now - WINDOW_SECONDS,))
+        window = conn.execute("SELECT at, tokens FROM calls ORDER BY at, id").fetchall()
+        window_tokens = sum(spent for _, spent in window)
+        share = 1.0 if priority == VOICE else 1.0 - self.voice_reserve
+        tpm = state.get("tpm", self.tpm) if self._tpm_from_headers else self.tpm
+        rpm = max(1, int(self.rpm * share)) if self.rpm else None
+        tpm = int(tpm * share) if tpm else None
+        wait = max(0.0, state.get("paused_until", 0.0) - now)
+        if rpm and len(window) >= rpm:
+            wait = max(wait, window[len(window) - rpm][0] + WINDOW_SECONDS - now)
+        if tpm and window and window_tokens + tokens > tpm:
+            # Wait for enough old calls to age out; a call larger than the whole budget waits for an empty window
+            excess = window_tokens + tokens - tpm
+            release_at = window[-1][0]
+            for admitted_at, spent in window:
+                excess -= spent
+                if excess <= 0:
+                    release_at = admitted_at
+                    break
+            wait = max(wait, release_at + WINDOW_SECONDS - now)
+        server_tokens = state.get("server_tokens")
+        if server_tokens is not None and now < state.get("server_reset", 0.0) and tokens > server_tokens:
+            wait = max(wait, state["server_reset"] - now)
+        return wait
+
+    def _settle(self, call_id: int, total_tokens: int):
+        with self._lock:
+            self._write(lambda conn, now: conn.execute("UPDATE calls SET tokens = ? WHERE id = ?",
+                                                       (total_tokens, call_id)))
+            self._cond.notify_all()
+
+    # ── admission ───────────────────────────────────────────────────────
+    def _enqueue(self, priority: int) -> int:
+        with self._lock:
+            return self._write(lambda conn, now: conn.execute(
+                "INSERT INTO waiters (priority, seen_at) VALUES (?, ?)", (priority, now)).lastrowid)
+
+    def _leave(self, ticket: int):
+        with self._lock:
+            self._write(lambda conn, now: conn.execute("DELETE FROM waiters WHERE id = ?", (ticket,)))
+            self._cond.notify_all()
+
+    def _try(self, ticket: int, tokens: int, priority: int, started: float, deadline: float):
+        """One admission attempt: a Grant, or the seconds to wait before the next try"""
+        def attempt(conn, now):
+            conn.execute("DELETE FROM waiters WHERE seen_at < ?", (now - WAITER_TTL,))
+            # Re-inserting under the same id keeps a waiter's place even if it was dropped as stale
+            conn.execute("INSERT OR REPLACE INTO waiters (id, priority, seen_at) VALUES (?, ?, ?)",
+                         (ticket, priority, now))
+            state = dict(conn.execute("SELECT key, value FROM state").fetchall())
+            wait = self._wait_needed(conn, tokens, priority, now, state)
+            first = conn.execute("SELECT id FROM waiters ORDER BY priority, id LIMIT 1").fetchone()[0]
+            ready = wait == 0 and first == ticket
+            if time.monotonic() + wait > deadline and not ready:
+                conn.execute("DELETE FROM waiters WHERE id = ?", (ticket,))
+                return AdmissionTimeout(
+                    f"{PRIORITY_NAMES[priority]} call needs {wait:.1f}s for the Groq rate limit, "
+                    f"deadline is {max(0.0, deadline - time.monotonic()):.1f}s away")
+            if not ready:
+                return min(wait, _POLL) if wait > 0 else _MAX_SLEEP
+            conn.execute("DELETE FROM waiters WHERE id = ?", (ticket,))
+            if "server_tokens" in state and now < state.get("server_reset", 0.0):
+                conn.execute("UPDATE state SET value = value - ? WHERE key = 'server_tokens'", (tokens,))
+            return conn.execute("INSERT INTO calls (at, tokens) VALUES (?, ?)", (now, tokens)).lastrowid
+
+        with self._lock:
+            result = self._write(attempt)
+            if isinstance(result, float):
+                return result
+            self._cond.notify_all()
+            if isinstance(result, AdmissionTimeout):
+                self.timed_out[PRIORITY_NAMES[priority]] += 1
+                raise result
+            waited = time.monotonic() - started
+            self.admitted[PRIORITY_NAMES[priority]] += 1
+            self.wait_ms.append(waited * 1000)
+            return Grant(self, result, waited)
+
+    def admit(self, tokens: int, priority: int = TEXT, timeout: float = 30.0) -> Grant:
+        """Block until a call of about `tokens` may start; AdmissionTimeout if that is after `timeout` s"""
+        started = time.monotonic()
+        deadline = started + timeout
+        ticket = self._enqueue(priority)
+        while True:
+            result = self._try(ticket, tokens, priority, started, deadline)
+            if isinstance(result, Grant):
+                return result
+            with self._cond:
+                self._cond.wait(result)
+
+    async def admit_async(self, tokens: int, priority: int = VOICE, timeout: float = 5.0) -> Grant:
+        """admit() for event-loop callers; the file is only touched from worker threads"""
+        started = time.monotonic()
+        deadline = started + timeout
+        ticket = await asyncio.to_thread(self._enqueue, priority)
+        try:
+            while True:
+                result = await asyncio.to_thread(self._try, ticket, tokens, priority, started, deadline)
+                if isinstance(result, Grant):
+                    return result
+                await asyncio.sleep(min(result, _MAX_SLEEP))
+        except asyncio.CancelledError:
+            await asyncio.shield(asyncio.to_thread(self._leave, ticket))
+            raise
+
+    # ── feedback from Groq ──────────────────────────────────────────────
+    def observe(self, status_code: int, headers):
+        """Feed one Groq response's status and rate-limit headers back into the shared budget"""
+        def update(conn, now):
+            state = dict(conn.execute("SELECT key, value FROM state").fetchall())
+            limit_tokens = headers.get("x-ratelimit-limit-tokens")
+            if self._tpm_from_headers and limit_tokens and limit_tokens.isdigit():
+                self.tpm = int(limit_tokens)
+                conn.execute(_SET_STATE, ("tpm", self.tpm))
+            remaining = headers.get("x-ratelimit-remaining-tokens")
+            reset = parse_duration(headers.get("x-ratelimit-reset-tokens"))
+            if remaining is not None and remaining.isdigit() and reset is not None:
+                conn.execute(_SET_STATE, ("server_tokens", int(remaining)))
+                conn.execute(_SET_STATE, ("server_reset", now + reset))
+            paused_until = state.get("paused_until", 0.0)
+            if headers.get("x-ratelimit-remaining-requests") == "0":
+                reset_requests = parse_duration(headers.get("x-ratelimit-reset-requests"))
+                if reset_requests:
+                    paused_until = max(paused_until, now + reset_requests)
+            consecutive = int(state.get("consecutive_429", 0))
+            if status_code == 429:
+                self.rate_limited += 1
+                consecutive += 1
+                delay = (parse_duration(headers.get("retry-after"))
+                         or parse_duration(headers.get("x-ratelimit-reset-tokens"))
+                         or min(self.backoff_base * 2 ** (consecutive - 1), self.backoff_max))
+                delay *= 1 + random.uniform(0, JITTER)
+                paused_until = max(paused_until, now + delay)
+                logger.warning(f"Groq 429 #{consecutive}: pausing admissions for {delay:.1f}s")
+            elif status_code < 400:
+                consecutive = 0
+            conn.execute(_SET_STATE, ("paused_until", paused_until))
+            conn.execute(_SET_STATE, ("consecutive_429", consecutive))
+
+        with self._lock:
+            self._write(update)
+            self._cond.notify_all()
+
+    def on_response(self, response):
+        """httpx response event hook (sync client)"""
+        self.observe(response.status_code, response.headers)
+
+    async def on_response_async(self, response):
+        """httpx response event hook (async client); the write runs off the event loop"""
+        await asyncio.to_thread(self.observe, response.status_code, response.headers)
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            used, tokens = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tokens), 0) FROM calls WHERE at > ?", (now - WINDOW_SECONDS,)).fetchone()
+            waiting = dict(conn.execute("SELECT priority, COUNT(*) FROM waiters WHERE seen_at >= ? GROUP BY priority",
+                                        (now - WAITER_TTL,)).fetchall())
+            paused_until = (conn.execute("SELECT value FROM state WHERE key = 'paused_until'").fetchone() or (0.0,))[0]
+            waits = sorted(self.wait_ms)
+            return {
+                "rpm_used": used, "rpm": self.rpm,
+                "tpm_used": tokens, "tpm": self.tpm,
+                "waiting": {name: waiting.get(level, 0) for level, name in PRIORITY_NAMES.items()},
+                "admitted": dict(self.admitted), "timed_out": dict(self.timed_out),
+                "rate_limited_429": self.rate_limited,
+                "paused_for_s": round(max(0.0, paused_until - now), 1),
+                "wait_ms_p50": round(waits[len(waits) // 2], 1) if waits else None,
+                "wait_ms_max": round(waits[-1], 1) if waits else None,
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_groq_scheduler() -> GroqScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            tpm = os.getenv("GROQ_TPM")
+            _scheduler = GroqScheduler(rpm=int(os.getenv("GROQ_RPM", "30")),
+                                       tpm=int(tpm) if tpm else None,
+                                       backoff_base=float(os.getenv("GROQ_BACKOFF_BASE", "1")),
+                                       backoff_max=float(os.getenv("GROQ_BACKOFF_MAX", "30")),
+                                       voice_reserve=float(os.getenv("GROQ_VOICE_RESERVE", "0.2")),
+                                       path=os.getenv("GROQ_BUDGET_PATH", ".cache/groq_budget.sqlite3"))
+        return _scheduler
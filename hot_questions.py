@@ -0,0 +1,349 @@
+"""
+Hot-question mining: what callers actually ask, per language, from logged turns.
+
+The quick questions in data/ui/<lang>.json and the scheme card queries were
+picked by hand. This batch job streams every user turn (and the reply that
+followed it) out of the conversation store or exported JSONL logs, and in one
+pass, in fixed memory:
+
+    normalize   casefold, drop punctuation (response_cache.normalize_query);
+                turns under MIN_QUERY_CHARS are follow-ups and are skipped
+    cluster     a question joins the most similar cluster of its language
+                (character trigram cosine >= threshold, candidates found by a
+                random projection as in semantic_cache); identical normalized
+                text skips the search
+    count       at most max_clusters per language, kept with Space-Saving: when
+                full, the least frequent cluster is replaced and its count
+                carried over as the new cluster's error bound
+    cost        replies that went to the LLM add their estimated tokens, so
+                clusters rank both by frequency and by what caching them saves
+
+Each cluster keeps its few most frequent wordings; the most frequent one that
+is safe to show is the canonical question. Logged text is user input, so a
+wording is only published once min_sessions different sessions have used it,
+and never if it carries a long digit run (phone, Aadhaar, account number), an
+email address or a link. Logged replies are not copied at all: they were
+generated with that user's history and profile. The output JSON has, per
+language:
+
+    prewarm           clusters that cost LLM calls, by LLM tokens — the app
+                      answers them afresh without any history and seeds its
+                      semantic cache (with RESPONSE_CACHE_PREWARM=1)
+    quick_questions   the most asked questions short enough for a button
+
+    python hot_questions.py -o .cache/hot_questions.json --days 30
+    python hot_questions.py -o hot.json --jsonl turns-2026-09.jsonl turns-2026-10.jsonl
+
+Config (env):
+    HOT_QUESTIONS_PATH          output file the app reads         (default .cache/hot_questions.json)
+    HOT_QUESTIONS_THRESHOLD     trigram cosine to join a cluster  (default 0.7)
+    HOT_QUESTIONS_MAX_CLUSTERS  clusters kept per language        (default 2000)
+    HOT_QUESTIONS_MIN_SESSIONS  sessions that must use a wording before it is published (default 3)
+    HOT_QUICK_QUESTIONS         1 = the app shows the mined quick questions instead of the hand-picked ones
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+from conversation_memory import estimate_tokens
+from response_cache import normalize_query
+from semantic_cache import MIN_QUERY_CHARS, char_ngrams
+
+logger = logging.getLogger("hot-questions")
+
+HOT_QUESTIONS_PATH = os.getenv("HOT_QUESTIONS_PATH", os.path.join(".cache", "hot_questions.json"))
+
+DIM = 64
+HASH_BUCKETS = 1 << 14
+CANDIDATES = 8              # clusters rescored exactly per new wording
+TOP_VARIANTS = 4            # wordings kept per cluster
+MAX_PENDING_SESSIONS = 50000
+MAX_EXACT = 50000           # normalized text -> cluster shortcuts per language, cleared when full
+QUICK_QUESTION_CHARS = 60   # longer questions do not fit a sidebar button
+MAX_DIGITS = 5              # more digits than this in a wording may identify someone
+
+_CONTACT_RE = re.compile(r"\S+@\S+|https?://|www\.", re.IGNORECASE)
+
+
+def is_publishable(text: str) -> bool:
+    """False for wordings that may carry personal data: long numbers, email addresses, links"""
+    return sum(ch.isdigit() for ch in text) <= MAX_DIGITS and not _CONTACT_RE.search(text)
+
+
+class Cluster:
+    __slots__ = ("slot", "grams", "count", "error", "variants", "llm_calls", "llm_tokens")
+
+    def __init__(self, slot: int, grams, count: int = 1, error: int = 0):
+        self.slot = slot
+        self.grams = grams
+        self.count = count
+        self.error = error
+        self.variants = {}      # normalized wording -> [count, latest original text, sessions (up to min_sessions)]
+        self.llm_calls = 0
+        self.llm_tokens = 0
+
+    def add_variant(self, normalized: str, text: str, session, min_sessions: int):
+        """Space-Saving over the cluster's few wordings"""
+        entry = self.variants.get(normalized)
+        if entry is None:
+            if len(self.variants) >= TOP_VARIANTS:
+                evicted = min(self.variants, key=lambda key: self.variants[key][0])
+                floor = self.variants.pop(evicted)[0]
+            else:
+                floor = 0
+            entry = self.variants[normalized] = [floor, text, set()]
+        entry[0] += 1
+        entry[1] = text
+        if len(entry[2]) < min_sessions:
+            entry[2].add(session)
+
+    def publishable(self, min_sessions: int) -> list:
+        """Wordings safe to show other users, most frequent first"""
+        ordered = sorted(self.variants.values(), key=lambda entry: -entry[0])
+        return [text for _, text, sessions in ordered if len(sessions) >= min_sessions and is_publishable(text)]
+
+    def to_dict(self, variants: list) -> dict:
+        return {
+            "question": variants[0],
+            "count": self.count,
+            "count_min": self.count - self.error,   # Space-Saving lower bound
+            "llm_calls": self.llm_calls,
+            "llm_tokens": self.llm_tokens,
+            "variants": variants,
+        }
+
+
+class LanguageClusters:
+    """Fixed-size cluster table for one language"""
+
+    def __init__(self, projection: np.ndarray, threshold: float, max_clusters: int, min_sessions: int):
+        self.projection = projection
+        self.min_sessions = min_sessions
+        self.threshold = threshold
+        self.max_clusters = max_clusters
+        self.vectors = np.zeros((max_clusters, DIM), dtype=np.float32)
+        self.counts = np.zeros(max_clusters, dtype=np.int64)
+        self.clusters = []
+        self.generations = np.zeros(max_clusters, dtype=np.int64)   # bumped when a slot's cluster is replaced
+        self.exact = {}             # normalized text -> (slot, generation); never holds a replaced cluster alive
+        self.questions = 0
+        self.replaced = 0
+
+    def _embed(self, grams) -> np.ndarray:
+        vec = self.projection[[zlib.crc32(g.encode("utf-8")) % HASH_BUCKETS for g in grams]].sum(axis=0)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    def _nearest(self, grams, vec):
+        filled = len(self.clusters)
+        if not filled:
+            return None
+        scores = self.vectors[:filled] @ vec
+        k = min(CANDIDATES, filled)
+        best, best_score = None, self.threshold
+        for slot in np.argpartition(-scores, k - 1)[:k]:
+            cluster = self.clusters[slot]
+            score = len(grams & cluster.grams) / math.sqrt(len(grams) * len(cluster.grams))
+            if score >= best_score:
+                best, best_score = cluster, score
+        return best
+
+    def get(self, slot: int, generation: int):
+        """The cluster at slot, or None if it has been replaced since"""
+        return self.clusters[slot] if self.generations[slot] == generation else None
+
+    def add(self, text: str, normalized: str, session=None):
+        """(slot, generation) of the cluster the question joined"""
+        self.questions += 1
+        cluster = self.get(*self.exact[normalized]) if normalized in self.exact else None
+        if cluster is None:
+            grams = char_ngrams(normalized)
+            vec = self._embed(grams)
+            cluster = self._nearest(grams, vec)
+            if cluster is None:
+                cluster = self._new_cluster(grams, vec)
+            else:
+                cluster.count += 1
+            if len(self.exact) >= MAX_EXACT:
+                self.exact.clear()
+            self.exact[normalized] = (cluster.slot, int(self.generations[cluster.slot]))
+        else:
+            cluster.count += 1
+        self.counts[cluster.slot] = cluster.count
+        cluster.add_variant(normalized, text, session, self.min_sessions)
+        return cluster.slot, int(self.generations[cluster.slot])
+
+    def _new_cluster(self, grams, vec) -> Cluster:
+        if len(self.clusters) < self.max_clusters:
+            cluster = Cluster(len(self.clusters), grams)
+            self.clusters.append(cluster)
+        else:
+            slot = int(np.argmin(self.counts))
+            old = self.clusters[slot]
+            self.generations[slot] += 1
+            cluster = Cluster(slot, grams, old.count + 1, old.count)
+            self.clusters[slot] = cluster
+            self.replaced += 1
+        self.vectors[cluster.slot] = vec
+        return cluster
+
+
+class HotQuestionMiner:
+    def __init__(self, threshold: float = 0.7, max_clusters: int = 2000, min_sessions: int = 3):
+        self.threshold = threshold
+        self.max_clusters = max_clusters
+        self.min_sessions = min_sessions
+        self.projection = np.random.default_rng(11).standard_normal((HASH_BUCKETS, DIM)).astype(np.float32)
+        self.languages = {}
+        self._pending = OrderedDict()   # session -> (language, slot, generation, question) awaiting its reply
+        self.rows = 0
+        self.skipped = 0
+
+    def _clusters(self, language: str) -> LanguageClusters:
+        if language not in self.languages:
+            self.languages[language] = LanguageClusters(self.projection, self.threshold, self.max_clusters,
+                                                       self.min_sessions)
+        return self.languages[language]
+
+    def add(self, turn: dict):
+        """One logged turn: session_id, role, content, language, route (store row or JSONL line)"""
+        self.rows += 1
+        session = turn.get("session_id")
+        content = turn.get("content") or ""
+        if turn.get("role") == "user":
+            self._pending.pop(session, None)
+            normalized = normalize_query(content)
+            if len(normalized) < MIN_QUERY_CHARS or not turn.get("language"):
+                self.skipped += 1
+                return
+            slot, generation = self._clusters(turn["language"]).add(content.strip(), normalized, session)
+            self._pending[session] = (turn["language"], slot, generation, content)
+            if len(self._pending) > MAX_PENDING_SESSIONS:
+                self._pending.popitem(last=False)
+            return
+        pending = self._pending.pop(session, None)
+        route = turn.get("route") or ""
+        if pending is None or not route.startswith("llm"):
+            return
+        language, slot, generation, question = pending
+        cluster = self.languages[language].get(slot, generation)
+        if cluster is not None:
+            cluster.llm_calls += 1
+            cluster.llm_tokens += estimate_tokens(question) + estimate_tokens(content)
+
+    def report(self, top: int = 50, quick: int = 6, min_count: int = 2) -> dict:
+        out = {}
+        for language, table in sorted(self.languages.items()):
+            # Ranked on the Space-Saving lower bound, so a replaced cluster's inherited count cannot promote noise
+            clusters = []
+            for cluster in table.clusters:
+                variants = cluster.publishable(self.min_sessions)
+                if variants and cluster.count - cluster.error >= min_count:
+                    clusters.append((cluster, variants))
+            prewarm = sorted((pair for pair in clusters if pair[0].llm_calls), key=lambda pair: -pair[0].llm_tokens)[:top]
+            quick_questions = []
+            for cluster, variants in sorted(clusters, key=lambda pair: -(pair[0].count - pair[0].error)):
+                if len(variants[0]) <= QUICK_QUESTION_CHARS:
+                    quick_questions.append(variants[0])
+                if len(quick_questions) >= quick:
+                    break
+            out[language] = {
+                "questions": table.questions,
+                "clusters": len(table.clusters),
+                "clusters_replaced": table.replaced,
+                "prewarm": [cluster.to_dict(variants) for cluster, variants in prewarm],
+                "quick_questions": quick_questions,
+            }
+        return {"generated_at": time.time(), "rows": self.rows, "skipped": self.skipped, "languages": out}
+
+
+def iter_jsonl_turns(paths):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def mine(turns, threshold: float = None, max_clusters: int = None, top: int = 50, quick: int = 6,
+         min_count: int = 2, min_sessions: int = None, log_every: int = 500000) -> dict:
+    miner = HotQuestionMiner(
+        threshold if threshold is not None else float(os.getenv("HOT_QUESTIONS_THRESHOLD", "0.7")),
+        max_clusters or int(os.getenv("HOT_QUESTIONS_MAX_CLUSTERS", "2000")),
+        min_sessions or int(os.getenv("HOT_QUESTIONS_MIN_SESSIONS", "3")),
+    )
+    started = time.perf_counter()
+    for turn in turns:
+        miner.add(turn)
+        if log_every and miner.rows % log_every == 0:
+            logger.info(f"Mined {miner.rows} turns ({miner.rows / (time.perf_counter() - started):.0f}/s)")
+    return miner.report(top, quick, min_count)
+
+
+@lru_cache(maxsize=1)
+def load_hot_questions(path: str = None) -> dict:
+    """Per-language section of the last mining run; {} if the job has not run"""
+    try:
+        with open(path or HOT_QUESTIONS_PATH, encoding="utf-8") as f:
+            return json.load(f)["languages"]
+    except FileNotFoundError:
+        return {}
+
+
+def prewarm_semantic_cache(cache, answer_fn, hot: dict = None) -> int:
+    """
+    Answer every mined question with answer_fn(question, language) — which must
+    use no user's history or profile — and add it under each wording; returns questions answered
+    """
+    answered = 0
+    for language, section in (load_hot_questions() if hot is None else hot).items():
+        for entry in section["prewarm"]:
+            if cache.lookup(entry["question"], language) is not None:
+                continue
+            try:
+                answer = answer_fn(entry["question"], language)
+            except Exception as e:
+                logger.warning(f"Hot question prewarm failed for {language} / {entry['question']!r}: {e}")
+                continue
+            for question in entry["variants"]:
+                cache.add(question, language, answer)
+            answered += 1
+    return answered
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Mine frequent and costly questions per language from logged turns")
+    parser.add_argument("-o", "--output", default=HOT_QUESTIONS_PATH)
+    parser.add_argument("--jsonl", nargs="+", help="exported turns (one JSON object per line) instead of the store")
+    parser.add_argument("--days", type=float, help="only turns from the last N days (store only)")
+    parser.add_argument("--top", type=int, default=50, help="prewarm entries per language")
+    parser.add_argument("--quick", type=int, default=6, help="quick questions per language")
+    parser.add_argument("--min-count", type=int, default=2, help="ignore questions asked fewer times")
+    parser.add_argument("--min-sessions", type=int, help="sessions that must use a wording before it is published")
+    args = parser.parse_args()
+    if args.jsonl:
+        source = iter_jsonl_turns(args.jsonl)
+    else:
+        from conversation_store import get_conversation_store
+        source = get_conversation_store().iter_turns(since=time.time() - args.days * 86400 if args.days else None)
+    result = mine(source, top=args.top, quick=args.quick, min_count=args.min_count, min_sessions=args.min_sessions)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    tmp = f"{args.output}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, args.output)
+    for language, section in result["languages"].items():
+        print(f"{language}: {section['questions']} questions, {section['clusters']} clusters, "
+              f"{len(section['prewarm'])} to prewarm", file=sys.stderr)
+    print(f"Mined {result['rows']} turns → {args.output}", file=sys.stderr)
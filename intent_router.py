@@ -0,0 +1,133 @@
+"""
+Local intent classifier — answers simple FAQ turns without the LLM.
+
+"Ayushman card ke documents" or "Mudra loan limit" need one fact from the
+knowledge base, not a 70B model. A softmax (multinomial logistic regression)
+classifier over hashed character n-grams predicts the question type, the
+scheme slot is filled from knowledge-base aliases, and the answer comes from a
+per-language template. Scheme names are masked before classification, so the
+model learns question wording rather than scheme names.
+
+Training data, per-intent confidence thresholds and templates live in
+data/intents.json. Languages without templates always go to the LLM.
+"""
+import json
+import logging
+import os
+import re
+import time
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+from knowledge_base import get_knowledge_base
+
+logger = logging.getLogger("intent-router")
+
+INTENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "intents.json")
+
+FEATURE_DIM = 1 << 12
+FALLBACK_INTENT = "other"
+
+ROUTE_FAST_PATH = "fast_path"
+ROUTE_LLM = "llm"
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def featurize(text: str) -> np.ndarray:
+    """L2-normalized bag of hashed char 2-4 grams plus word unigrams"""
+    text = _SPACE_RE.sub(" ", text.casefold()).strip()
+    vec = np.zeros(FEATURE_DIM, dtype=np.float32)
+    padded = f" {text} "
+    features = [f"w:{w}" for w in text.split()]
+    for n in (2, 3, 4):
+        features += [padded[i:i + n] for i in range(len(padded) - n + 1)]
+    for feature in features:
+        vec[zlib.crc32(feature.encode("utf-8")) % FEATURE_DIM] = 1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+class IntentClassifier:
+    def __init__(self, examples: dict, epochs: int = 300, lr: float = 1.0, l2: float = 1e-4):
+        """examples: {intent: [text, ...]}; trains at construction"""
+        self.intents = sorted(examples)
+        texts, labels = [], []
+        for idx, intent in enumerate(self.intents):
+            texts += examples[intent]
+            labels += [idx] * len(examples[intent])
+        X = np.stack([featurize(t) for t in texts])
+        Y = np.eye(len(self.intents), dtype=np.float32)[labels]
+        self.W = np.zeros((FEATURE_DIM, len(self.intents)), dtype=np.float32)
+        self.b = np.zeros(len(self.intents), dtype=np.float32)
+        for _ in range(epochs):
+            P = self._softmax(X @ self.W + self.b)
+            grad = P - Y
+            self.W -= lr * (X.T @ grad / len(X) + l2 * self.W)
+            self.b -= lr * grad.mean(axis=0)
+
+    @staticmethod
+    def _softmax(z):
+        z = z - z.max(axis=-1, keepdims=True)
+        e = np.exp(z)
+        return e / e.sum(axis=-1, keepdims=True)
+
+    def predict(self, text: str):
+        """(intent, confidence)"""
+        p = self._softmax(featurize(text) @ self.W + self.b)
+        best = int(p.argmax())
+        return self.intents[best], float(p[best])
+
+
+class IntentRouter:
+    def __init__(self, config: dict):
+        self.thresholds = config["thresholds"]
+        self.templates = config["templates"]
+        self.languages = config["languages"]
+        self.kb = get_knowledge_base()
+        self.classifiers = {}
+        for lang, examples in config["training"].items():
+            masked = {intent: [self.kb.mask_aliases(t) for t in texts] for intent, texts in examples.items()}
+            self.classifiers[lang] = IntentClassifier(masked)
+
+    def route(self, text: str, language: str) -> dict:
+        """
+        Decide whether a turn can be answered from templated facts.
+        Always returns a dict with "route", "intent", "confidence", "elapsed_ms"; "answer" on the fast path.
+        """
+        started = time.perf_counter()
+        decision = {"route": ROUTE_LLM, "intent": None, "confidence": 0.0}
+        lang = self.languages.get(language)
+        classifier = self.classifiers.get(lang)
+        if classifier is not None and lang in self.templates:
+            named = self.kb.named_schemes(text)
+            intent, confidence = classifier.predict(self.kb.mask_aliases(text))
+            decision.update(intent=intent, confidence=round(confidence, 3))
+            # Exactly one scheme named and a confident, templated intent → answer locally
+            if (len(named) == 1 and intent in self.templates[lang]
+                    and confidence >= self.thresholds.get(intent, 1.0)):
+                decision["route"] = ROUTE_FAST_PATH
+                decision["scheme"] = named[0]
+                decision["answer"] = self._render(lang, intent, self.kb.by_id[named[0]])
+        decision["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(f"Route {decision['route']} intent={decision['intent']} "
+                    f"conf={decision['confidence']} in {decision['elapsed_ms']} ms")
+        return decision
+
+    def _render(self, lang: str, intent: str, scheme: dict) -> str:
+        facts = {**scheme, **scheme.get("translations", {}).get(lang, {})}
+        return self.templates[lang][intent].format(
+            name=scheme["name"],
+            benefit=facts["benefit"],
+            eligibility=facts["eligibility"],
+            documents=", ".join(facts["documents"]),
+            apply=facts["apply"],
+        )
+
+
+@lru_cache(maxsize=1)
+def get_intent_router() -> IntentRouter:
+    with open(INTENTS_PATH, encoding="utf-8") as f:
+        return IntentRouter(json.load(f))
@@ -0,0 +1,99 @@
+"""
+Scheme knowledge base shared by the Streamlit app and the voice agent.
+
+All scheme facts live in data/schemes.json (benefits, eligibility, documents,
+how to apply, aliases and per-language card text). At load time we build an
+in-memory inverted index over aliases, keywords and translated tags, so each
+turn can put only the top-k relevant schemes into the prompt instead of the
+whole catalogue.
+"""
+import json
+import os
+import re
+from functools import lru_cache
+
+KB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "schemes.json")
+
+# Split on whitespace/punctuation only: \w drops Indic vowel signs and breaks words apart
+_TOKEN_RE = re.compile(r"[^\s.,?!।॥:;\"'()/\-₹]+")
+
+ALIAS_WEIGHT = 3.0    # a full alias phrase ("pm kisan", "job card") is a strong signal
+KEYWORD_WEIGHT = 1.0  # topic words ("kisan", "hospital", "ghar") are weaker
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class KnowledgeBase:
+    def __init__(self, schemes: list):
+        self.schemes = schemes
+        self.by_id = {s["id"]: s for s in schemes}
+        self._token_index = {}   # token -> {scheme id: weight}
+        self._aliases = []       # (normalized alias, scheme id)
+        for scheme in schemes:
+            for alias in scheme.get("aliases", []) + [scheme["name"], scheme.get("full_name", "")]:
+                norm = " ".join(tokenize(alias))
+                if norm:
+                    self._aliases.append((norm, scheme["id"]))
+            words = list(scheme.get("keywords", []))
+            words += [card["tag"] for card in scheme.get("card", {}).values()]
+            for word in words:
+                for token in tokenize(word):
+                    postings = self._token_index.setdefault(token, {})
+                    postings[scheme["id"]] = KEYWORD_WEIGHT
+
+    def retrieve(self, query: str, k: int = 3) -> list:
+        """Top-k schemes relevant to the query, best first; empty if nothing matches"""
+        tokens = tokenize(query)
+        padded = f" {' '.join(tokens)} "
+        scores = {}
+        for alias, scheme_id in self._aliases:
+            if f" {alias} " in padded:
+                scores[scheme_id] = scores.get(scheme_id, 0.0) + ALIAS_WEIGHT
+        for token in set(tokens):
+            for scheme_id, weight in self._token_index.get(token, {}).items():
+                scores[scheme_id] = scores.get(scheme_id, 0.0) + weight
+        ranked = sorted(scores, key=lambda sid: (-scores[sid], sid))
+        return [self.by_id[sid] for sid in ranked[:k]]
+
+    def named_schemes(self, query: str) -> list:
+        """Ids of schemes named explicitly (by alias) in the query"""
+        padded = f" {' '.join(tokenize(query))} "
+        found = []
+        for alias, scheme_id in self._aliases:
+            if f" {alias} " in padded and scheme_id not in found:
+                found.append(scheme_id)
+        return found
+
+    def mask_aliases(self, query: str, placeholder: str = "SCHEME") -> str:
+        """Replace scheme names with a placeholder so classifiers learn the question, not the scheme"""
+        padded = f" {' '.join(tokenize(query))} "
+        for alias, _ in sorted(self._aliases, key=lambda a: -len(a[0])):
+            padded = padded.replace(f" {alias} ", f" {placeholder} ")
+        return padded.strip()
+
+    def featured(self) -> list:
+        return [s for s in self.schemes if s.get("featured")]
+
+    def names(self) -> list:
+        return [s["name"] for s in self.schemes]
+
+
+def format_for_prompt(schemes: list) -> str:
+    """Compact fact sheet for the given schemes, one block per scheme"""
+    blocks = []
+    for s in schemes:
+        blocks.append(
+            f"{s['full_name']}: {s['benefit']}. "
+            f"Eligibility: {s['eligibility']}. "
+            f"Documents: {', '.join(s['documents'])}. "
+            f"How to apply: {s['apply']}."
+        )
+    return "\n".join(blocks)
+
+
+@lru_cache(maxsize=1)
+def get_knowledge_base() -> KnowledgeBase:
+    with open(KB_PATH, encoding="utf-8") as f:
+        return KnowledgeBase(json.load(f)["schemes"])
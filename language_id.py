@@ -0,0 +1,195 @@
+"""
+Spoken-language identification from interim transcripts, before the turn ends.
+
+Sarvam's final transcript often carries no language, and when it does it comes
+after the caller has finished — so the first reply used to be spoken in the
+default voice. LanguageTracker reads each interim transcript as it arrives and
+commits to a language as soon as it is confident, which gives the agent time to
+switch (and warm) the TTS voice while the caller is still talking.
+
+Two signals, both local and sub-millisecond:
+
+    script    Indic letters name the language outright (Tamil, Telugu, ...);
+              Devanagari is Hindi unless Marathi words say otherwise
+    lexicon   Roman-script text is scored against function words and endings
+              per language in data/language_lexicon.json — this is what tells
+              "PM Kisan ke liye kya chahiye" (Hindi) from "What does PM Kisan
+              need" (English). Words shared by several languages count for
+              each in proportion.
+
+confidence = best score / (all scores + prior), so a lone ambiguous word never
+commits. Per language, each session keeps how often the early decision matched
+the final one (STT's label when given, else the final transcript's) and how
+long it took, and logs them when the call ends.
+
+Config (env):
+    LANGUAGE_ID_THRESHOLD   confidence needed to commit early   (default 0.7)
+"""
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+from knowledge_base import tokenize
+from voice_metrics import summarize
+
+logger = logging.getLogger("language-id")
+
+LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "language_lexicon.json")
+SCRIPT_CONFIDENCE = 0.95
+
+# Unicode block → language; Devanagari is settled by the Marathi word list
+SCRIPTS = (
+    (0x0900, 0x097F, "hi-IN"),
+    (0x0980, 0x09FF, "bn-IN"),
+    (0x0A00, 0x0A7F, "pa-IN"),
+    (0x0A80, 0x0AFF, "gu-IN"),
+    (0x0B00, 0x0B7F, "od-IN"),
+    (0x0B80, 0x0BFF, "ta-IN"),
+    (0x0C00, 0x0C7F, "te-IN"),
+    (0x0C80, 0x0CFF, "kn-IN"),
+    (0x0D00, 0x0D7F, "ml-IN"),
+)
+
+
+def _script_of(ch: str):
+    code = ord(ch)
+    for start, end, language in SCRIPTS:
+        if start <= code <= end:
+            return language
+    return None
+
+
+class LanguageIdentifier:
+    def __init__(self, config: dict):
+        self.prior = config["prior"]
+        self.suffix_weight = config["suffix_weight"]
+        self.min_suffix_word = config["min_suffix_word"]
+        self._words = defaultdict(set)      # word -> languages that use it
+        self._suffixes = []                 # (suffix, language)
+        for language, entry in config["languages"].items():
+            for word in entry["words"]:
+                self._words[word].add(language)
+            self._suffixes.extend((suffix, language) for suffix in entry.get("suffixes", ()))
+        self._native = {language: set(words) for language, words in config.get("native_words", {}).items()}
+
+    def _lexicon_scores(self, words) -> dict:
+        scores = defaultdict(float)
+        for word in words:
+            languages = self._words.get(word)
+            if languages:
+                for language in languages:
+                    scores[language] += 1 / len(languages)
+            elif len(word) >= self.min_suffix_word:
+                matched = {language for suffix, language in self._suffixes if word.endswith(suffix)}
+                for language in matched:
+                    scores[language] += self.suffix_weight / len(matched)
+        return scores
+
+    def identify(self, text: str):
+        """(language, confidence) for the text; language is None when there is no evidence at all"""
+        # Split on whitespace / punctuation only: Indic vowel signs (matras) are not
+        # "letters" to a regex, and splitting on them breaks "मला" into "मल"
+        words = [word for word in tokenize(text) if not word.isdigit()]
+        scripts = defaultdict(int)
+        letters = 0
+        for word in words:
+            for ch in word:
+                language = _script_of(ch)
+                if language:
+                    scripts[language] += 1
+                    letters += 1
+                elif ch.isalpha():
+                    letters += 1
+        if scripts:
+            language, count = max(scripts.items(), key=lambda kv: kv[1])
+            if count * 2 >= letters:
+                if language == "hi-IN" and any(word in self._native.get("mr-IN", ()) for word in words):
+                    language = "mr-IN"
+                return language, SCRIPT_CONFIDENCE
+        scores = self._lexicon_scores(words)
+        if not scores:
+            return None, 0.0
+        language, best = max(scores.items(), key=lambda kv: kv[1])
+        return language, best / (sum(scores.values()) + self.prior)
+
+
+@lru_cache(maxsize=1)
+def get_language_identifier() -> LanguageIdentifier:
+    with open(LEXICON_PATH, encoding="utf-8") as f:
+        return LanguageIdentifier(json.load(f))
+
+
+class LanguageTracker:
+    """
+    Per-session: feed() every transcript event; it returns a language the first
+    time one is decided for the current utterance (early from an interim, or
+    from the final transcript), else None.
+    """
+
+    def __init__(self, identifier: LanguageIdentifier = None, threshold: float = None):
+        self.identifier = identifier or get_language_identifier()
+        self.threshold = threshold if threshold is not None else float(os.getenv("LANGUAGE_ID_THRESHOLD", "0.7"))
+        self.outcomes = []          # dicts: language, early, correct, decision_s, lead_s
+        self._reset()
+
+    def _reset(self):
+        self._started_at = None
+        self._decided = None        # (language, at)
+
+    def feed(self, transcript: str, is_final: bool, stt_language: str = None):
+        now = time.perf_counter()
+        if self._started_at is None:
+            self._started_at = now
+        newly = None
+        if not is_final:
+            if self._decided is None:
+                language, confidence = self.identifier.identify(transcript)
+                if language and confidence >= self.threshold:
+                    self._decided = (language, now)
+                    newly = language
+            return newly
+
+        final_language, confidence = self.identifier.identify(transcript)
+        truth = stt_language or (final_language if confidence >= self.threshold else None)
+        if self._decided is not None:
+            early, decided_at = self._decided
+            if truth:
+                self.outcomes.append({"language": truth, "early": True, "correct": early == truth,
+                                      "decision_s": decided_at - self._started_at, "lead_s": now - decided_at})
+            if truth and truth != early:
+                newly = truth       # the early guess was wrong; the final transcript wins
+        elif truth:
+            self.outcomes.append({"language": truth, "early": False, "correct": None,
+                                  "decision_s": now - self._started_at, "lead_s": 0.0})
+            newly = truth
+        self._reset()
+        return newly
+
+    def summary(self) -> dict:
+        return summarize_outcomes(self.outcomes)
+
+    async def log_summary(self):
+        logger.info(f"Session language ID summary: {self.summary()}")
+
+
+def summarize_outcomes(outcomes) -> dict:
+    """Per language: utterances, share decided early, early accuracy, decision time and lead over the final"""
+    by_language = defaultdict(list)
+    for outcome in outcomes:
+        by_language[outcome["language"]].append(outcome)
+    out = {}
+    for language, rows in sorted(by_language.items()):
+        early = [row for row in rows if row["early"]]
+        timings = summarize({"decision": [row["decision_s"] for row in rows], "lead": [row["lead_s"] for row in early]})
+        out[language] = {
+            "utterances": len(rows),
+            "early_rate": round(len(early) / len(rows), 3),
+            "early_accuracy": round(sum(row["correct"] for row in early) / len(early), 3) if early else None,
+            "decision_p50_ms": timings["decision"]["p50_ms"],
+            "decision_p95_ms": timings["decision"]["p95_ms"],
+            "lead_p50_ms": timings["lead"]["p50_ms"] if "lead" in timings else None,
+        }
+    return out
@@ -0,0 +1,79 @@
+"""
+Per-language UI bundles, compiled once per process and shared by all sessions.
+
+UI strings live in data/ui/<code>.json and scheme card text in
+data/schemes.json. A pack joins the two for one language into immutable
+objects — card HTML is rendered at compile time — and is built the first time
+that language is selected. A Streamlit rerun only looks the pack up, and adding
+a language is one JSON file with no cost until someone picks it.
+"""
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+
+from knowledge_base import get_knowledge_base
+
+UI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ui")
+DEFAULT_LANGUAGE = "hi-IN"
+
+# Selector label → language code, in menu order
+LANGUAGES = MappingProxyType({
+    "Hindi (हिंदी)": "hi-IN",
+    "English": "en-IN",
+    "Tamil (தமிழ்)": "ta-IN",
+    "Telugu (తెలుగు)": "te-IN",
+    "Bengali (বাংলা)": "bn-IN",
+    "Gujarati (ગુજરાતી)": "gu-IN",
+    "Kannada (ಕನ್ನಡ)": "kn-IN",
+    "Marathi (मराठी)": "mr-IN",
+    "Punjabi (ਪੰਜਾਬੀ)": "pa-IN",
+    "Auto Detect": "unknown",
+})
+LANGUAGE_NAMES = MappingProxyType({code: name for name, code in LANGUAGES.items()})
+
+
+@dataclass(frozen=True)
+class SchemeCard:
+    id: str
+    name: str
+    query: str
+    html: str
+
+
+@dataclass(frozen=True)
+class LanguagePack:
+    code: str
+    text: MappingProxyType
+    quick_questions: tuple
+    cards: tuple
+
+    def __getitem__(self, key):
+        return self.text[key]
+
+
+def _card_html(icon, name, desc, tag) -> str:
+    return f"""
+            <div class="scheme-card">
+                <div class="scheme-icon">{icon}</div>
+                <div class="scheme-name">{name}</div>
+                <div class="scheme-desc">{desc}</div>
+                <span class="scheme-tag">{tag}</span>
+            </div>"""
+
+
+@lru_cache(maxsize=None)
+def get_language_pack(code: str) -> LanguagePack:
+    path = os.path.join(UI_DIR, f"{code}.json")
+    if not os.path.exists(path):
+        return get_language_pack(DEFAULT_LANGUAGE)
+    with open(path, encoding="utf-8") as f:
+        text = json.load(f)
+    cards = []
+    for scheme in get_knowledge_base().featured():
+        card = scheme["card"].get(code, scheme["card"][DEFAULT_LANGUAGE])
+        cards.append(SchemeCard(id=scheme["id"], name=scheme["name"], query=scheme["query"],
+                                html=_card_html(scheme["icon"], scheme["name"], card["desc"], card["tag"])))
+    quick_questions = tuple(text.pop("quick_questions"))
+    return LanguagePack(code=code, text=MappingProxyType(text), quick_questions=quick_questions, cards=tuple(cards))
@@ -0,0 +1,166 @@
+"""
+Process-wide, bounded pool for LLM calls made by the Streamlit app.
+
+A Streamlit script run used to block for the whole Groq round trip, so a burst
+of users meant a burst of stuck script threads and unbounded concurrent calls
+to Groq. Calls now go through a fixed number of worker threads with a cap on
+how many may wait; the script run returns at once and the chat view polls the
+job, showing "queued" until a worker picks it up and "generating" after.
+
+Identical calls are coalesced (single-flight): a submit with the key of a job
+still in flight gets that same job back instead of a new Groq call, so a burst
+of clicks on one trending "Ask" button costs one upstream request. flight_key()
+builds the key from the normalized prompt, language and a hash of the rest of
+the conversation sent with it.
+
+Config (env):
+    LLM_WORKERS     concurrent Groq calls from this process       (default 8)
+    LLM_QUEUE_MAX   calls allowed to wait for a worker           (default 32)
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from response_cache import normalize_query
+
+logger = logging.getLogger("llm-executor")
+
+QUEUED = "queued"
+GENERATING = "generating"
+DONE = "done"
+FAILED = "failed"
+
+
+class LLMQueueFull(Exception):
+    """Raised by submit() when LLM_QUEUE_MAX calls are already waiting"""
+
+
+def flight_key(prompt: str, language: str, context) -> str:
+    """(normalized prompt, language, context hash); context is everything else sent with the prompt"""
+    context_hash = hashlib.sha1(json.dumps(context, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return "\x1f".join((normalize_query(prompt), language, context_hash))
+
+
+class LLMJob:
+    """Shared between a worker and the polling script runs; the worker only appends"""
+
+    def __init__(self, key: str = None):
+        self.key = key
+        self.subscribers = 1
+        self.status = QUEUED
+        self.text = ""
+        self.model = None       # set by the work function: the model that wrote job.text
+        self.error = None
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self._claimed = False
+        self._claim_lock = threading.Lock()
+
+    def claim(self) -> bool:
+        """True for exactly one caller — lets one of the sessions sharing a job store its answer"""
+        with self._claim_lock:
+            first, self._claimed = not self._claimed, True
+            return first
+
+    def append(self, delta: str):
+        self.text += delta
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+class LLMExecutor:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._in_flight = {}    # flight key -> LLMJob
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def submit(self, work, key: str = None) -> LLMJob:
+        """
+        Run work(job) on a worker; raises LLMQueueFull instead of queueing without bound.
+        With a key, joins the in-flight job for that key if there is one.
+        """
+        with self._lock:
+            self.submitted += 1
+            shared = self._in_flight.get(key) if key else None
+            if shared is not None:
+                shared.subscribers += 1
+                self.coalesced += 1
+                return shared
+            if self._queued >= self.max_queue:
+                self.rejected += 1
+                raise LLMQueueFull(f"{self._queued} LLM calls already waiting")
+            self._queued += 1
+            job = LLMJob(key)
+            if key:
+                self._in_flight[key] = job
+        self._pool.submit(self._run, job, work)
+        return job
+
+    def _run(self, job: LLMJob, work):
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        job.started_at = time.monotonic()
+        job.status = GENERATING
+        status = FAILED
+        try:
+            work(job)
+            status = DONE
+        except Exception as e:
+            logger.warning(f"LLM call failed after {len(job.text)} chars: {e}")
+            job.error = e
+        finally:
+            with self._lock:
+                self._in_flight.pop(job.key, None)
+                if job.subscribers > 1:
+                    logger.info(f"Coalesced {job.subscribers} identical requests into one LLM call")
+                self._active -= 1
+                if status == DONE:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            # Pollers read the job without a lock: everything else is set before the status says it is finished
+            job.finished_at = time.monotonic()
+            job.status = status
+
+    def queued(self) -> int:
+        return self._queued
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers, "active": self._active, "queued": self._queued,
+                "max_queue": self.max_queue, "in_flight_keys": len(self._in_flight),
+                "submitted": self.submitted, "coalesced": self.coalesced,
+                "coalesce_rate": round(self.coalesced / self.submitted, 3) if self.submitted else 0.0,
+                "completed": self.completed, "failed": self.failed, "rejected": self.rejected,
+            }
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_llm_executor() -> LLMExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = LLMExecutor(workers=int(os.getenv("LLM_WORKERS", "8")),
+                                    max_queue=int(os.getenv("LLM_QUEUE_MAX", "32")))
+        return _executor
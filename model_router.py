@@ -0,0 +1,234 @@
+"""
+Per-turn model choice and hedged first tokens for Groq chat calls.
+
+Routing — "PM Kisan mein kitna paisa milta hai" needs one fact, not a 70B
+model; "Kisan hoon, 2 acre zameen, PM Kisan ya KCC kaun sa behtar hai" does.
+Rules in data/model_routing.json are checked in order against the user's
+message and the first match picks the "small" or "large" tier for the surface
+(text UI or voice); no match means the default tier. A rule matches when all of
+its conditions hold:
+
+    min_schemes   at least this many schemes named (knowledge-base aliases)
+    keywords      any of these words / phrases appears
+    min_words     at least this many words
+    max_words     at most this many words
+
+Hedging — if the chosen model has produced no first token LLM_HEDGE_AFTER_MS
+after the call started, a backup request is fired (same model, or the tier
+named by "hedge.backup") and whichever produces a token first is streamed; the
+other is closed. p99 then follows the faster of two upstream attempts instead
+of the slowest one. Backups are best effort: they go through the rate-limit
+scheduler without waiting, so under pressure no hedge is sent.
+
+Config (env):
+    MODEL_ROUTING_PATH   rules file                                  (default data/model_routing.json)
+    LLM_HEDGE_AFTER_MS   first-token deadline before a backup; 0 = off  (default: the file's hedge.after_ms)
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+from collections import Counter
+from functools import lru_cache
+
+from knowledge_base import get_knowledge_base, tokenize
+
+logger = logging.getLogger("model-router")
+
+MODEL_ROUTING_PATH = os.getenv(
+    "MODEL_ROUTING_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "model_routing.json"))
+
+SMALL = "small"
+LARGE = "large"
+
+
+class ModelRouter:
+    def __init__(self, config: dict):
+        self.models = config["models"]          # surface -> {tier: model id}
+        self.default = config.get("default", LARGE)
+        self.rules = config["rules"]
+        hedge = config.get("hedge", {})
+        self.hedge_after = float(os.getenv("LLM_HEDGE_AFTER_MS", hedge.get("after_ms", 0))) / 1000
+        self.hedge_backup = hedge.get("backup", "same")
+        self._lock = threading.Lock()
+        self.routed = Counter()                 # "surface/tier/rule" -> turns
+        self.hedges = Counter()                 # fired / primary_won / backup_won
+
+    def _matches(self, rule: dict, text: str) -> bool:
+        words = tokenize(text)
+        if "min_schemes" in rule and len(get_knowledge_base().named_schemes(text)) < rule["min_schemes"]:
+            return False
+        if "min_words" in rule and len(words) < rule["min_words"]:
+            return False
+        if "max_words" in rule and len(words) > rule["max_words"]:
+            return False
+        if "keywords" in rule:
+            padded = f" {' '.join(words)} "
+            if not any(f" {' '.join(tokenize(k))} " in padded for k in rule["keywords"]):
+                return False
+        return True
+
+    def choose(self, text: str, surface: str = "text", count: bool = True) -> tuple:
+        """(tier, model id, rule name) for one user message; count=False for lookups that send nothing"""
+        tier, rule_name = self.default, "default"
+        for rule in self.rules:
+            if self._matches(rule, text):
+                tier, rule_name = rule["tier"], rule["name"]
+                break
+        if count:
+            with self._lock:
+                self.routed[f"{surface}/{tier}/{rule_name}"] += 1
+        return tier, self.models[surface][tier], rule_name
+
+    def backup_tier(self, tier: str) -> str:
+        return tier if self.hedge_backup == "same" else self.hedge_backup
+
+    def count_hedge(self, outcome: str):
+        with self._lock:
+            self.hedges[outcome] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"routed": dict(self.routed), "hedge_after_ms": round(self.hedge_after * 1000),
+                    "hedges": dict(self.hedges)}
+
+
+@lru_cache(maxsize=1)
+def get_model_router() -> ModelRouter:
+    with open(MODEL_ROUTING_PATH, encoding="utf-8") as f:
+        return ModelRouter(json.load(f))
+
+
+# ── hedging ─────────────────────────────────────────────────────────────
+def _close(stream):
+    close = getattr(stream, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception:
+            pass
+
+
+def hedged_iter(start, hedge_after: float, router: ModelRouter = None):
+    """
+    Yield items from start(0)'s iterator; if it yields nothing for hedge_after
+    seconds, also run start(1) and keep whichever yields first. start(attempt)
+    is called on a helper thread, so it may block (e.g. on admission).
+    """
+    events = queue.Queue()
+    stop = [threading.Event(), threading.Event()]
+
+    def pump(attempt):
+        stream = None
+        try:
+            stream = start(attempt)
+            for item in stream:
+                if stop[attempt].is_set():
+                    break
+                events.put((attempt, "item", item))
+            events.put((attempt, "end", None))
+        except Exception as e:
+            events.put((attempt, "error", e))
+        finally:
+            _close(stream)
+
+    def launch(attempt):
+        threading.Thread(target=pump, args=(attempt,), daemon=True, name=f"llm_hedge_{attempt}").start()
+
+    launch(0)
+    running, winner, hedged = 1, None, False
+    try:
+        while True:
+            try:
+                attempt, kind, value = events.get(timeout=hedge_after if hedge_after and not hedged and winner is None else None)
+            except queue.Empty:
+                hedged = True
+                running += 1
+                if router:
+                    router.count_hedge("fired")
+                launch(1)
+                continue
+            if winner is None and kind == "item":
+                winner = attempt
+                stop[1 - attempt].set()
+                if hedged and router:
+                    router.count_hedge("backup_won" if attempt else "primary_won")
+            if winner is not None and attempt != winner:
+                continue
+            if kind == "item":
+                yield value
+            elif kind == "end":
+                return
+            else:
+                running -= 1
+                if winner is not None or running == 0:
+                    raise value
+                logger.info(f"Hedge attempt {attempt} failed, waiting for the other: {value}")
+    finally:
+        for event in stop:
+            event.set()
+
+
+async def hedged_aiter(start, hedge_after: float, router: ModelRouter = None):
+    """hedged_iter() for the event loop; start(attempt) is a coroutine returning an async iterator"""
+    events = asyncio.Queue()
+    tasks = {}
+
+    async def pump(attempt):
+        stream = None
+        try:
+            stream = await start(attempt)
+            async for item in stream:
+                await events.put((attempt, "item", item))
+            await events.put((attempt, "end", None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await events.put((attempt, "error", e))
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def launch(attempt):
+        tasks[attempt] = asyncio.create_task(pump(attempt), name=f"llm_hedge_{attempt}")
+
+    launch(0)
+    running, winner, hedged = 1, None, False
+    try:
+        while True:
+            try:
+                if hedge_after and not hedged and winner is None:
+                    attempt, kind, value = await asyncio.wait_for(events.get(), hedge_after)
+                else:
+                    attempt, kind, value = await events.get()
+            except asyncio.TimeoutError:
+                hedged = True
+                running += 1
+                if router:
+                    router.count_hedge("fired")
+                launch(1)
+                continue
+            if winner is None and kind == "item":
+                winner = attempt
+                loser = tasks.get(1 - attempt)
+                if loser is not None:
+                    loser.cancel()
+                if hedged and router:
+                    router.count_hedge("backup_won" if attempt else "primary_won")
+            if winner is not None and attempt != winner:
+                continue
+            if kind == "item":
+                yield value
+            elif kind == "end":
+                return
+            else:
+                running -= 1
+                if winner is not None or running == 0:
+                    raise value
+                logger.info(f"Hedge attempt {attempt} failed, waiting for the other: {value}")
+    finally:
+        for task in tasks.values():
+            task.cancel()
@@ -0,0 +1,211 @@
+"""
+Response cache for canned prompts (sidebar quick questions, scheme "Ask" buttons).
+
+Entries are keyed by (normalized query, language, model, prompt version) and
+evicted by LRU and TTL. The storage backend is pluggable:
+
+    RESPONSE_CACHE_BACKEND   memory | sqlite | redis        (default memory)
+    RESPONSE_CACHE_PATH      SQLite file                    (default .cache/responses.sqlite3)
+    RESPONSE_CACHE_URL       Redis URL                      (default redis://localhost:6379/0)
+    RESPONSE_CACHE_TTL       seconds an answer stays valid  (default 86400)
+    RESPONSE_CACHE_MAX       max entries (memory / sqlite)  (default 5000)
+"""
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("response-cache")
+
+_PUNCT_RE = re.compile(r"[\s\?\!\.\,।॥]+")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop punctuation so trivial variants share a key"""
+    return _PUNCT_RE.sub(" ", query.casefold()).strip()
+
+
+def cache_key(query: str, language: str, model: str, prompt_version: str) -> str:
+    raw = "\x1f".join((normalize_query(query), language, model, prompt_version))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# ---------- Backends ----------
+class MemoryBackend:
+    """In-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """File-backed cache shared by every process on the host"""
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now),
+            )
+            self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class RedisBackend:
+    """Redis-compatible store; TTL is native, LRU comes from the server's maxmemory-policy"""
+
+    def __init__(self, url: str, prefix: str = "sahayak:resp:"):
+        import redis  # optional dependency, only needed for this backend
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key):
+        return self._client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self._client.set(self.prefix + key, value, ex=int(ttl))
+
+    def __len__(self):
+        return sum(1 for _ in self._client.scan_iter(self.prefix + "*"))
+
+
+def backend_from_env():
+    kind = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+    max_entries = int(os.getenv("RESPONSE_CACHE_MAX", "5000"))
+    if kind == "sqlite":
+        return SQLiteBackend(os.getenv("RESPONSE_CACHE_PATH", ".cache/responses.sqlite3"), max_entries)
+    if kind == "redis":
+        return RedisBackend(os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0"))
+    return MemoryBackend(max_entries)
+
+
+# ---------- Cache ----------
+class ResponseCache:
+    def __init__(self, backend, ttl: float = 86400):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query, language, model, prompt_version):
+        try:
+            value = self.backend.get(cache_key(query, language, model, prompt_version))
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, query, language, model, prompt_version, answer):
+        try:
+            self.backend.set(cache_key(query, language, model, prompt_version), answer, self.ttl)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def stats(self) -> dict:
+        try:
+            size = len(self.backend)
+        except Exception:
+            size = None
+        return {"backend": type(self.backend).__name__, "entries": size, "hits": self.hits, "misses": self.misses}
+
+
+def prewarm(cache, prompts_by_language, answer_fn, model_for, prompt_version) -> int:
+    """
+    Fill the cache for every (language, prompt) pair that is not cached yet.
+    model_for(query) is the model a live request would use; answer_fn(query,
+    language) returns (answer, model that wrote it) and the answer is stored under that model.
+    """
+    filled = 0
+    for language, prompts in prompts_by_language.items():
+        for query in prompts:
+            if cache.backend.get(cache_key(query, language, model_for(query), prompt_version)) is not None:
+                continue
+            try:
+                answer, model = answer_fn(query, language)
+            except Exception as e:
+                logger.warning(f"Prewarm failed for {language} / {query!r}: {e}")
+                continue
+            cache.set(query, language, model, prompt_version, answer)
+            filled += 1
+    logger.info(f"Response cache prewarm filled {filled} entries")
+    return filled
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache built from env config"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(backend_from_env(), ttl=float(os.getenv("RESPONSE_CACHE_TTL", "86400")))
+    return _cache
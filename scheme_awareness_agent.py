@@ -1,9 +1,29 @@
 import logging
+import os
+import sys
+import time
+from typing import Optional
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import NOT_GIVEN, JobContext, JobProcess, RunContext, StopResponse, WorkerOptions, cli, function_tool
 from livekit.agents.voice import Agent, AgentSession
 from livekit.plugins import groq, sarvam, silero
 
+from conversation_memory import estimate_tokens
+from conversation_store import SessionRecorder, get_conversation_store
+from eligibility import PROFILE_FIELDS, get_engine
+from endpointing import AdaptiveEndpointing, session_options, vad_min_silence
+from greeting_audio import get_greeting_cache
+from groq_client import build_async_openai_client
+from groq_scheduler import VOICE, AdmissionTimeout, get_groq_scheduler
+from intent_router import ROUTE_FAST_PATH, ROUTE_LLM, get_intent_router
+from knowledge_base import format_for_prompt, get_knowledge_base
+from language_id import LanguageTracker
+from model_router import LARGE, SMALL, get_model_router, hedged_aiter
+from tts_cache import CachedTTS, get_tts_cache
+from tts_pool import TTS_MODEL, TTS_SPEAKER, LanguageTTS, get_tts_pool, prewarm_languages
+from voice_metrics import JOB_SETUP_SECONDS, PREWARM_SECONDS, TurnMetrics, metrics_options
+from worker_load import admission_options, parse_worker_args
+
 load_dotenv()
 
 logger = logging.getLogger("scheme-awareness-agent")
@@ -36,23 +56,39 @@ LANGUAGE_MAP = {
 }
 
 DEFAULT_LANGUAGE = "hi-IN"  # fallback if detection fails
+RETRIEVAL_TOP_K = 3         # schemes injected into the context per user turn
+VOICE_MAX_TOKENS = 400      # reply size reserved in the Groq token budget per turn
+VOICE_ADMIT_TIMEOUT = float(os.getenv("VOICE_ADMIT_TIMEOUT", "3"))  # a caller will not wait longer in silence
+BUSY_LINE = "Maaf kijiye, abhi bahut log baat kar rahe hain. Kripya ek pal baad dobara poochiye."
 
 
-def get_tts_for_language(lang_code: str) -> sarvam.TTS:
-    """Create a TTS instance for detected language"""
+def get_tts_for_language(lang_code: str) -> CachedTTS:
+    """Get a ready TTS instance for detected language from the worker pool"""
     tts_lang = LANGUAGE_MAP.get(lang_code, DEFAULT_LANGUAGE)
-    logger.info(f"Creating TTS for language: {tts_lang} (detected: {lang_code})")
-    return sarvam.TTS(
-        target_language_code=tts_lang,
-        model="bulbul:v3",
-        speaker="shubh"
-    )
+    logger.info(f"Using TTS for language: {tts_lang} (detected: {lang_code})")
+    return get_tts_pool().get(tts_lang)
+
+
+def load_vad() -> silero.VAD:
+    """Silero VAD; adaptive endpointing wants short silences reported, and waits per caller itself"""
+    silence = vad_min_silence()
+    return silero.VAD.load(min_silence_duration=silence) if silence else silero.VAD.load()
 
 
 class GovernmentSchemeAgent(Agent):
-    def __init__(self) -> None:
+    def __init__(self, vad: Optional[silero.VAD] = None, stt=None, llm=None, small_llm=None,
+                 tts_factory=get_tts_for_language) -> None:
+        """
+        Plugins default to Sarvam / Groq / Silero; the offline benchmark passes local stand-ins.
+        llm is the large model; turns the model router marks simple go to small_llm.
+        """
+        models = get_model_router().models["voice"]
+        if llm is None:
+            client = build_async_openai_client()
+            llm = groq.LLM(model=models[LARGE], client=client)
+            small_llm = small_llm or groq.LLM(model=models[SMALL], client=client)
         super().__init__(
-            instructions="""
+            instructions=f"""
             You are Sarkar Sahayak, a helpful government scheme awareness assistant for Indian citizens.
 
             Your responsibilities:
@@ -61,17 +97,9 @@ class GovernmentSchemeAgent(Agent):
             - Guide through application process
             - Suggest schemes based on user situation
 
-            Key schemes:
-            - PM Kisan Samman Nidhi: Rs 6000 per year for farmers
-            - Ayushman Bharat: Rs 5 lakh health insurance
-            - PM Awas Yojana: House for poor families
-            - Sukanya Samriddhi Yojana: Savings for girl child
-            - PM Ujjwala Yojana: Free LPG connection
-            - MGNREGA: 100 days job guarantee
-            - PM Jan Dhan Yojana: Zero balance bank account
-            - Atal Pension Yojana: Monthly pension scheme
-            - PM Mudra Yojana: Business loans up to Rs 10 lakh
-            - Skill India Mission: Free skill training
+            Schemes you cover: {", ".join(get_knowledge_base().names())}
+            Facts for the schemes relevant to each user turn are added to the conversation
+            just before it — use only those facts for amounts, eligibility and documents.
 
             LANGUAGE RULE — MOST IMPORTANT:
             - Detect which language the user is speaking
@@ -93,69 +121,238 @@ class GovernmentSchemeAgent(Agent):
             - Max 3 sentences per response — this is a voice agent
             - No bullet points, speak naturally
             - Be warm, patient and supportive
-
-            Opening message (in Hindi):
-            "Namaste! Main aapka Sarkar Sahayak hoon. Aap Hindi, English, Tamil, Telugu ya kisi bhi Indian language mein baat kar sakte hain!"
+            - The opening greeting has already been spoken; do not repeat it
             """,
 
             # STT — "unknown" tells Sarvam to auto-detect language
-            stt=sarvam.STT(
+            stt=stt or sarvam.STT(
                 language="unknown",
                 model="saaras:v3",
                 mode="transcribe"
             ),
 
-            # LLM — Groq LLaMA
-            llm=groq.LLM(
-                model="openai/gpt-oss-20b"
-            ),
+            # LLM — Groq; the large model is the session default, llm_node picks per turn
+            llm=llm,
 
-            # TTS — Default Hindi, will be swapped dynamically on first speech
-            tts=sarvam.TTS(
-                target_language_code=DEFAULT_LANGUAGE,
-                model="bulbul:v3",
-                speaker="shubh"
-            ),
+            # TTS — Default Hindi; switched to the caller's language as soon as it is identified
+            tts=LanguageTTS(tts_factory, DEFAULT_LANGUAGE),
 
-            vad=silero.VAD.load(),
+            # VAD — loaded once per process in prewarm(); fallback load for direct use
+            vad=vad or load_vad(),
         )
+        self._llms = {LARGE: llm, SMALL: small_llm or llm}
+        self._tts_factory = tts_factory
         self._current_tts_lang = DEFAULT_LANGUAGE
+        self.last_route = None      # route of the latest reply, for the conversation store
+        self.recorder = None        # conversation_store.SessionRecorder, set by the entrypoint
+        self.language_tracker = LanguageTracker()
 
-    async def on_enter(self):
-        await self.session.generate_reply()
+    @property
+    def llms(self) -> list:
+        """Distinct LLM instances this agent may call"""
+        return list({id(llm): llm for llm in self._llms.values()}.values())
 
-    async def on_user_turn_completed(self, turn_ctx, new_message):
+    @function_tool()
+    async def check_eligibility(
+        self,
+        context: RunContext,
+        occupation: Optional[str] = None,
+        age: Optional[int] = None,
+        annual_income: Optional[int] = None,
+        gender: Optional[str] = None,
+        bpl: Optional[bool] = None,
+        land_acres: Optional[float] = None,
+    ) -> str:
+        """
+        Rank the schemes the caller may be eligible for. Pass only what the caller has told you.
+
+        Args:
+            occupation: one of farmer, labourer, business, salaried_govt, salaried_private, student, unemployed, homemaker, other
+            age: age in years
+            annual_income: family income per year in rupees
+            gender: female, male or other
+            bpl: True if the family has a BPL / antyodaya ration card
+            land_acres: land holding in acres
+        """
+        profile = {
+            "occupation": occupation, "age": age, "annual_income": annual_income,
+            "gender": gender, "bpl": bpl, "land_acres": land_acres,
+        }
+        ranked = get_engine().rank(profile)
+        # Score 0: nothing rules the scheme out, but none of its criteria is confirmed either
+        confirmed = [r for r in ranked if r["score"] > 0][:3]
+        logger.info(f"Eligibility check {profile} → {[r['id'] for r in confirmed]}")
+        if confirmed:
+            return "Likely eligible (best match first): " + ", ".join(r["name"] for r in confirmed)
+        missing = [field.replace("_", " ") for field in PROFILE_FIELDS if profile[field] is None]
+        if ranked and missing:
+            return ("Not enough information to name a scheme yet. Do not suggest any scheme; "
+                    "ask the caller for: " + ", ".join(missing) + ".")
+        return "No scheme matches this profile."
+
+    async def llm_node(self, chat_ctx, tools, model_settings):
         """
-        Called after every user message.
-        Detect language from STT and update TTS dynamically.
+        Model picked per turn by the model router, admitted by the shared Groq
+        scheduler at voice priority, and hedged on a slow first token if enabled.
         """
+        scheduler = get_groq_scheduler()
+        router = get_model_router()
+        user_message = next((item for item in reversed(chat_ctx.items) if getattr(item, "role", None) == "user"), None)
+        user_text = (user_message.text_content or "") if user_message else ""
+
+        # Retrieval — add only the schemes this turn is about. Done here rather than in
+        # on_user_turn_completed so an early (preemptive) LLM start stays valid.
+        relevant = get_knowledge_base().retrieve(user_text, k=RETRIEVAL_TOP_K) if user_text else []
+        if relevant:
+            chat_ctx = chat_ctx.copy()
+            chat_ctx.add_message(
+                role="assistant",
+                content=f"Scheme facts relevant to the user's next message:\n{format_for_prompt(relevant)}",
+                created_at=user_message.created_at - 1e-3,
+            )
+
+        tier, _, rule = router.choose(user_text, "voice")
+        tokens = VOICE_MAX_TOKENS + sum(estimate_tokens(getattr(item, "text_content", None) or "") for item in chat_ctx.items)
         try:
-            # Get detected language from STT transcript metadata
-            detected_lang = getattr(new_message, "language", None)
+            await scheduler.admit_async(tokens, VOICE, timeout=VOICE_ADMIT_TIMEOUT)
+        except AdmissionTimeout as e:
+            logger.warning(f"Skipping LLM turn: {e}")
+            self.last_route = "busy"
+            yield BUSY_LINE
+            return
+
+        tool_choice = model_settings.tool_choice if model_settings else NOT_GIVEN
+        conn_options = self.session.conn_options.llm_conn_options
+        primary, backup = self._llms[tier], self._llms[router.backup_tier(tier)]
+        logger.info(f"LLM turn → {tier} ({rule})")
+        self.last_route = f"{ROUTE_LLM}:{tier}"
+
+        async def start(attempt):
+            if attempt:
+                # Best effort: only hedge when the rate limit has room right now
+                await scheduler.admit_async(tokens, VOICE, timeout=0)
+            return (backup if attempt else primary).chat(
+                chat_ctx=chat_ctx, tools=tools, tool_choice=tool_choice, conn_options=conn_options)
+
+        if not router.hedge_after:
+            async with await start(0) as stream:
+                async for chunk in stream:
+                    yield chunk
+            return
+        async for chunk in hedged_aiter(start, router.hedge_after, router):
+            yield chunk
+
+    def _switch_language(self, lang_code: str, source: str):
+        tts_lang = LANGUAGE_MAP.get(lang_code, DEFAULT_LANGUAGE)
+        if tts_lang != self._current_tts_lang:
+            logger.info(f"Language changed ({source}): {self._current_tts_lang} → {tts_lang}")
+            self._current_tts_lang = tts_lang
+            self.tts.set_language(tts_lang)
+
+    def _on_transcribed(self, ev):
+        """Interim and final transcripts; switching on an interim warms the voice while the caller still talks"""
+        stt_language = ev.language if ev.language and ev.language != "unknown" else None
+        language = self.language_tracker.feed(ev.transcript, ev.is_final, LANGUAGE_MAP.get(stt_language))
+        if language:
+            self._switch_language(language, "final" if ev.is_final else "interim")
+
+    async def on_enter(self):
+        """Fixed opening line from the greeting cache — no LLM call, and no TTS request once rendered"""
+        self.session.on("user_input_transcribed", self._on_transcribed)
+        language = self._current_tts_lang
+        self.last_route = "greeting"
+        text, audio = await get_greeting_cache().get(language, self._tts_factory(language))
+        if text is None:
+            await self.session.generate_reply()
+            return
+        self.session.say(text, audio=audio.frames() if audio is not None else NOT_GIVEN)
 
-            if detected_lang and detected_lang != "unknown":
-                tts_lang = LANGUAGE_MAP.get(detected_lang, DEFAULT_LANGUAGE)
+    async def on_exit(self):
+        self.session.off("user_input_transcribed", self._on_transcribed)
 
-                # Only swap TTS if language changed
-                if tts_lang != self._current_tts_lang:
-                    logger.info(f"Language changed: {self._current_tts_lang} → {tts_lang}")
-                    self._current_tts_lang = tts_lang
-                    self.session.tts = get_tts_for_language(detected_lang)
+    async def on_user_turn_completed(self, turn_ctx, new_message):
+        """
+        Called after every user message. The reply language was already picked from
+        the transcripts (_on_transcribed); STT's label on the message, when present, has the last word.
+        """
+        detected_lang = getattr(new_message, "language", None)
+        if detected_lang and detected_lang != "unknown":
+            self._switch_language(detected_lang, "stt")
+
+        text = new_message.text_content or ""
 
-        except Exception as e:
-            logger.warning(f"Language detection failed, using default: {e}")
+        # Fast path — simple FAQ turns are answered from templated facts, skipping the LLM
+        decision = get_intent_router().route(text, self._current_tts_lang)
+        if decision["route"] == ROUTE_FAST_PATH:
+            self.last_route = ROUTE_FAST_PATH
+            if self.recorder is not None:
+                self.recorder.record(new_message)   # StopResponse keeps it out of the chat history
+            self.session.say(decision["answer"])
+            raise StopResponse()
 
         await super().on_user_turn_completed(turn_ctx, new_message)
 
 
+def prewarm(proc: JobProcess):
+    """Runs once per worker process, before any job: load heavy models and share them via userdata"""
+    started = time.perf_counter()
+    proc.userdata["vad"] = load_vad()
+    get_knowledge_base()
+    get_intent_router()
+    get_engine()
+    languages = {LANGUAGE_MAP.get(code, DEFAULT_LANGUAGE) for code in prewarm_languages()} | {DEFAULT_LANGUAGE}
+    get_greeting_cache().preload(languages, TTS_MODEL, TTS_SPEAKER)
+    proc.userdata["prewarm_seconds"] = time.perf_counter() - started
+    PREWARM_SECONDS.observe(proc.userdata["prewarm_seconds"])
+    logger.info(f"Process prewarm done in {proc.userdata['prewarm_seconds'] * 1000:.0f} ms")
+
+
+async def _log_tts_cache_stats():
+    logger.info(f"TTS cache: {get_tts_cache().stats()}")
+
+
 async def entrypoint(ctx: JobContext):
+    setup_started = time.perf_counter()
     logger.info(f"User connected: {ctx.room.name}")
-    session = AgentSession()
-    await session.start(
-        agent=GovernmentSchemeAgent(),
-        room=ctx.room
+    # Warm TTS for the most-used languages so a mid-call switch needs no connect
+    pool = get_tts_pool()
+    pool.warm(LANGUAGE_MAP.get(code, DEFAULT_LANGUAGE) for code in prewarm_languages())
+    ctx.add_shutdown_callback(pool.aclose)
+    session = AgentSession(**session_options())
+    agent = GovernmentSchemeAgent(vad=ctx.proc.userdata.get("vad"))
+    ctx.add_shutdown_callback(agent.tts.aclose)     # stop forwarding events from the pool's voices
+    # End-of-turn wait tuned per caller and language; logs false cut-offs vs time saved
+    endpointing = AdaptiveEndpointing(lambda: agent._current_tts_lang)
+    endpointing.attach(session)
+    ctx.add_shutdown_callback(endpointing.log_summary)
+    # Per-turn stage timings, tagged with the language the agent is speaking
+    turn_metrics = TurnMetrics(lambda: agent._current_tts_lang)
+    turn_metrics.attach(session, *agent.llms)
+    turn_metrics.mark_joined(setup_started)
+    ctx.add_shutdown_callback(turn_metrics.log_summary)
+    ctx.add_shutdown_callback(_log_tts_cache_stats)
+    ctx.add_shutdown_callback(agent.language_tracker.log_summary)
+    # Every turn goes to the shared conversation store (write-behind, off the turn's path)
+    recorder = SessionRecorder(get_conversation_store(), f"voice-{ctx.job.id}",
+                               lambda: agent._current_tts_lang, lambda: agent.last_route)
+    recorder.attach(session, {"room": ctx.room.name})
+    agent.recorder = recorder
+    ctx.add_shutdown_callback(recorder.close)
+    await session.start(agent=agent, room=ctx.room)
+    setup_seconds = time.perf_counter() - setup_started
+    JOB_SETUP_SECONDS.observe(setup_seconds)
+    logger.info(
+        f"Job setup done in {setup_seconds * 1000:.0f} ms "
+        f"(process prewarm took {ctx.proc.userdata.get('prewarm_seconds', 0) * 1000:.0f} ms)"
     )
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    # Our admission flags (--load-threshold, --max-sessions, ...) are stripped before the LiveKit CLI sees argv
+    worker_args, sys.argv[1:] = parse_worker_args(sys.argv[1:])
+    cli.run_app(WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
+        **admission_options(worker_args),
+        **metrics_options(),
+    ))
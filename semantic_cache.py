@@ -0,0 +1,193 @@
+"""
+Near-duplicate answer cache for free-text questions.
+
+"PM Kisan kaise milega" and "pm kisan ka paisa kaise milta hai" never share an
+exact cache key, but their character trigrams overlap heavily. Each question is
+embedded by summing fixed random vectors for its trigrams (a random projection
+of the hashed n-gram space). A lookup takes the top candidates by one matrix
+product over a preallocated ring buffer, then rescores them with exact
+IDF-weighted trigram cosine. CPU only, no network, memory fixed at startup.
+
+Expected recall at the default 0.8: case, punctuation and an extra filler word
+hit ("Ujjwala gas connection kaise milega" / "UJJWALA gas connection kaise
+milega bhai?" scores about 0.85); inflection variants and rephrasings mostly
+miss — "... kaise milega" / "... kaise milta hai" scores about 0.75, "PM Kisan
+kaise milega" / "pm kisan ka paisa kaise milta hai" about 0.6. The threshold is
+not lower because different schemes asked the same way score higher than that
+("PM Kisan kaise milega" / "PM Awas kaise milega" about 0.67), and a miss only
+costs an LLM call while a false hit answers about the wrong scheme. For the
+same reason a question only matches one with the same numbers in it: "13vi
+kist" and "14vi kist" share almost every trigram.
+
+The index is shared by all sessions, so only answers generated without any
+user's history or profile may be added (app.py only adds a typed question's
+answer when its prompt carried neither).
+
+Config (env):
+    SEMANTIC_CACHE_THRESHOLD    minimum cosine similarity for a hit  (default 0.8)
+    SEMANTIC_CACHE_MAX          max entries across all languages      (default 100000)
+"""
+import math
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+_NON_WORD_RE = re.compile(r"[^\w]+")
+_NUMBER_RE = re.compile(r"\d+")
+
+NGRAM = 3
+DIM = 64                   # projected vector size
+HASH_BUCKETS = 1 << 14     # rows in the random projection table
+CANDIDATES = 64            # rows rescored exactly per lookup
+MIN_QUERY_CHARS = 12       # shorter turns are usually follow-ups that depend on history
+
+
+def char_ngrams(text: str, n: int = NGRAM) -> frozenset:
+    grams = set()
+    for word in _NON_WORD_RE.sub(" ", text.casefold()).split():
+        padded = f" {word} "
+        if len(padded) <= n:
+            grams.add(padded)
+            continue
+        for i in range(len(padded) - n + 1):
+            grams.add(padded[i:i + n])
+    return frozenset(grams)
+
+
+def numbers(text: str) -> frozenset:
+    """Numbers in the text ("6000", "13"); near-duplicates must agree on them"""
+    return frozenset(_NUMBER_RE.findall(text))
+
+
+class SemanticCache:
+    def __init__(self, threshold: float = 0.8, max_entries: int = 100000):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        rng = np.random.default_rng(7)
+        self._projection = rng.standard_normal((HASH_BUCKETS, DIM)).astype(np.float32)
+        self._vectors = np.zeros((max_entries, DIM), dtype=np.float32)
+        self._langs = np.full(max_entries, -1, dtype=np.int16)
+        self._entries = [None] * max_entries     # slot -> (grams, question, answer)
+        self._lang_ids = {}
+        self._df = {}                            # (lang id, gram) -> document frequency
+        self._size = 0
+        self._next_slot = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.last_lookup_ms = 0.0
+
+    def _embed(self, grams) -> np.ndarray:
+        rows = [zlib.crc32(g.encode("utf-8")) % HASH_BUCKETS for g in grams]
+        vec = self._projection[rows].sum(axis=0)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    def _idf(self, lang_id, gram) -> float:
+        return math.log((self._size + 1) / (self._df.get((lang_id, gram), 0) + 1)) + 1.0
+
+    def _lang_id(self, language: str) -> int:
+        if language not in self._lang_ids:
+            self._lang_ids[language] = len(self._lang_ids)
+        return self._lang_ids[language]
+
+    def add(self, question: str, language: str, answer: str):
+        if len(question.strip()) < MIN_QUERY_CHARS:
+            return
+        grams = char_ngrams(question)
+        if not grams:
+            return
+        vec = self._embed(grams)
+        with self._lock:
+            lang_id = self._lang_id(language)
+            slot = self._next_slot
+            self._next_slot = (slot + 1) % self.max_entries
+            old = self._entries[slot]
+            if old is not None:
+                old_lang = int(self._langs[slot])
+                for g in old[0]:
+                    key = (old_lang, g)
+                    self._df[key] -= 1
+                    if not self._df[key]:
+                        del self._df[key]
+            else:
+                self._size += 1
+            for g in grams:
+                self._df[(lang_id, g)] = self._df.get((lang_id, g), 0) + 1
+            self._entries[slot] = (grams, question, answer, numbers(question))
+            self._vectors[slot] = vec
+            self._langs[slot] = lang_id
+
+    def lookup(self, question: str, language: str):
+        """Return (answer, similarity) for the closest past question, or None below threshold"""
+        started = time.perf_counter()
+        result = None
+        if len(question.strip()) >= MIN_QUERY_CHARS and language in self._lang_ids:
+            grams = char_ngrams(question)
+            if grams:
+                vec = self._embed(grams)
+                with self._lock:
+                    result = self._lookup_locked(grams, vec, self._lang_ids[language], numbers(question))
+        self.last_lookup_ms = (time.perf_counter() - started) * 1000
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def _lookup_locked(self, grams, vec, lang_id, nums):
+        filled = self._size
+        scores = self._vectors[:filled] @ vec
+        scores[self._langs[:filled] != lang_id] = -1.0
+        k = min(CANDIDATES, filled)
+        candidates = np.argpartition(-scores, k - 1)[:k]
+
+        weights = {g: self._idf(lang_id, g) for g in grams}
+        q_norm = math.sqrt(sum(w * w for w in weights.values()))
+        best, best_score = None, 0.0
+        for slot in candidates:
+            if scores[slot] < 0:
+                continue
+            entry_grams, _, answer, entry_nums = self._entries[slot]
+            if entry_nums != nums:
+                continue
+            dot = sum(weights[g] ** 2 for g in grams & entry_grams)
+            if not dot:
+                continue
+            d_norm = math.sqrt(sum(self._idf(lang_id, g) ** 2 for g in entry_grams))
+            score = dot / (q_norm * d_norm)
+            if score > best_score:
+                best, best_score = answer, score
+        if best is None or best_score < self.threshold:
+            return None
+        return best, round(best_score, 3)
+
+    def stats(self) -> dict:
+        return {
+            "entries": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "threshold": self.threshold,
+            "last_lookup_ms": round(self.last_lookup_ms, 2),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Process-wide index built from env config"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticCache(
+                    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.8")),
+                    max_entries=int(os.getenv("SEMANTIC_CACHE_MAX", "100000")),
+                )
+    return _cache
@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from bench.fakes import FakeLLM, FakeSTT, FakeTTS, FakeVAD
+from scheme_awareness_agent import GovernmentSchemeAgent
+
+
+@pytest.fixture(scope="module")
+def agent():
+    return GovernmentSchemeAgent(vad=FakeVAD(min_silence=0.25), stt=FakeSTT(), llm=FakeLLM(),
+                                 tts_factory=lambda language: FakeTTS())
+
+
+def _check(agent, **profile):
+    return asyncio.run(agent.check_eligibility(None, **profile))
+
+
+def test_nothing_known_names_no_scheme(agent):
+    reply = _check(agent)
+    assert reply.startswith("Not enough information")
+    assert "occupation" in reply and "land acres" in reply
+    assert "PM Kisan" not in reply and "Likely eligible" not in reply
+
+
+def test_only_confirmed_schemes_are_read_out(agent):
+    reply = _check(agent, occupation="farmer", land_acres=2)
+    assert reply.startswith("Likely eligible")
+    assert "PM Kisan Samman Nidhi" in reply
+    assert "Sukanya" not in reply
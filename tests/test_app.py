@@ -0,0 +1,95 @@
+import os
+import time
+import types
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import groq_client
+from model_router import LARGE, SMALL, get_model_router
+from semantic_cache import get_semantic_cache
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+FIRST = "Ayushman card aur PM Jan Dhan mein kya antar hai"
+FOLLOW_UP = "Dono ke liye bank account zaroori hai kya bataiye"
+
+
+class FakeGroq:
+    """Non-streaming chat completions that answer with the model's name"""
+
+    def __init__(self):
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+        self.slow = {}      # model -> seconds before it answers
+        self.calls = []
+
+    def create(self, model, messages, **kwargs):
+        self.calls.append(model)
+        time.sleep(self.slow.get(model, 0))
+        message = types.SimpleNamespace(content=f"answer {len(messages)} from {model}")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)],
+                                     usage=types.SimpleNamespace(total_tokens=50))
+
+
+@pytest.fixture
+def groq(monkeypatch):
+    fake = FakeGroq()
+    monkeypatch.setattr(groq_client, "get_groq_client", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, groq):
+    monkeypatch.setenv("STREAM_RESPONSES", "0")
+    monkeypatch.setenv("CONVERSATION_DB_PATH", str(tmp_path / "conversations.sqlite3"))
+    monkeypatch.setenv("GROQ_BUDGET_PATH", str(tmp_path / "groq_budget.sqlite3"))
+    monkeypatch.setenv("GROQ_RPM", "1000")
+    return AppTest.from_file(APP, default_timeout=30).run()
+
+
+def _ask(at, text):
+    at.text_input[0].input(text)
+    return _send(at, next(b for b in at.button if b.key.startswith("FormSubmitter:chat_form")))
+
+
+def _send(at, button):
+    button.click().run()
+    for _ in range(100):
+        if "pending_reply" not in at.session_state:
+            return at.session_state.messages[-1]["content"]
+        time.sleep(0.05)
+        at.run()
+    raise AssertionError("no reply")
+
+
+def test_first_question_reaches_the_semantic_cache(app):
+    cache = get_semantic_cache()
+    before = cache.stats()["entries"]
+    answer = _ask(app, FIRST)
+    assert not app.exception
+    assert cache.stats()["entries"] == before + 1
+    assert cache.lookup(FIRST + "?", "hi-IN")[0] == answer
+
+    # A follow-up is answered with this session's history, so it is not shared
+    _ask(app, FOLLOW_UP)
+    assert cache.stats()["entries"] == before + 1
+    assert cache.lookup(FOLLOW_UP, "hi-IN") is None
+
+
+def test_hedged_answer_is_cached_under_the_routed_model(app, groq, monkeypatch):
+    button = next(b for b in app.button if b.key.startswith("qs_"))
+    question = button.key[len("qs_"):]
+    router = get_model_router()
+    tier, routed, _ = router.choose(question, count=False)
+    backup_tier = SMALL if tier == LARGE else LARGE
+    monkeypatch.setattr(router, "hedge_after", 0.05)
+    monkeypatch.setattr(router, "hedge_backup", backup_tier)
+    groq.slow[routed] = 1.0
+
+    answer = _send(app, button)
+    assert answer.endswith(f"from {router.models['text'][backup_tier]}")
+
+    # Asked again, the canned prompt is found under the model the router picks for it
+    calls = len(groq.calls)
+    assert _send(app, next(b for b in app.button if b.key == button.key)) == answer
+    assert app.session_state.messages[-1]["route"] == "response_cache"
+    assert len(groq.calls) == calls
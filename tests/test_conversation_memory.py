@@ -0,0 +1,47 @@
+import pytest
+
+from conversation_memory import ConversationMemory, extract_profile
+
+
+@pytest.mark.parametrize("text, age", [
+    ("meri umar 45 saal hai", 45),
+    ("main 45 saal ka hoon", 45),
+    ("main 38 saal ki hoon aur meri beti 8 saal ki hai", 38),
+    ("I am 32 years old", 32),
+    ("मेरी उम्र 50 साल है", 50),
+    ("मैं 40 साल का हूँ", 40),
+])
+def test_own_age(text, age):
+    assert extract_profile(text)["age"] == age
+
+
+@pytest.mark.parametrize("text", [
+    "meri beti 8 saal ki hai",
+    "Mudra loan 5 years",
+    "Atal pension 60 saal ke baad",
+    "main 5 saal ka loan chahta hoon",
+    "PM Kisan 3 saal se mil raha hai",
+])
+def test_other_numbers_are_not_an_age(text):
+    assert "age" not in extract_profile(text)
+
+
+def test_negated_facts_are_dropped():
+    assert extract_profile("mere paas naukri nahi hai") == {}
+    assert extract_profile("I am not a farmer") == {}
+    assert extract_profile("BPL card nahi hai") == {}
+    assert extract_profile("main kisan nahi, mazdoor hoon")["occupation"] == "labourer"
+
+
+def test_scheme_names_are_not_facts():
+    assert extract_profile("PM Kisan ki kist kab aayegi") == {}
+    assert extract_profile("main Bihar ka kisan hoon, 2 acre zameen hai") == {
+        "occupation": "farmer", "state": "Bihar", "land_acres": 2.0}
+
+
+def test_summary_carries_only_stated_facts():
+    memory = ConversationMemory()
+    for text in ("meri beti 8 saal ki hai", "mere paas naukri nahi hai", "meri umar 45 saal hai"):
+        memory.observe({"role": "user", "content": text})
+    assert memory.profile == {"age": 45}
+    assert memory.summary() == "Known about the user: age: 45."
@@ -0,0 +1,100 @@
+import asyncio
+import sqlite3
+import time
+import types
+
+import pytest
+
+from conversation_store import ConversationStore, SessionRecorder
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "conversations.sqlite3")
+
+
+def _store(path, **kwargs):
+    return ConversationStore(path, flush_interval=0.01, **kwargs)
+
+
+def test_turns_round_trip(path):
+    store = _store(path)
+    store.start_session("s1", "text", "hi-IN", {"client": "web"})
+    store.add_turn("s1", "user", "PM Kisan kya hai", "hi-IN")
+    store.add_turn("s1", "assistant", "PM Kisan mein 6000 rupaye milte hain", "hi-IN", "fast_path", {"answer_ms": 12})
+    store.end_session("s1")
+    assert store.flush()
+
+    turns = store.session_turns("s1")
+    assert [(t["role"], t["route"], t["timings"]) for t in turns] == [
+        ("user", None, {}), ("assistant", "fast_path", {"answer_ms": 12})]
+    session = store.get_session("s1")
+    assert session["surface"] == "text" and session["ended_at"] is not None
+    assert store.stats()["written"] == 4
+
+
+def test_processes_share_the_file(path):
+    # Two stores on one file stand in for the app and a voice job process
+    app, voice = _store(path), _store(path)
+    app.start_session("text-1", "text", "hi-IN")
+    voice.start_session("voice-1", "voice", "en-IN")
+    voice.add_turn("voice-1", "user", "Ayushman card documents", "en-IN")
+    assert app.flush() and voice.flush()
+    assert [s["id"] for s in app.sessions(surface="voice")] == ["voice-1"]
+    assert [s["id"] for s in voice.sessions(language="hi-IN")] == ["text-1"]
+    assert app.session_turns("voice-1")[0]["content"] == "Ayushman card documents"
+
+
+def test_iter_turns_filters_in_time_order(path):
+    store = _store(path)
+    base = time.time() - 100
+    for i in range(5):
+        store.add_turn("s1", "user" if i % 2 == 0 else "assistant", f"turn {i}", "hi-IN", created_at=base + i)
+    store.add_turn("s2", "user", "english turn", "en-IN", created_at=base - 1)
+    assert store.flush()
+    assert [t["content"] for t in store.iter_turns(role="user", language="hi-IN", batch_size=2)] == [
+        "turn 0", "turn 2", "turn 4"]
+    assert [t["content"] for t in store.iter_turns(since=base + 1, until=base + 3)] == ["turn 1", "turn 2"]
+
+
+def test_compaction_removes_expired_sessions(path):
+    store = _store(path, retention_days=1)
+    store.start_session("new", "text", "hi-IN")
+    store.add_turn("new", "user", "kept", "hi-IN")
+    assert store.flush()
+    old = time.time() - 3 * 86400
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO sessions (id, surface, started_at) VALUES ('old', 'voice', ?)", (old,))
+    conn.execute("INSERT INTO turns (session_id, role, content, created_at) VALUES ('old', 'user', 'gone', ?)", (old,))
+    conn.commit()
+    conn.close()
+
+    store.compact()
+    assert store.flush()
+    assert store.get_session("old") is None and store.session_turns("old") == []
+    assert [t["content"] for t in store.session_turns("new")] == ["kept"]
+    assert store.stats()["compacted_sessions"] == 1
+
+
+def test_voice_session_recorder(path):
+    store = _store(path)
+    session = types.SimpleNamespace(handlers={})
+    session.on = lambda event, handler: session.handlers.setdefault(event, handler)
+    recorder = SessionRecorder(store, "call-1", lambda: "hi-IN", lambda: "llm:small")
+    recorder.attach(session, {"room": "r1"})
+
+    def added(role, text, metrics=None):
+        message = types.SimpleNamespace(role=role, text_content=text, metrics=metrics or {}, created_at=time.time())
+        session.handlers["conversation_item_added"](types.SimpleNamespace(item=message))
+
+    added("user", "PM Kisan kya hai", {"transcription_delay": 0.21, "end_of_turn_delay": 0.4})
+    added("assistant", "PM Kisan mein 6000 rupaye milte hain", {"llm_node_ttft": 0.35, "e2e_latency": 1.2})
+    added("system", "ignored")
+    added("assistant", "")
+    asyncio.run(recorder.close())
+
+    turns = store.session_turns("call-1")
+    assert [(t["role"], t["route"], t["timings"]) for t in turns] == [
+        ("user", None, {"transcription_delay": 210, "end_of_turn_delay": 400}),
+        ("assistant", "llm:small", {"llm_node_ttft": 350, "e2e_latency": 1200})]
+    assert store.get_session("call-1")["ended_at"] is not None
@@ -0,0 +1,13 @@
+from eligibility import get_engine
+
+
+def test_empty_profile_confirms_nothing():
+    matches = get_engine().rank({})
+    assert matches and all(match["score"] == 0 for match in matches)
+
+
+def test_stated_facts_confirm_criteria():
+    farmer = {"occupation": "farmer", "age": 35, "annual_income": 100000, "land_acres": 2, "bpl": False}
+    confirmed = {match["id"] for match in get_engine().rank(farmer) if match["score"] > 0}
+    assert "pm_kisan" in confirmed
+    assert "sukanya_samriddhi" not in confirmed
@@ -0,0 +1,103 @@
+import types
+
+import endpointing
+from endpointing import AdaptiveEndpointing, PauseStats, get_endpointing_config, session_options
+
+
+class FakeSession:
+    def __init__(self):
+        self.handlers = {}
+        self.min_delays = []
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def update_options(self, endpointing_opts):
+        self.min_delays.append(endpointing_opts["min_delay"])
+
+
+class Call:
+    """One caller on a fake clock: drives the session events AdaptiveEndpointing listens to"""
+
+    def __init__(self, monkeypatch, adaptive=True, language="hi-IN"):
+        self.now = 100.0
+        monkeypatch.setattr(endpointing.time, "perf_counter", lambda: self.now)
+        self.session = FakeSession()
+        config = dict(get_endpointing_config(), adaptive=adaptive)
+        self.endpointing = AdaptiveEndpointing(lambda: language, config, PauseStats(config["history"]))
+        self.endpointing.attach(self.session)
+
+    def _user(self, old, new):
+        self.session.handlers["user_state_changed"](types.SimpleNamespace(old_state=old, new_state=new))
+
+    def speak(self):
+        self._user("listening", "speaking")
+
+    def stop(self, quiet: float):
+        """The caller stops; Silero reports it vad_silence later, and `quiet` more seconds pass"""
+        self._user("speaking", "listening")
+        self.now += quiet
+
+    def commit(self):
+        self.session.handlers["agent_state_changed"](types.SimpleNamespace(old_state="listening", new_state="thinking"))
+
+    def turn(self, pauses, wait: float):
+        """A turn with mid-sentence pauses (seconds of silence each), committed after `wait` more seconds"""
+        vad = self.endpointing.vad_silence
+        self.speak()
+        for pause in pauses:
+            self.stop(pause - vad)
+            self.speak()
+        self.stop(wait)
+        self.commit()
+        self.now += 2.0     # the agent answers before the caller speaks again
+
+
+def test_session_options_follow_the_mode():
+    config = get_endpointing_config()
+    adaptive = session_options(dict(config, adaptive=True))["turn_handling"]
+    fixed = session_options(dict(config, adaptive=False))["turn_handling"]
+    assert adaptive["endpointing"]["min_delay"] == config["baseline"]["min_delay"]
+    assert "endpointing" not in fixed
+    assert endpointing.vad_min_silence(dict(config, adaptive=False)) is None
+
+
+def test_fluent_caller_gets_a_shorter_wait(monkeypatch):
+    call = Call(monkeypatch)
+    baseline = call.endpointing.config["baseline"]["min_delay"]
+    for _ in range(3):
+        call.turn([0.2, 0.2], wait=0.1)
+    assert call.endpointing.delay < baseline
+    assert call.session.min_delays[-1] == call.endpointing.delay
+    summary = call.endpointing.summary()["hi-IN"]
+    assert summary["turns"] == 3 and summary["false_cutoffs"] == 0
+    assert summary["wait_p50_ms"] == 350            # 0.25 s VAD + 0.1 s delay
+    assert summary["saved_ms_per_turn"] == 200      # against max(0.55, 0.5)
+
+
+def test_false_cutoff_raises_the_wait(monkeypatch):
+    call = Call(monkeypatch)
+    call.speak()
+    call.stop(0.3)
+    call.commit()
+    call.now += 0.4
+    call.speak()           # the caller carries on 0.95 s after they stopped: the turn was cut off
+    turn = call.endpointing.turns[-1]
+    assert turn["false_cutoff"]
+    assert call.endpointing.delay >= 0.95 + call.endpointing.config["margin"] - 1e-9
+    assert call.endpointing.summary()["hi-IN"]["false_cutoff_rate"] == 1.0
+
+
+def test_long_silence_is_not_a_pause(monkeypatch):
+    call = Call(monkeypatch)
+    call.turn([call.endpointing.config["max_delay"] + 1], wait=0.1)
+    assert not call.endpointing._pauses
+
+
+def test_fixed_mode_only_measures(monkeypatch):
+    call = Call(monkeypatch, adaptive=False)
+    assert call.endpointing.vad_silence == call.endpointing.config["baseline"]["vad_silence"]
+    call.turn([0.2], wait=0.0)
+    call.turn([0.2], wait=0.0)
+    assert call.session.min_delays == []
+    assert call.endpointing.summary()["hi-IN"]["wait_p50_ms"] == 550
@@ -0,0 +1,51 @@
+import asyncio
+import os
+
+import pytest
+
+from bench.fakes import FakeTTS
+from greeting_audio import GreetingCache, RenderedAudio, get_greetings, tts_voice
+
+LANGUAGE = "hi-IN"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return GreetingCache(str(tmp_path))
+
+
+def _saved(cache, tts) -> str:
+    key = cache.key(get_greetings()[LANGUAGE], LANGUAGE, *tts_voice(tts))
+    cache._write(key, RenderedAudio(bytes(24000 * 2), 24000, 1))
+    return cache._path(key)
+
+
+def test_disk_hit_survives_a_restart(cache):
+    tts = FakeTTS(LANGUAGE)
+    _saved(cache, tts)
+    restarted = GreetingCache(cache.directory)
+    audio = restarted.lookup(LANGUAGE, *tts_voice(tts))
+    assert audio.duration == pytest.approx(1.0)
+    assert restarted.stats()["disk_hits"] == 1
+
+
+@pytest.mark.parametrize("damage", [
+    lambda data: b"",                  # empty
+    lambda data: data[:20],            # cut inside the header
+    lambda data: data[:-1001],         # cut inside the samples
+    lambda data: b"not a wav" * 10,    # overwritten
+])
+def test_damaged_file_is_a_miss_and_rendered_again(cache, damage):
+    tts = FakeTTS(LANGUAGE, ttfb=0, realtime_factor=1000)
+    path = _saved(cache, tts)
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(damage(data))
+
+    assert cache.preload([LANGUAGE], *tts_voice(tts)) == 0
+    assert not os.path.exists(path)
+
+    text, audio = asyncio.run(cache.get(LANGUAGE, tts))
+    assert text == get_greetings()[LANGUAGE] and audio.duration > 0
+    assert cache.stats()["rendered"] == 1 and os.path.exists(path)
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from groq_scheduler import BACKGROUND, TEXT, VOICE, AdmissionTimeout, GroqScheduler, parse_duration
+
+
+@pytest.fixture
+def budget(tmp_path):
+    return str(tmp_path / "groq_budget.sqlite3")
+
+
+def test_parse_duration():
+    assert parse_duration("7.66s") == pytest.approx(7.66)
+    assert parse_duration("2m59.56s") == pytest.approx(179.56)
+    assert parse_duration("120ms") == pytest.approx(0.12)
+    assert parse_duration("3") == 3.0
+    assert parse_duration(None) is None
+
+
+def test_full_window_times_out_at_once(budget):
+    scheduler = GroqScheduler(rpm=1, path=budget)
+    scheduler.admit(10, VOICE, timeout=0)
+    started = time.monotonic()
+    with pytest.raises(AdmissionTimeout):
+        scheduler.admit(10, VOICE, timeout=5)
+    assert time.monotonic() - started < 1
+    assert scheduler.stats()["timed_out"]["voice"] == 1
+
+
+def test_tpm_counts_settled_usage(budget):
+    scheduler = GroqScheduler(rpm=100, tpm=1000, voice_reserve=0, path=budget)
+    grant = scheduler.admit(600, TEXT, timeout=0)
+    with pytest.raises(AdmissionTimeout):
+        scheduler.admit(500, TEXT, timeout=0)
+    grant.settle(300)          # the call used less than estimated
+    assert scheduler.stats()["tpm_used"] == 300
+    scheduler.admit(500, TEXT, timeout=0)
+    assert scheduler.stats()["tpm_used"] == 800
+
+
+def test_voice_reserve_is_kept_from_text(budget):
+    scheduler = GroqScheduler(rpm=10, voice_reserve=0.2, path=budget)
+    for _ in range(8):
+        scheduler.admit(10, TEXT, timeout=0)
+    with pytest.raises(AdmissionTimeout):
+        scheduler.admit(10, BACKGROUND, timeout=0)
+    with pytest.raises(AdmissionTimeout):
+        scheduler.admit(10, TEXT, timeout=0)
+    scheduler.admit(10, VOICE, timeout=0)
+    scheduler.admit(10, VOICE, timeout=0)
+
+
+def test_server_headers_tighten_the_budget(budget):
+    scheduler = GroqScheduler(rpm=100, tpm=10000, path=budget)
+    scheduler.observe(200, {"x-ratelimit-remaining-tokens": "50", "x-ratelimit-reset-tokens": "30s"})
+    with pytest.raises(AdmissionTimeout):
+        scheduler.admit(100, VOICE, timeout=0)
+    scheduler.admit(40, VOICE, timeout=0)
+
+
+def test_processes_share_one_budget(budget):
+    # Two schedulers on one file stand in for the app and a voice job process
+    app, job = GroqScheduler(rpm=2, path=budget), GroqScheduler(rpm=2, path=budget)
+    app.admit(10, VOICE, timeout=0)
+    job.admit(10, VOICE, timeout=0)
+    with pytest.raises(AdmissionTimeout):
+        app.admit(10, VOICE, timeout=0)
+    with pytest.raises(AdmissionTimeout):
+        job.admit(10, VOICE, timeout=0)
+    assert app.stats()["rpm_used"] == job.stats()["rpm_used"] == 2
+
+
+def test_429_pauses_every_process(budget):
+    app, job = GroqScheduler(rpm=100, path=budget), GroqScheduler(rpm=100, path=budget)
+    app.observe(429, {"retry-after": "5"})
+    with pytest.raises(AdmissionTimeout):
+        job.admit(10, VOICE, timeout=1)
+    assert job.stats()["paused_for_s"] >= 4
+
+
+def test_voice_first_then_fifo_across_processes(budget):
+    app, job = GroqScheduler(rpm=100, path=budget), GroqScheduler(rpm=100, path=budget)
+    app.observe(429, {"retry-after": "0.5"})
+    grants = []
+
+    def call(scheduler, name, priority):
+        grants.append((scheduler.admit(10, priority, timeout=5).call_id, name))
+
+    threads = [threading.Thread(target=call, args=args) for args in
+               [(app, "text 1", TEXT), (app, "background", BACKGROUND), (app, "text 2", TEXT), (job, "voice", VOICE)]]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)       # queue them in this order while admissions are paused
+    assert app.stats()["waiting"] == {"voice": 1, "text": 2, "background": 1}
+    for thread in threads:
+        thread.join()
+    assert [name for _, name in sorted(grants)] == ["voice", "text 1", "text 2", "background"]
+
+
+def test_async_waiter_leaves_the_queue_when_cancelled(budget):
+    scheduler = GroqScheduler(rpm=100, path=budget)
+    scheduler.observe(429, {"retry-after": "5"})
+
+    async def cancelled_wait():
+        task = asyncio.create_task(scheduler.admit_async(10, VOICE, timeout=10))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancelled_wait())
+    assert scheduler.stats()["waiting"]["voice"] == 0
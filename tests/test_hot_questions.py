@@ -0,0 +1,43 @@
+from hot_questions import is_publishable, mine, prewarm_semantic_cache
+from semantic_cache import SemanticCache
+
+QUESTION = "PM Kisan ke liye kaun se documents chahiye"
+
+
+def _asked(question, sessions, route="llm:small", reply="answer for {}"):
+    turns = []
+    for session in sessions:
+        turns.append({"session_id": session, "role": "user", "content": question, "language": "hi-IN"})
+        turns.append({"session_id": session, "role": "assistant", "content": reply.format(session),
+                      "language": "hi-IN", "route": route})
+    return turns
+
+
+def test_logged_replies_are_not_published():
+    report = mine(_asked(QUESTION, [f"s{i}" for i in range(5)]), min_sessions=3)
+    entry = report["languages"]["hi-IN"]["prewarm"][0]
+    assert entry["question"] == QUESTION
+    assert "answer" not in entry
+    assert entry["llm_calls"] == 5
+
+
+def test_wording_needs_several_sessions():
+    report = mine(_asked(QUESTION, ["same"] * 10), min_sessions=3)
+    assert report["languages"]["hi-IN"]["quick_questions"] == []
+    report = mine(_asked(QUESTION, ["a", "b", "c"]), min_sessions=3)
+    assert report["languages"]["hi-IN"]["quick_questions"] == [QUESTION]
+
+
+def test_personal_data_is_never_published():
+    assert is_publishable("PM Kisan ki 6000 ki kist kab aayegi")
+    assert not is_publishable("mera number 9876543210 hai")
+    assert not is_publishable("mail me at ram@example.com")
+    report = mine(_asked("mera aadhaar 1234 5678 9012 hai kisan status", [f"s{i}" for i in range(5)]), min_sessions=3)
+    assert report["languages"]["hi-IN"]["quick_questions"] == []
+
+
+def test_prewarm_answers_afresh():
+    hot = mine(_asked(QUESTION, [f"s{i}" for i in range(5)]), min_sessions=3)["languages"]
+    cache = SemanticCache(max_entries=16)
+    assert prewarm_semantic_cache(cache, lambda question, language: f"fresh {language}", hot) == 1
+    assert cache.lookup(QUESTION, "hi-IN")[0] == "fresh hi-IN"
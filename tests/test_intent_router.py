@@ -0,0 +1,35 @@
+import pytest
+
+from intent_router import ROUTE_FAST_PATH, ROUTE_LLM, IntentClassifier, get_intent_router
+
+
+@pytest.mark.parametrize("text, language, intent, scheme", [
+    ("Ayushman card ke documents kya chahiye", "hi-IN", "documents", "ayushman_bharat"),
+    ("Mudra loan limit kitna hai", "hi-IN", "benefit", "pm_mudra"),
+    ("PM Kisan ke liye apply kaise kare", "hi-IN", "apply", "pm_kisan"),
+    ("What documents are needed for Ayushman Bharat", "en-IN", "documents", "ayushman_bharat"),
+])
+def test_simple_faq_is_answered_locally(text, language, intent, scheme):
+    decision = get_intent_router().route(text, language)
+    assert (decision["route"], decision["intent"], decision["scheme"]) == (ROUTE_FAST_PATH, intent, scheme)
+    assert get_intent_router().kb.by_id[scheme]["name"] in decision["answer"]
+
+
+@pytest.mark.parametrize("text, language", [
+    ("Mera naam Ramesh hai aur main kisan hoon", "hi-IN"),       # not a FAQ
+    ("PM Kisan aur Ayushman mein kya antar hai", "hi-IN"),       # two schemes
+    ("documents kya chahiye", "hi-IN"),                          # no scheme named
+    ("Ayushman card ke documents", "ta-IN"),                     # no templates for the language
+])
+def test_other_turns_go_to_the_llm(text, language):
+    decision = get_intent_router().route(text, language)
+    assert decision["route"] == ROUTE_LLM and "answer" not in decision
+
+
+def test_classifier_learns_wording():
+    classifier = IntentClassifier({
+        "documents": ["kaunse documents chahiye", "kagaz kya lagenge", "documents list batao"],
+        "apply": ["apply kaise kare", "aavedan kaise karein", "form kahan bharein"],
+    })
+    intent, confidence = classifier.predict("documents kya chahiye")
+    assert intent == "documents" and 0.5 < confidence <= 1.0
@@ -0,0 +1,47 @@
+import pytest
+
+from knowledge_base import KnowledgeBase, format_for_prompt, get_knowledge_base, tokenize
+
+
+def _ids(schemes):
+    return [s["id"] for s in schemes]
+
+
+def test_tokenize_keeps_indic_vowel_signs():
+    assert tokenize("मुझे किसान योजना, बताओ!") == ["मुझे", "किसान", "योजना", "बताओ"]
+    assert tokenize("PM-Kisan ₹6000?") == ["pm", "kisan", "6000"]
+
+
+@pytest.mark.parametrize("query, best", [
+    ("PM Kisan ki kist kab aayegi", "pm_kisan"),              # alias
+    ("hospital ka ilaj free", "ayushman_bharat"),             # keyword
+    ("ghar banane ke liye paisa", "pm_awas"),
+    ("मुझे किसान योजना के बारे में बताओ", "pm_kisan"),          # translated card tag
+    ("hello kaise ho", None),
+])
+def test_retrieve_ranks_the_asked_scheme_first(query, best):
+    ranked = _ids(get_knowledge_base().retrieve(query))
+    assert (ranked[0] if ranked else None) == best
+
+
+def test_alias_outranks_keywords():
+    kb = KnowledgeBase([
+        {"id": "a", "name": "Alpha Yojana", "aliases": ["alpha"], "keywords": []},
+        {"id": "b", "name": "Beta Yojana", "aliases": [], "keywords": ["kisan", "fasal"]},
+    ])
+    assert _ids(kb.retrieve("alpha kisan fasal")) == ["a", "b"]
+    assert _ids(kb.retrieve("alpha kisan fasal", k=1)) == ["a"]
+
+
+def test_named_schemes_and_masking():
+    kb = get_knowledge_base()
+    assert kb.named_schemes("PM Kisan aur Ujjwala dono") == ["pm_kisan", "pm_ujjwala"]
+    assert kb.named_schemes("hospital ka ilaj free") == []
+    assert kb.mask_aliases("PM Kisan aur Ujjwala dono") == "SCHEME aur SCHEME dono"
+
+
+def test_prompt_facts_come_from_the_data():
+    scheme = get_knowledge_base().by_id["pm_kisan"]
+    text = format_for_prompt([scheme])
+    assert text.startswith(scheme["full_name"])
+    assert scheme["benefit"] in text and scheme["documents"][0] in text
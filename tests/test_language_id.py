@@ -0,0 +1,26 @@
+from language_id import get_language_identifier
+
+
+def identify(text):
+    return get_language_identifier().identify(text)
+
+
+def test_marathi_in_devanagari():
+    assert identify("मला पैसे पाहिजे आहे") == ("mr-IN", 0.95)
+    assert identify("माझी जमीन दोन एकर आहे")[0] == "mr-IN"
+
+
+def test_hindi_in_devanagari():
+    assert identify("मुझे पैसे चाहिए") == ("hi-IN", 0.95)
+    assert identify("पीएम किसान की 6000 की किस्त कब आएगी")[0] == "hi-IN"
+
+
+def test_other_scripts_keep_their_vowel_signs():
+    assert identify("எனக்கு பணம் வேண்டும்")[0] == "ta-IN"
+    assert identify("నాకు డబ్బు కావాలి")[0] == "te-IN"
+
+
+def test_roman_script_uses_the_lexicon():
+    assert identify("PM Kisan ke liye kya chahiye")[0] == "hi-IN"
+    assert identify("What does PM Kisan need")[0] == "en-IN"
+    assert identify("6000") == (None, 0.0)
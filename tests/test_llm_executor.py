@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from llm_executor import DONE, FAILED, GENERATING, QUEUED, LLMExecutor, LLMQueueFull
+
+
+def _wait(job, timeout=5.0):
+    for _ in range(int(timeout / 0.01)):
+        if job.finished:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_finished_job_has_its_timings():
+    executor = LLMExecutor(workers=1, max_queue=4)
+    seen = []
+
+    def work(job):
+        seen.append(job.status)
+        job.model = "m"
+        job.append("na")
+        job.append("maste")
+
+    job = executor.submit(work)
+    _wait(job)
+    assert seen == [GENERATING]
+    assert (job.status, job.text, job.model, job.error) == (DONE, "namaste", "m", None)
+    assert job.submitted_at <= job.started_at <= job.finished_at
+    assert executor.stats()["completed"] == 1
+
+
+def test_failure_keeps_partial_text():
+    executor = LLMExecutor(workers=1, max_queue=4)
+
+    def work(job):
+        job.append("partial")
+        raise RuntimeError("upstream closed")
+
+    job = executor.submit(work)
+    _wait(job)
+    assert job.status == FAILED and job.text == "partial"
+    assert isinstance(job.error, RuntimeError)
+    assert job.finished_at is not None
+    assert executor.stats()["failed"] == 1
+
+
+def test_status_is_published_last():
+    """A poller that sees a finished status can always read finished_at"""
+    executor = LLMExecutor(workers=4, max_queue=64)
+    jobs = [executor.submit(lambda job: None) for _ in range(50)]
+    for job in jobs:
+        while not job.finished:
+            pass
+        assert job.finished_at is not None
+
+
+def test_identical_calls_share_a_job_and_a_full_queue_rejects():
+    executor = LLMExecutor(workers=1, max_queue=1)
+    release = threading.Event()
+    running = executor.submit(lambda job: release.wait(5), key="busy")
+    waiting = executor.submit(lambda job: None, key="a")
+    assert executor.submit(lambda job: None, key="a") is waiting
+    assert waiting.status == QUEUED and waiting.subscribers == 2
+    assert waiting.claim() and not waiting.claim()
+    with pytest.raises(LLMQueueFull):
+        executor.submit(lambda job: None, key="b")
+    release.set()
+    _wait(running)
+    _wait(waiting)
+    assert executor.stats()["coalesced"] == 1
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+
+from model_router import LARGE, SMALL, ModelRouter, get_model_router, hedged_aiter, hedged_iter
+
+HEDGE_AFTER = 0.05
+
+
+@pytest.fixture
+def router():
+    return ModelRouter({"models": {"text": {SMALL: "small-model", LARGE: "large-model"}}, "rules": []})
+
+
+def test_routing_rules():
+    router = get_model_router()
+    assert router.choose("PM Kisan mein kitna paisa milta hai", count=False)[::2] == (SMALL, "short_faq")
+    assert router.choose("PM Kisan aur Ujjwala dono ke baare mein bataiye", count=False)[::2] == (LARGE, "multi_scheme")
+    assert router.choose("PM Kisan ya KCC kaun sa behtar hai", count=False)[::2] == (LARGE, "compare")
+    assert router.choose("Kya main Ujjwala ke liye patra hoon", count=False)[::2] == (LARGE, "eligibility")
+
+
+# Attempts are described as (delay before the first item, items, error raised after them)
+def _sync_start(attempts, started):
+    def start(attempt):
+        started.append(attempt)
+        delay, items, error = attempts[attempt]
+        time.sleep(delay)
+        yield from items
+        if error:
+            raise error
+    return start
+
+
+def _async_start(attempts, started):
+    async def stream(delay, items, error):
+        await asyncio.sleep(delay)
+        for item in items:
+            yield item
+        if error:
+            raise error
+
+    async def start(attempt):
+        started.append(attempt)
+        return stream(*attempts[attempt])
+    return start
+
+
+def _run_sync(attempts, router):
+    started = []
+    return list(hedged_iter(_sync_start(attempts, started), HEDGE_AFTER, router)), started
+
+
+def _run_async(attempts, router):
+    started = []
+
+    async def collect():
+        return [item async for item in hedged_aiter(_async_start(attempts, started), HEDGE_AFTER, router)]
+    return asyncio.run(collect()), started
+
+
+@pytest.fixture(params=[_run_sync, _run_async], ids=["sync", "async"])
+def run(request):
+    return request.param
+
+
+def test_primary_answers_before_the_hedge(run, router):
+    items, started = run({0: (0, ["a", "b"], None), 1: (0, ["backup"], None)}, router)
+    assert items == ["a", "b"] and started == [0]
+    assert router.stats()["hedges"] == {}
+
+
+def test_primary_still_wins_after_the_hedge(run, router):
+    items, started = run({0: (0.15, ["a", "b"], None), 1: (1.0, ["backup"], None)}, router)
+    assert items == ["a", "b"] and started == [0, 1]
+    assert router.stats()["hedges"] == {"fired": 1, "primary_won": 1}
+
+
+def test_backup_wins_when_the_primary_is_slow(run, router):
+    items, started = run({0: (1.0, ["slow"], None), 1: (0, ["c", "d"], None)}, router)
+    assert items == ["c", "d"]
+    assert router.stats()["hedges"] == {"fired": 1, "backup_won": 1}
+
+
+def test_backup_covers_a_primary_that_fails_after_the_hedge(run, router):
+    items, _ = run({0: (0.15, [], RuntimeError("primary down")), 1: (0.3, ["c"], None)}, router)
+    assert items == ["c"]
+
+
+def test_primary_error_before_the_hedge_is_raised(run, router):
+    with pytest.raises(RuntimeError, match="primary down"):
+        run({0: (0, [], RuntimeError("primary down")), 1: (0, ["c"], None)}, router)
+
+
+def test_error_after_the_first_item_is_raised(run, router):
+    with pytest.raises(RuntimeError, match="cut off"):
+        run({0: (0, ["a"], RuntimeError("cut off")), 1: (0, ["c"], None)}, router)
+
+
+def test_both_attempts_failing_raises(run, router):
+    with pytest.raises(RuntimeError):
+        run({0: (0.1, [], RuntimeError("primary down")), 1: (0, [], RuntimeError("backup down"))}, router)
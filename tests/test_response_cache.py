@@ -0,0 +1,32 @@
+from response_cache import MemoryBackend, ResponseCache, cache_key, prewarm
+
+SMALL, LARGE = "llama-3.1-8b-instant", "llama-3.3-70b-versatile"
+
+
+def test_key_includes_model():
+    assert cache_key("PM Kisan kya hai?", "hi-IN", SMALL, "v1") == cache_key("pm kisan kya hai", "hi-IN", SMALL, "v1")
+    assert cache_key("PM Kisan kya hai", "hi-IN", SMALL, "v1") != cache_key("PM Kisan kya hai", "hi-IN", LARGE, "v1")
+
+
+def test_answer_is_stored_under_the_model_that_wrote_it():
+    cache = ResponseCache(MemoryBackend())
+    cache.set("PM Kisan kya hai", "hi-IN", SMALL, "v1", "small answer")
+    assert cache.get("PM Kisan kya hai", "hi-IN", SMALL, "v1") == "small answer"
+    assert cache.get("PM Kisan kya hai", "hi-IN", LARGE, "v1") is None
+
+
+def test_prewarm_uses_the_routed_model():
+    cache = ResponseCache(MemoryBackend())
+    routed = {"PM Kisan kya hai": SMALL, "PM Kisan ya KCC kaun sa behtar hai": LARGE}
+    calls = []
+
+    def answer(query, language):
+        calls.append(query)
+        return f"answer to {query}", routed[query]
+
+    prompts = {"hi-IN": list(routed)}
+    assert prewarm(cache, prompts, answer, routed.get, "v1") == 2
+    for query, model in routed.items():
+        assert cache.get(query, "hi-IN", model, "v1") == f"answer to {query}"
+    assert prewarm(cache, prompts, answer, routed.get, "v1") == 0
+    assert len(calls) == 2
@@ -0,0 +1,57 @@
+import itertools
+
+from semantic_cache import MIN_QUERY_CHARS, SemanticCache
+
+UJJWALA = "Ujjwala gas connection kaise milega"
+
+
+def _cache(*questions, **kwargs):
+    cache = SemanticCache(**kwargs)
+    for question in questions:
+        cache.add(question, "hi-IN", f"answer: {question}")
+    return cache
+
+
+def test_near_duplicate_hits():
+    cache = _cache(UJJWALA, "PM Kisan kaise milega")
+    answer, score = cache.lookup("UJJWALA gas connection kaise milega bhai?", "hi-IN")
+    assert answer == f"answer: {UJJWALA}"
+    assert 0.8 <= score < 1.0
+
+
+def test_other_scheme_or_number_misses():
+    cache = _cache("PM Kisan kaise milega", "PM Kisan ki 13 kist kab aayegi",
+                   "Atal pension mein 1000 rupaye pension ke liye kitna dena hoga")
+    assert cache.lookup("PM Awas kaise milega", "hi-IN") is None
+    assert cache.lookup("PM Kisan ki 14 kist kab aayegi", "hi-IN") is None
+    assert cache.lookup("Atal pension mein 5000 rupaye pension ke liye kitna dena hoga", "hi-IN") is None
+    assert cache.lookup("PM Kisan ki 13 kist kab aayegi?", "hi-IN") is not None
+
+
+def test_languages_are_kept_apart():
+    cache = _cache(UJJWALA)
+    assert cache.lookup(UJJWALA, "en-IN") is None
+
+
+def test_short_queries_are_neither_stored_nor_looked_up():
+    short = "PM Kisan?"
+    assert len(short) < MIN_QUERY_CHARS
+    cache = _cache(short)
+    assert cache.stats()["entries"] == 0
+    cache = _cache(short + " kaise milega")
+    assert cache.lookup(short, "hi-IN") is None
+
+
+def test_candidate_search_finds_the_match_among_many():
+    syllables = ["ka", "ri", "mo", "te", "su", "la", "pe", "no", "vi", "da"]
+    fillers = [" ".join("".join(word) for word in itertools.islice(itertools.permutations(syllables, 3), i, i + 4))
+               for i in range(0, 2000, 4)]
+    cache = _cache(*fillers, UJJWALA, *fillers[::-1], max_entries=4096)
+    assert cache.lookup(UJJWALA + "?", "hi-IN")[0] == f"answer: {UJJWALA}"
+
+
+def test_ring_buffer_replaces_the_oldest():
+    cache = _cache(UJJWALA, "PM Kisan kaise milega", "Ayushman card kaise banega", max_entries=2)
+    assert cache.stats()["entries"] == 2
+    assert cache.lookup(UJJWALA, "hi-IN") is None
+    assert cache.lookup("Ayushman card kaise banega", "hi-IN") is not None
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import threading
+import time
+
+import tts_cache
+from bench.fakes import FakeTTS
+from tts_cache import AudioCache, CachedTTS
+
+PCM = bytes(range(256)) * 8
+
+
+def _cache(tmp_path, max_bytes=2 ** 20):
+    return AudioCache(str(tmp_path), max_bytes=max_bytes)
+
+
+def test_stored_audio_is_a_hit(tmp_path):
+    cache = _cache(tmp_path)
+    key = cache.key("PM Kisan mein 6000 rupaye milte hain", "hi-IN", "bulbul:v2", "anushka", 22050)
+    asyncio.run(cache.astore(key, PCM, 22050, 1, 0.4))
+    with cache.open(key) as audio:
+        assert bytes(audio.pcm) == PCM
+        assert (audio.sample_rate, audio.num_channels) == (22050, 1)
+    assert cache.stats()["hits"] == 1
+
+
+def test_damaged_files_are_misses(tmp_path):
+    cache = _cache(tmp_path)
+    for name, content in (("short", b"SATC\x01"), ("empty", b""), ("foreign", b"RIFF" + bytes(64))):
+        key = cache.key(name, "hi-IN", "m", "s", 22050)
+        os.makedirs(os.path.dirname(cache._path(key)), exist_ok=True)
+        with open(cache._path(key), "wb") as f:
+            f.write(content)
+        assert cache.open(key) is None
+    assert cache.open(cache.key("never stored", "hi-IN", "m", "s", 22050)) is None
+    assert cache.stats()["misses"] == 4
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = _cache(tmp_path, max_bytes=2 * (len(PCM) + 16))
+    keys = [cache.key(f"sentence {i}", "hi-IN", "m", "s", 22050) for i in range(3)]
+    cache.store(keys[0], PCM, 22050, 1, 0.1)
+    cache.store(keys[1], PCM, 22050, 1, 0.1)
+    cache.open(keys[0]).close()
+    cache.store(keys[2], PCM, 22050, 1, 0.1)
+    assert not os.path.exists(cache._path(keys[1]))
+    assert os.path.exists(cache._path(keys[0])) and os.path.exists(cache._path(keys[2]))
+
+
+def _scanned(cache):
+    """The cache after its startup scan has finished"""
+    started = cache._scanned_at
+    for _ in range(200):
+        if cache._scanned_at != started:
+            return cache
+        time.sleep(0.01)
+    raise AssertionError("startup scan did not finish")
+
+
+def _walk_then(action, monkeypatch):
+    """Make the next directory walk run action() after listing the files, as a concurrent store would"""
+    real_walk = os.walk
+
+    def walk(directory):
+        listed = list(real_walk(directory))
+        action()
+        return iter(listed)
+    monkeypatch.setattr(tts_cache.os, "walk", walk)
+
+
+def test_rescan_keeps_entries_stored_meanwhile(tmp_path, monkeypatch):
+    cache = _scanned(_cache(tmp_path))
+    keys = [cache.key(f"sentence {i}", "hi-IN", "m", "s", 22050) for i in range(3)]
+    cache.store(keys[0], PCM, 22050, 1, 0.1)
+    cache.store(keys[1], PCM, 22050, 1, 0.1)
+    _walk_then(lambda: cache.store(keys[2], PCM, 22050, 1, 0.1), monkeypatch)
+    cache._rescan()
+    assert list(cache._index) == keys
+    assert cache.stats()["size_mb"] == round(3 * (len(PCM) + 16) / 2 ** 20, 2)
+
+
+def test_rescan_keeps_the_cap_and_evictions(tmp_path, monkeypatch):
+    cache = _scanned(_cache(tmp_path, max_bytes=2 * (len(PCM) + 16)))
+    keys = [cache.key(f"sentence {i}", "hi-IN", "m", "s", 22050) for i in range(4)]
+    cache.store(keys[0], PCM, 22050, 1, 0.1)
+    cache.store(keys[1], PCM, 22050, 1, 0.1)
+    # Another process adds a file; a store during the walk evicts keys[0]
+    other = AudioCache(str(tmp_path), max_bytes=2 ** 20)
+    other.store(keys[3], PCM, 22050, 1, 0.1)
+    _walk_then(lambda: cache.store(keys[2], PCM, 22050, 1, 0.1), monkeypatch)
+    cache._rescan()
+    assert keys[0] not in cache._index and not os.path.exists(cache._path(keys[0]))
+    assert cache._total <= cache.max_bytes and keys[2] in cache._index
+    assert cache._total == sum(cache._index.values())
+
+
+def test_lookup_runs_off_the_event_loop(tmp_path):
+    cache = _cache(tmp_path)
+    voice = CachedTTS(FakeTTS("hi-IN", ttfb=0, realtime_factor=1000), "hi-IN", cache=cache)
+    threads = []
+    open_on_disk = cache.open
+
+    def spy(key):
+        threads.append(threading.current_thread())
+        return open_on_disk(key)
+    cache.open = spy
+
+    async def speak(text):
+        async with voice.synthesize(text) as stream:
+            return b"".join([ev.frame.data.tobytes() async for ev in stream])
+
+    async def twice():
+        first = await speak("PM Kisan mein 6000 rupaye milte hain")
+        await asyncio.sleep(0.1)     # the store runs after the audio is played
+        return first, await speak("PM Kisan mein 6000 rupaye milte hain")
+
+    first, second = asyncio.run(twice())
+    assert first == second and cache.stats()["hits"] == 1
+    assert threading.main_thread() not in threads
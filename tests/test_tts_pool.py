@@ -0,0 +1,23 @@
+import asyncio
+
+from bench.fakes import FakeTTS
+from tts_pool import LanguageTTS
+
+
+def test_session_detaches_from_pooled_voices():
+    voices = {"hi-IN": FakeTTS("hi-IN"), "en-IN": FakeTTS("en-IN")}
+    first = LanguageTTS(voices.get, "hi-IN")
+    first.set_language("en-IN")
+    first.set_language("hi-IN")      # a voice used twice is forwarded once
+    second = LanguageTTS(voices.get, "hi-IN")
+    seen = {"first": [], "second": []}
+    first.on("metrics_collected", lambda metrics: seen["first"].append(metrics))
+    second.on("metrics_collected", lambda metrics: seen["second"].append(metrics))
+
+    voices["hi-IN"].emit("metrics_collected", "m1")
+    assert seen == {"first": ["m1"], "second": ["m1"]}
+
+    asyncio.run(first.aclose())
+    voices["hi-IN"].emit("metrics_collected", "m2")
+    voices["en-IN"].emit("metrics_collected", "m3")
+    assert seen == {"first": ["m1"], "second": ["m1", "m2"]}
@@ -0,0 +1,335 @@
+"""
+Content-addressed, disk-backed cache of synthesized speech.
+
+The agent says many sentences over and over — scheme facts from the fast path
+("PM Kisan mein aapko 6000 rupaye milte hain"), apologies, closings — and each
+was synthesized by Sarvam again. CachedTTS wraps a TTS so every sentence is
+looked up by sha1(text, language, model, speaker, sample rate) first:
+
+    hit    the file is opened and memory-mapped on a worker thread, and its
+           PCM is played at once
+    miss   the wrapped TTS synthesizes (over its warm WebSocket when it streams),
+           the audio is played as it arrives and then written to the cache
+           on a worker thread
+
+CachedTTS reports itself as non-streaming, so the session's stream adapter
+splits LLM output into sentences — the unit that repeats — and synthesizes
+each through the cache. Files are a 16-byte header (magic, sample rate,
+channels, synthesis ms) followed by raw 16-bit PCM; the directory is shared by
+all job processes on a node. Least recently used files are deleted past
+TTS_CACHE_MAX_MB; a hit touches the file's mtime, so the order survives
+restarts. The index is rebuilt from the directory now and then to pick up other
+processes' files; entries stored, played or evicted meanwhile keep their live
+state. A missing, truncated or foreign file is a miss. Hit rate, audio bytes
+served and synthesis time avoided are in stats() and the Prometheus counters.
+
+Config (env):
+    TTS_CACHE_DIR         cache directory                       (default .cache/tts)
+    TTS_CACHE_MAX_MB      size cap before LRU eviction          (default 256)
+    TTS_CACHE_MAX_CHARS   longer sentences are not cached        (default 300)
+"""
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from livekit.agents import tts, utils
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS
+from prometheus_client import Counter
+
+logger = logging.getLogger("tts-cache")
+
+_HEADER = struct.Struct("<4sIHHf")   # magic, sample rate, channels, reserved, synthesis ms
+_MAGIC = b"SATC"
+_RESCAN_SECONDS = 60.0               # pick up files written by other job processes
+_PUSH_BYTES = 8192                   # cached audio is handed to the emitter in chunks this size
+
+TTS_CACHE_REQUESTS = Counter("sahayak_tts_cache_requests_total", "TTS cache lookups", ["result"])
+TTS_CACHE_BYTES_SERVED = Counter("sahayak_tts_cache_bytes_served_total", "Audio bytes played from the TTS cache")
+TTS_CACHE_SECONDS_SAVED = Counter("sahayak_tts_cache_synthesis_seconds_saved_total",
+                                  "Synthesis time avoided by TTS cache hits")
+
+
+class CachedAudio:
+    """One cache entry, mapped read-only; use as a context manager"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)   # ValueError if empty
+        try:
+            magic, self.sample_rate, self.num_channels, _, self.synthesis_ms = _HEADER.unpack_from(self._map)
+        except struct.error:
+            magic = None    # shorter than the header
+        if magic != _MAGIC:
+            self._map.close()
+            raise ValueError(f"not a TTS cache file: {path}")
+        self.pcm = memoryview(self._map)[_HEADER.size:]
+
+    def close(self):
+        self.pcm.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AudioCache:
+    def __init__(self, directory: str, max_bytes: int, max_chars: int = 300):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self._index = OrderedDict()     # key -> file size, least recently used first
+        self._total = 0
+        self._scanned_at = time.monotonic()
+        self._changed = None            # keys stored, opened or dropped while a rescan runs; None when idle
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_served = 0
+        self.synthesis_seconds_saved = 0.0
+        os.makedirs(directory, exist_ok=True)
+        # A full directory walk; the index fills in the background and hits work meanwhile
+        threading.Thread(target=self._rescan, daemon=True, name="tts_cache_scan").start()
+
+    @staticmethod
+    def key(text: str, language: str, model: str, speaker: str, sample_rate: int) -> str:
+        raw = "\x1f".join((" ".join(text.split()), language, model, speaker, str(sample_rate)))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.pcm")
+
+    def _rescan(self):
+        """Merge the directory into the LRU index (oldest mtime first); blocking, never on the event loop"""
+        with self._lock:
+            if self._changed is not None:
+                return      # one rescan at a time
+            self._changed = set()
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".pcm"):
+                    try:
+                        st = os.stat(os.path.join(root, name))
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, name[:-4], st.st_size))
+        entries.sort()
+        with self._lock:
+            changed, self._changed = self._changed, None
+            # The walk may predate a store, hit or eviction made during it: those keys keep their live
+            # state, as the most recently used, and evicted or missing ones are not brought back
+            index = OrderedDict((key, size) for _, key, size in entries if key not in changed)
+            for key, size in self._index.items():
+                if key in changed:
+                    index[key] = size
+            self._index = index
+            self._total = sum(index.values())
+            self._scanned_at = time.monotonic()
+            doomed = self._evict_locked()
+        self._remove(doomed)
+
+    def _touch_locked(self, key: str):
+        if self._changed is not None:
+            self._changed.add(key)
+
+    def _evict_locked(self) -> list:
+        """Drop least recently used entries past the cap; returns their keys for _remove()"""
+        doomed = []
+        while self._total > self.max_bytes and len(self._index) > 1:
+            old_key, old_size = self._index.popitem(last=False)
+            self._total -= old_size
+            self._touch_locked(old_key)
+            doomed.append(old_key)
+        self.evictions += len(doomed)
+        return doomed
+
+    def _remove(self, keys):
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def cacheable(self, text: str) -> bool:
+        return 0 < len(text) <= self.max_chars
+
+    def open(self, key: str):
+        """CachedAudio for a hit, or None; counts the lookup. Blocking: use aopen() from the event loop"""
+        path = self._path(key)
+        audio = None
+        try:
+            audio = CachedAudio(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            if audio is not None:
+                audio.close()
+            with self._lock:
+                self.misses += 1
+                self._total -= self._index.pop(key, 0)
+                self._touch_locked(key)
+            TTS_CACHE_REQUESTS.labels(result="miss").inc()
+            return None
+        with self._lock:
+            self.hits += 1
+            self.bytes_served += len(audio.pcm)
+            self.synthesis_seconds_saved += audio.synthesis_ms / 1000
+            self._touch_locked(key)
+            if key in self._index:
+                self._index.move_to_end(key)
+            else:
+                self._index[key] = _HEADER.size + len(audio.pcm)
+                self._total += self._index[key]
+        TTS_CACHE_REQUESTS.labels(result="hit").inc()
+        TTS_CACHE_BYTES_SERVED.inc(len(audio.pcm))
+        TTS_CACHE_SECONDS_SAVED.inc(audio.synthesis_ms / 1000)
+        return audio
+
+    async def aopen(self, key: str):
+        return await asyncio.to_thread(self.open, key)
+
+    def store(self, key: str, pcm: bytes, sample_rate: int, num_channels: int, synthesis_seconds: float):
+        """Blocking file write (and periodic rescan): call through astore() from the event loop"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"   # stores run on worker threads
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, sample_rate, num_channels, 0, synthesis_seconds * 1000))
+            f.write(pcm)
+        os.replace(tmp, path)   # atomic: readers in other processes never see a partial file
+        with self._lock:
+            rescan = time.monotonic() - self._scanned_at > _RESCAN_SECONDS
+        if rescan:
+            self._rescan()
+        size = _HEADER.size + len(pcm)
+        with self._lock:
+            self.stores += 1
+            self._total += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self._touch_locked(key)
+            doomed = self._evict_locked()
+        self._remove(doomed)
+
+    async def astore(self, key: str, pcm: bytes, sample_rate: int, num_channels: int, synthesis_seconds: float):
+        try:
+            await asyncio.to_thread(self.store, key, pcm, sample_rate, num_channels, synthesis_seconds)
+        except OSError as e:
+            logger.warning(f"TTS cache could not store {key}: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._index), "size_mb": round(self._total / 2 ** 20, 2),
+                "max_mb": round(self.max_bytes / 2 ** 20), "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "stores": self.stores, "evictions": self.evictions,
+                "bytes_served": self.bytes_served,
+                "synthesis_seconds_saved": round(self.synthesis_seconds_saved, 2),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> AudioCache:
+    """Per-process index over the node-wide cache directory"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AudioCache(os.path.abspath(os.getenv("TTS_CACHE_DIR", os.path.join(".cache", "tts"))),
+                                max_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB", "256")) * 2 ** 20),
+                                max_chars=int(os.getenv("TTS_CACHE_MAX_CHARS", "300")))
+        return _cache
+
+
+class CachedTTS(tts.TTS):
+    """Wraps a TTS; sentences already spoken in this voice are played from the audio cache"""
+
+    def __init__(self, wrapped: tts.TTS, language: str, speaker: str = "default", cache: AudioCache = None):
+        super().__init__(capabilities=tts.TTSCapabilities(streaming=False),
+                         sample_rate=wrapped.sample_rate, num_channels=wrapped.num_channels)
+        self.wrapped = wrapped
+        self.language = language
+        self.speaker = speaker
+        self.cache = cache or get_tts_cache()
+        self.wrapped.on("metrics_collected", self._on_metrics_collected)
+
+    @property
+    def model(self) -> str:
+        return self.wrapped.model
+
+    @property
+    def provider(self) -> str:
+        return self.wrapped.provider
+
+    def _on_metrics_collected(self, *args, **kwargs):
+        self.emit("metrics_collected", *args, **kwargs)
+
+    def synthesize(self, text: str, *, conn_options=DEFAULT_API_CONNECT_OPTIONS):
+        return CachedChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+    def prewarm(self):
+        self.wrapped.prewarm()
+
+    async def aclose(self):
+        self.wrapped.off("metrics_collected", self._on_metrics_collected)
+        await self.wrapped.aclose()
+
+
+class CachedChunkedStream(tts.ChunkedStream):
+    async def _run(self, output_emitter):
+        cached_tts = self._tts
+        cache = cached_tts.cache
+        text = self._input_text.strip()
+        request_id = utils.shortuuid()
+        key = None
+        if cache.cacheable(text):
+            key = cache.key(text, cached_tts.language, cached_tts.model, cached_tts.speaker, cached_tts.sample_rate)
+            audio = await cache.aopen(key)
+            if audio is not None:
+                with audio:
+                    output_emitter.initialize(request_id=request_id, sample_rate=audio.sample_rate,
+                                              num_channels=audio.num_channels, mime_type="audio/pcm")
+                    for start in range(0, len(audio.pcm), _PUSH_BYTES):
+                        output_emitter.push(bytes(audio.pcm[start:start + _PUSH_BYTES]))
+                output_emitter.flush()
+                return
+
+        output_emitter.initialize(request_id=request_id, sample_rate=cached_tts.sample_rate,
+                                  num_channels=cached_tts.num_channels, mime_type="audio/pcm")
+        started = time.perf_counter()
+        pcm = bytearray()
+        async for frame in self._synthesize_wrapped(text):
+            data = frame.data.tobytes()
+            output_emitter.push(data)
+            pcm += data
+        output_emitter.flush()
+        if key is not None and pcm:
+            await cache.astore(key, bytes(pcm), cached_tts.sample_rate, cached_tts.num_channels,
+                               time.perf_counter() - started)
+
+    async def _synthesize_wrapped(self, text: str):
+        wrapped = self._tts.wrapped
+        if wrapped.capabilities.streaming:
+            # One sentence through the streaming API reuses the wrapped TTS's warm connections
+            async with wrapped.stream(conn_options=self._conn_options) as stream:
+                stream.push_text(text)
+                stream.end_input()
+                async for ev in stream:
+                    yield ev.frame
+        else:
+            async with wrapped.synthesize(text, conn_options=self._conn_options) as stream:
+                async for ev in stream:
+                    yield ev.frame
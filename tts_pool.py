@@ -0,0 +1,157 @@
+"""
+Pool of ready Sarvam TTS instances, one per (language, model, speaker).
+
+Building a sarvam.TTS and opening its WebSocket on the first utterance after a
+language switch adds a visible pause. The pool keeps one instance per key with
+its connection prewarmed, so switching Hindi ↔ English mid-call is a dict
+lookup. Instances idle for longer than the TTL are closed; the most recently
+used one is never evicted because the session is speaking with it. Each
+instance is wrapped in tts_cache.CachedTTS, so sentences already spoken in the
+same voice are played from disk instead of synthesized again.
+
+LanguageTTS is what the session speaks through: it forwards to the voice for
+the caller's current language, and set_language() switches (and warms) it
+mid-call — the session's own TTS cannot be replaced once it has started.
+
+Config (env):
+    TTS_PREWARM_LANGUAGES   comma-separated codes warmed at job start  (default hi-IN,en-IN)
+    TTS_POOL_IDLE_TTL       seconds before an idle instance is closed  (default 600)
+"""
+import asyncio
+import logging
+import os
+import time
+
+from livekit.agents import tts
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS
+from livekit.plugins import sarvam
+
+from tts_cache import CachedTTS
+
+logger = logging.getLogger("tts-pool")
+
+TTS_MODEL = "bulbul:v3"
+TTS_SPEAKER = "shubh"
+
+
+class TTSPool:
+    def __init__(self, model: str = TTS_MODEL, speaker: str = TTS_SPEAKER, idle_ttl: float = 600.0):
+        self.model = model
+        self.speaker = speaker
+        self.idle_ttl = idle_ttl
+        self._entries = {}   # (language, model, speaker) -> [tts, last_used]
+        self._last_key = None
+        self.created = 0
+        self.reused = 0
+
+    def get(self, language: str) -> CachedTTS:
+        """Ready TTS for the language; builds and prewarms one on a miss"""
+        key = (language, self.model, self.speaker)
+        entry = self._entries.get(key)
+        if entry is None:
+            started = time.perf_counter()
+            tts = CachedTTS(sarvam.TTS(target_language_code=language, model=self.model, speaker=self.speaker),
+                            language, self.speaker)
+            try:
+                tts.prewarm()
+            except Exception as e:
+                logger.warning(f"TTS prewarm failed for {language}: {e}")
+            entry = self._entries[key] = [tts, 0.0]
+            self.created += 1
+            logger.info(f"TTS pool created {language} in {(time.perf_counter() - started) * 1000:.1f} ms")
+        else:
+            self.reused += 1
+        entry[1] = time.monotonic()
+        self._last_key = key
+        self._schedule_eviction()
+        return entry[0]
+
+    def warm(self, languages):
+        for language in languages:
+            self.get(language)
+
+    def _schedule_eviction(self):
+        try:
+            asyncio.get_running_loop().create_task(self.evict_idle())
+        except RuntimeError:
+            pass  # no loop yet (e.g. building the agent outside a job)
+
+    async def evict_idle(self):
+        now = time.monotonic()
+        stale = [k for k, (_, used) in self._entries.items()
+                 if k != self._last_key and now - used > self.idle_ttl]
+        for key in stale:
+            tts, _ = self._entries.pop(key)
+            logger.info(f"TTS pool evicting idle {key[0]}")
+            await tts.aclose()
+
+    async def aclose(self):
+        entries, self._entries = self._entries, {}
+        for tts, _ in entries.values():
+            await tts.aclose()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "created": self.created, "reused": self.reused}
+
+
+class LanguageTTS(tts.TTS):
+    """Session TTS that speaks with factory(language) for the current language"""
+
+    def __init__(self, factory, language: str):
+        voice = factory(language)
+        super().__init__(capabilities=tts.TTSCapabilities(streaming=False),
+                         sample_rate=voice.sample_rate, num_channels=voice.num_channels)
+        self._factory = factory
+        self._forwarding = {}      # id(voice) -> (voice, {event: handler}) re-emitted here until aclose()
+        self.language = language
+        self._use(voice)
+
+    def _use(self, voice: tts.TTS):
+        if id(voice) not in self._forwarding:
+            handlers = {"metrics_collected": lambda *args: self.emit("metrics_collected", *args),
+                        "error": lambda *args: self.emit("error", *args)}
+            for event, handler in handlers.items():
+                voice.on(event, handler)
+            self._forwarding[id(voice)] = (voice, handlers)
+        self.voice = voice
+
+    def set_language(self, language: str):
+        """Switch voices; the factory builds and prewarms one on a miss, so call it as early as possible"""
+        self.language = language
+        self._use(self._factory(language))
+
+    @property
+    def model(self) -> str:
+        return self.voice.model
+
+    @property
+    def provider(self) -> str:
+        return self.voice.provider
+
+    def synthesize(self, text: str, *, conn_options=DEFAULT_API_CONNECT_OPTIONS):
+        return self.voice.synthesize(text, conn_options=conn_options)
+
+    def prewarm(self):
+        self.voice.prewarm()
+
+    async def aclose(self):
+        """Detach from the voices; they belong to the pool (or to whoever owns the factory) and outlive the session"""
+        forwarding, self._forwarding = self._forwarding, {}
+        for voice, handlers in forwarding.values():
+            for event, handler in handlers.items():
+                voice.off(event, handler)
+
+
+_pool = None
+
+
+def get_tts_pool() -> TTSPool:
+    """Per-process pool (each LiveKit job process gets its own)"""
+    global _pool
+    if _pool is None:
+        _pool = TTSPool(idle_ttl=float(os.getenv("TTS_POOL_IDLE_TTL", "600")))
+    return _pool
+
+
+def prewarm_languages() -> list:
+    return [code.strip() for code in os.getenv("TTS_PREWARM_LANGUAGES", "hi-IN,en-IN").split(",") if code.strip()]
@@ -0,0 +1,128 @@
+"""
+Per-turn latency breakdown for the voice pipeline.
+
+Stages (seconds, labelled by the TTS language at the time of the turn):
+    end_of_turn     end of user speech → turn committed (VAD / endpointing)
+    stt_final       end of user speech → final transcript (Sarvam STT)
+    llm_ttft        LLM request → first token (Groq)
+    llm_total       LLM request → last token
+    tts_ttfb        first text sent → first audio byte (Sarvam TTS)
+    e2e             user stopped speaking → agent started speaking
+    join_to_first_audio   job start → first agent audio (the greeting), once per call
+
+Histograms go to the prometheus_client registry, which the LiveKit worker
+serves on VOICE_METRICS_PORT with multiprocess collection across job
+processes. Each session logs a p50/p95 summary when it ends.
+
+Config (env):
+    VOICE_METRICS_PORT  port for /metrics on the worker         (unset = disabled)
+    VOICE_METRICS_DIR   multiprocess scratch dir for job metrics (default .cache/prometheus)
+"""
+import logging
+import os
+import time
+from collections import defaultdict
+
+from prometheus_client import Histogram
+from livekit.agents import metrics
+
+logger = logging.getLogger("voice-metrics")
+
+_LATENCY_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0)
+
+STAGE_SECONDS = Histogram(
+    "sahayak_voice_stage_seconds",
+    "Voice pipeline latency per stage and turn",
+    ["stage", "language"],
+    buckets=_LATENCY_BUCKETS,
+)
+PREWARM_SECONDS = Histogram(
+    "sahayak_worker_prewarm_seconds",
+    "Time to load shared models in a worker process",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0),
+)
+JOB_SETUP_SECONDS = Histogram(
+    "sahayak_job_setup_seconds",
+    "Time from job start to the agent session running",
+    buckets=_LATENCY_BUCKETS,
+)
+
+
+def summarize(samples: dict) -> dict:
+    """{stage: [seconds, ...]} → {stage: {n, p50_ms, p95_ms, max_ms}}"""
+    out = {}
+    for stage, values in samples.items():
+        if not values:
+            continue
+        ordered = sorted(values)
+        out[stage] = {
+            "n": len(ordered),
+            "p50_ms": round(ordered[len(ordered) // 2] * 1000),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000),
+            "max_ms": round(ordered[-1] * 1000),
+        }
+    return out
+
+
+class TurnMetrics:
+    """Collects stage timings for one session"""
+
+    def __init__(self, language_getter):
+        self._language = language_getter
+        self.samples = defaultdict(list)
+        self._joined_at = None
+
+    def mark_joined(self, at: float = None):
+        """Start the join → first audio clock; `at` is a time.perf_counter() value, default now"""
+        self._joined_at = time.perf_counter() if at is None else at
+
+    def attach(self, session, *llms):
+        """Per-turn timings come from ChatMessage.metrics; LLM total time from each LLM's own events"""
+        session.on("conversation_item_added", self._on_item_added)
+        session.on("agent_state_changed", self._on_agent_state)
+        for llm in llms:
+            llm.on("metrics_collected", self._on_llm_metrics)
+
+    def observe(self, stage: str, seconds):
+        if seconds is None or seconds < 0:
+            return
+        STAGE_SECONDS.labels(stage=stage, language=self._language()).observe(seconds)
+        self.samples[stage].append(seconds)
+
+    def _on_item_added(self, ev):
+        report = getattr(ev.item, "metrics", None) or {}
+        role = getattr(ev.item, "role", None)
+        if role == "user":
+            self.observe("end_of_turn", report.get("end_of_turn_delay"))
+            self.observe("stt_final", report.get("transcription_delay"))
+        elif role == "assistant":
+            self.observe("llm_ttft", report.get("llm_node_ttft"))
+            self.observe("tts_ttfb", report.get("tts_node_ttfb"))
+            self.observe("e2e", report.get("e2e_latency"))
+
+    def _on_agent_state(self, ev):
+        if ev.new_state == "speaking" and self._joined_at is not None:
+            self.observe("join_to_first_audio", time.perf_counter() - self._joined_at)
+            self._joined_at = None
+
+    def _on_llm_metrics(self, m):
+        if isinstance(m, metrics.LLMMetrics) and not m.cancelled:
+            self.observe("llm_total", m.duration)
+
+    def summary(self) -> dict:
+        return summarize(self.samples)
+
+    async def log_summary(self):
+        logger.info(f"Session latency summary: {self.summary()}")
+
+
+def metrics_options() -> dict:
+    """WorkerOptions kwargs that expose the histograms on VOICE_METRICS_PORT"""
+    port = os.getenv("VOICE_METRICS_PORT")
+    if not port:
+        return {}
+    # The worker clears this dir at startup and points job processes at it
+    multiproc_dir = os.path.abspath(os.getenv("VOICE_METRICS_DIR", os.path.join(".cache", "prometheus")))
+    os.makedirs(multiproc_dir, exist_ok=True)
+    logger.info(f"Prometheus metrics on :{port}/metrics (multiprocess dir {multiproc_dir})")
+    return {"prometheus_port": int(port), "prometheus_multiproc_dir": multiproc_dir}
@@ -0,0 +1,152 @@
+"""
+Load reporting and job admission for the voice worker.
+
+The default LiveKit load is CPU only, so a node keeps accepting calls until
+audio stutters. Here load is the worst of three signals, each scaled to 0..1:
+
+    cpu        — moving average of process-tree CPU use
+    sessions   — active jobs / VOICE_MAX_SESSIONS
+    loop lag   — main event-loop scheduling delay / VOICE_LAG_BUDGET_MS
+
+The worker reports this load to the dispatcher (which stops sending jobs past
+the threshold) and request_fnc re-checks it, rejecting without terminating so
+the dispatcher can try another node. Every decision is logged with its reason.
+
+Config (env, or the matching CLI flag — see parse_worker_args):
+    VOICE_LOAD_THRESHOLD    reject at or above this load      (default 0.75)
+    VOICE_MAX_SESSIONS      concurrent calls per node          (default 4 per CPU)
+    VOICE_LAG_BUDGET_MS     loop lag that counts as full load  (default 150)
+    VOICE_IDLE_PROCESSES    prewarmed idle job processes       (default 2)
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+
+from livekit.agents import JobRequest
+from livekit.agents.utils.hw import get_cpu_monitor
+
+logger = logging.getLogger("worker-load")
+
+
+class LoadMonitor:
+    def __init__(self, threshold: float, max_sessions: int, lag_budget_ms: float):
+        self.threshold = threshold
+        self.max_sessions = max_sessions
+        self.lag_budget_ms = lag_budget_ms
+        self._cpu_monitor = get_cpu_monitor()
+        self._cpu = 0.0
+        self._lag_ms = 0.0
+        self._lock = threading.Lock()
+        self._lag_loop = None
+        self._was_full = False
+        threading.Thread(target=self._sample_cpu, daemon=True, name="voice_load_cpu").start()
+
+    def _sample_cpu(self):
+        while True:
+            sample = self._cpu_monitor.cpu_percent(interval=0.5)
+            with self._lock:
+                self._cpu = 0.6 * self._cpu + 0.4 * sample
+
+    def _probe_lag(self, loop):
+        """Time how long a no-op callback waits on the worker's loop"""
+        while True:
+            scheduled = time.perf_counter()
+            done = threading.Event()
+            loop.call_soon_threadsafe(done.set)
+            if not done.wait(timeout=5.0):
+                lag = 5000.0
+            else:
+                lag = (time.perf_counter() - scheduled) * 1000
+            with self._lock:
+                self._lag_ms = 0.7 * self._lag_ms + 0.3 * lag
+            time.sleep(0.5)
+
+    def _attach(self, server):
+        # load_fnc runs in an executor thread; the server keeps a handle to its loop
+        loop = getattr(server, "_loop", None)
+        if loop is not None and self._lag_loop is None:
+            self._lag_loop = loop
+            threading.Thread(target=self._probe_lag, args=(loop,), daemon=True, name="voice_load_lag").start()
+
+    def snapshot(self, server) -> dict:
+        self._attach(server)
+        sessions = len(server.active_jobs)
+        with self._lock:
+            cpu, lag_ms = self._cpu, self._lag_ms
+        parts = {
+            "cpu": cpu,
+            "sessions": sessions / max(self.max_sessions, 1),
+            "loop_lag": lag_ms / self.lag_budget_ms,
+        }
+        reason = max(parts, key=parts.get)
+        return {
+            "load": min(parts[reason], 1.0),
+            "reason": reason,
+            "cpu": round(cpu, 3),
+            "active_sessions": sessions,
+            "loop_lag_ms": round(lag_ms, 1),
+        }
+
+    def load_fnc(self, server) -> float:
+        snap = self.snapshot(server)
+        full = snap["load"] >= self.threshold
+        if full != self._was_full:
+            state = "FULL — dispatcher will route calls elsewhere" if full else "available again"
+            logger.info(f"Worker {state}: {snap}")
+            self._was_full = full
+        return snap["load"]
+
+    def request_fnc(self, server_getter):
+        async def _request_fnc(req: JobRequest):
+            server = server_getter()
+            snap = self.snapshot(server) if server is not None else None
+            if snap is not None and snap["load"] >= self.threshold:
+                logger.warning(f"Rejecting job {req.id} for room {req.room.name}: "
+                               f"{snap['reason']} load {snap['load']:.2f} ≥ {self.threshold} {snap}")
+                await req.reject(terminate=False)
+                return
+            logger.info(f"Accepting job {req.id} for room {req.room.name}: {snap}")
+            await req.accept()
+        return _request_fnc
+
+
+def parse_worker_args(argv: list):
+    """Pull our tuning flags out of argv (the rest goes to the LiveKit CLI)"""
+    cpus = int(get_cpu_monitor().cpu_count()) or 1
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--load-threshold", type=float, default=float(os.getenv("VOICE_LOAD_THRESHOLD", "0.75")))
+    parser.add_argument("--max-sessions", type=int, default=int(os.getenv("VOICE_MAX_SESSIONS", str(cpus * 4))))
+    parser.add_argument("--lag-budget-ms", type=float, default=float(os.getenv("VOICE_LAG_BUDGET_MS", "150")))
+    parser.add_argument("--idle-processes", type=int, default=int(os.getenv("VOICE_IDLE_PROCESSES", "2")))
+    return parser.parse_known_args(argv)
+
+
+class ServerRef:
+    """Captures the AgentServer handed to load_fnc so request_fnc can read the same load"""
+
+    def __init__(self, monitor: LoadMonitor):
+        self.monitor = monitor
+        self.server = None
+
+    def load_fnc(self, server) -> float:
+        self.server = server
+        return self.monitor.load_fnc(server)
+
+    def get(self):
+        return self.server
+
+
+def admission_options(args) -> dict:
+    """WorkerOptions kwargs for load reporting, admission and idle process pool"""
+    monitor = LoadMonitor(args.load_threshold, args.max_sessions, args.lag_budget_ms)
+    ref = ServerRef(monitor)
+    logger.info(f"Admission: threshold={args.load_threshold} max_sessions={args.max_sessions} "
+                f"lag_budget_ms={args.lag_budget_ms} idle_processes={args.idle_processes}")
+    return {
+        "load_fnc": ref.load_fnc,
+        "load_threshold": args.load_threshold,
+        "request_fnc": monitor.request_fnc(ref.get),
+        "num_idle_processes": args.idle_processes,
+    }